@@ -1,7 +1,10 @@
 import argparse
 import asyncio
+import heapq
+import logging
 import os
 import sys
+from operator import itemgetter
 from typing import List
 from pathlib import Path
 from dotenv import load_dotenv
@@ -10,51 +13,96 @@ from agent.agent import DevIndexAgent
 from google.adk.runners import InMemoryRunner
 from google.genai import types
 
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+_LOGS_DIR = _PROJECT_ROOT / "logs"
+_ENV_PATH = _PROJECT_ROOT / ".env"
+
 # Load environment variables from .env file in project root
-env_path = Path(__file__).parent.parent / ".env"
-load_dotenv(dotenv_path=env_path)
+load_dotenv(dotenv_path=_ENV_PATH)
+
+# Database credentials are read once; both the startup check and the save
+# path report against this
+_MISSING_DB_ENV = [key for key in ("SUPABASE_URL", "SUPABASE_KEY") if not os.environ.get(key)]
 
-# Initialize database logger early to ensure logs directory is created
+# Bind the database logger once; it also ensures the logs directory exists
 try:
     from database.logger import get_db_logger
-    db_logger = get_db_logger("main")
-    db_logger.info("=" * 60)
-    db_logger.info("DevIndex Agent Starting")
-    db_logger.info("=" * 60)
-    
-    # Verify logs directory exists
-    logs_dir = Path(__file__).parent.parent / "logs"
-    if logs_dir.exists():
-        db_logger.info(f"✓ Logs directory exists: {logs_dir}")
-    else:
-        db_logger.warning(f"⚠ Logs directory not found: {logs_dir}")
-        
-    # Check database setup
-    if os.environ.get("SUPABASE_URL") and os.environ.get("SUPABASE_KEY"):
-        db_logger.info("✓ SUPABASE_URL and SUPABASE_KEY are set")
-        try:
-            from database.db import DatabaseManager
-            db_logger.info("✓ Database module imported successfully")
-            # Test database connection (just check if it initializes)
-            try:
-                db_manager = DatabaseManager()
-                db_logger.info("✓ Database manager initialized successfully")
-            except Exception as db_init_error:
-                db_logger.error(f"❌ Database manager initialization failed: {db_init_error}", exc_info=True)
-        except ImportError as import_error:
-            db_logger.error(f"❌ Failed to import database module: {import_error}", exc_info=True)
-    else:
-        missing = []
-        if not os.environ.get("SUPABASE_URL"):
-            missing.append("SUPABASE_URL")
-        if not os.environ.get("SUPABASE_KEY"):
-            missing.append("SUPABASE_KEY")
-        db_logger.warning(f"⚠ {', '.join(missing)} not set - database operations will be skipped")
-        
+    _DB_LOGGER = get_db_logger("main")
+    # Phase boundaries only; per-step detail is logged at DEBUG
+    _DB_LOGGER.setLevel(logging.INFO)
 except Exception as logger_error:
     print(f"⚠ Warning: Could not initialize database logger: {logger_error}")
-    import traceback
-    traceback.print_exc()
+    _DB_LOGGER = logging.getLogger("main")
+
+# Database modules are optional: without them the run still prints results
+try:
+    from database.db import DatabaseManager
+    from utils.db_utils import save_skill_vector_to_db
+    _DB_IMPORT_ERROR = None
+except ImportError as db_import_error:
+    DatabaseManager = None
+    save_skill_vector_to_db = None
+    _DB_IMPORT_ERROR = db_import_error
+
+
+def _log(level: str, msg, *args, **kwargs):
+    """Log through the main db logger; a logging failure never aborts the run."""
+    try:
+        getattr(_DB_LOGGER, level)(msg, *args, **kwargs)
+    except Exception:
+        pass
+
+
+# The kickoff message is the same for every run; the analysis itself is
+# driven by the agent's instruction and session state
+_BOOT_MSG = types.Content(role="user", parts=[types.Part(text="Follow the system instruction.")])
+
+# Event JSON lines are buffered and written in batches instead of one
+# print() (write + flush) per event
+_EVENT_BATCH_SIZE = 64
+_EVENT_DUMP_OPTIONS = {"exclude_unset": True, "exclude_defaults": True, "exclude_none": True}
+_out_buf: list[str] = []
+
+
+def _flush_events():
+    if _out_buf:
+        sys.stdout.write("\n".join(_out_buf) + "\n")
+        sys.stdout.flush()
+        _out_buf.clear()
+
+
+def _emit(line: str):
+    _out_buf.append(line)
+    if len(_out_buf) >= _EVENT_BATCH_SIZE:
+        _flush_events()
+
+
+def _log_startup():
+    """Log startup diagnostics (logs directory, database configuration)."""
+    try:
+        _log("info", "=" * 60)
+        _log("info", "DevIndex Agent Starting")
+        _log("info", "=" * 60)
+
+        # Ensure logs directory exists
+        _LOGS_DIR.mkdir(parents=True, exist_ok=True)
+        _log("debug", "✓ Logs directory: %s", _LOGS_DIR)
+
+        # Check database setup
+        if not _MISSING_DB_ENV:
+            _log("debug", "✓ SUPABASE_URL and SUPABASE_KEY are set")
+            # The connection itself is opened lazily on the first save
+            if DatabaseManager is not None:
+                _log("debug", "✓ Database module imported successfully")
+            else:
+                _log("error", f"❌ Failed to import database module: {_DB_IMPORT_ERROR}")
+        else:
+            _log("warning", f"⚠ {', '.join(_MISSING_DB_ENV)} not set - database operations will be skipped")
+
+    except Exception as startup_error:
+        print(f"⚠ Warning: Startup checks failed: {startup_error}")
+        import traceback
+        traceback.print_exc()
 
 
 def raise_if_env_absent(required_api_keys: List[str]):
@@ -73,29 +121,25 @@ def raise_if_env_absent(required_api_keys: List[str]):
     if len(errors) > 0:
         raise ValueError("The following checks failed:\n" + "\n".join(errors))
 
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="DevIndex Agent - Analyze GitHub user skills from a repository")
+    parser.add_argument("--username", required=True, help="GitHub username to analyze")
+    parser.add_argument("--repo", required=True, help="Repository to analyze (e.g., 'owner/repo' or 'repo' if owned by user)")
+    return parser
+
+
 async def main():
+    # Parse first so --help and bad arguments exit before any other work
+    args = _build_parser().parse_args()
+
+    _log_startup()
     raise_if_env_absent(["GOOGLE_API_KEY"])
     
     # Log startup
-    try:
-        from database.logger import get_db_logger
-        db_logger = get_db_logger("main")
-        db_logger.info("Starting agent main function")
-    except Exception:
-        pass  # Logger already initialized above, or failed
-
-    parser = argparse.ArgumentParser(description="DevIndex Agent - Analyze GitHub user skills from a repository")
-    parser.add_argument("--username", required=True, help="GitHub username to analyze")
-    parser.add_argument("--repo", required=True, help="Repository to analyze (e.g., 'owner/repo' or 'repo' if owned by user)")
-    args = parser.parse_args()
+    _log("debug", "Starting agent main function")
     
     # Log arguments
-    try:
-        from database.logger import get_db_logger
-        db_logger = get_db_logger("main")
-        db_logger.info(f"Arguments - Username: {args.username}, Repo: {args.repo}")
-    except Exception:
-        pass
+    _log("debug", "Arguments - Username: %s, Repo: %s", args.username, args.repo)
 
     session_state = {
         "username": args.username,
@@ -112,257 +156,180 @@ async def main():
     )
 
     # Log that we're starting the agent
-    try:
-        from database.logger import get_db_logger
-        db_logger = get_db_logger("main")
-        db_logger.info("Starting agent execution...")
-    except Exception:
-        pass
+    _log("info", "Starting agent execution...")
     
     # Run the agent
     event_count = 0
+    # Each event is serialized on a worker thread while the runner produces
+    # the next one; results are emitted in order
+    pending_dump = None
     try:
         async for event in runner.run_async(
             user_id="1234",
             session_id=session.id,
-            new_message=types.Content(role="user", parts=[types.Part(text="Follow the system instruction.")]),
+            new_message=_BOOT_MSG,
         ):
             event_count += 1
-            print(event.model_dump_json(exclude_unset=True, exclude_defaults=True, exclude_none=True))
+            if pending_dump is not None:
+                _emit(await pending_dump)
+            pending_dump = asyncio.ensure_future(
+                asyncio.to_thread(event.model_dump_json, **_EVENT_DUMP_OPTIONS)
+            )
+        if pending_dump is not None:
+            _emit(await pending_dump)
     except Exception as agent_error:
-        try:
-            from database.logger import get_db_logger
-            db_logger = get_db_logger("main")
-            db_logger.error(f"Agent execution failed: {agent_error}", exc_info=True)
-        except Exception:
-            pass
+        _log("error", f"Agent execution failed: {agent_error}", exc_info=True)
         raise
+    finally:
+        _flush_events()
     
     # Log completion
-    try:
-        from database.logger import get_db_logger
-        db_logger = get_db_logger("main")
-        db_logger.info(f"Agent execution completed - processed {event_count} events")
-    except Exception:
-        pass
+    _log("info", f"Agent execution completed - processed {event_count} events")
     
     # After all events are processed, display the skill vector if available
     updated_session = await runner.session_service.get_session(app_name="devindex_agent", user_id="1234", session_id=session.id)
     
     # Log session retrieval
-    try:
-        from database.logger import get_db_logger
-        db_logger = get_db_logger("main")
-        if updated_session:
-            db_logger.info("Session retrieved successfully")
-        else:
-            db_logger.error("Failed to retrieve updated session")
-    except Exception:
-        pass
+    if updated_session:
+        _log("debug", "Session retrieved successfully")
+    else:
+        _log("error", "Failed to retrieve updated session")
     
     # Log session state for debugging
-    try:
-        from database.logger import get_db_logger
-        db_logger = get_db_logger("main")
-        db_logger.info("Agent execution completed, checking session state...")
-        db_logger.debug(f"Session state keys: {list(updated_session.state.keys()) if updated_session else 'No session'}")
-    except Exception:
-        pass
+    # Debug payloads below are only built when DEBUG is enabled
+    debug_enabled = _DB_LOGGER.isEnabledFor(logging.DEBUG)
+    _log("debug", "Agent execution completed, checking session state...")
+    if debug_enabled:
+        _log("debug", "Session state keys: %s", list(updated_session.state.keys()) if updated_session else "No session")
     
     # Check for skill_vector in session state (this is what the agent actually stores)
     skill_vector_data = updated_session.state.get("skill_vector") if updated_session else None
     
     # Log what we found
-    try:
-        from database.logger import get_db_logger
-        db_logger = get_db_logger("main")
-        if skill_vector_data:
-            db_logger.info(f"✓ Found skill_vector_data in session state")
-            db_logger.debug(f"skill_vector_data type: {type(skill_vector_data)}")
+    if skill_vector_data:
+        _log("debug", "✓ Found skill_vector_data in session state")
+        if debug_enabled:
+            _log("debug", "skill_vector_data type: %s", type(skill_vector_data))
             if isinstance(skill_vector_data, dict):
-                db_logger.debug(f"skill_vector_data keys: {list(skill_vector_data.keys())}")
+                _log("debug", "skill_vector_data keys: %s", list(skill_vector_data.keys()))
                 if "skills" in skill_vector_data:
-                    db_logger.debug(f"skills list length: {len(skill_vector_data.get('skills', []))}")
-        else:
-            db_logger.warning("skill_vector_data is None - cannot extract skills")
-    except Exception:
-        pass
+                    _log("debug", "skills list length: %d", len(skill_vector_data.get("skills", [])))
+    else:
+        _log("warning", "skill_vector_data is None - cannot extract skills")
     
     if skill_vector_data:
         # Extract skills from the structured skill_vector
-        try:
-            from database.logger import get_db_logger
-            db_logger = get_db_logger("main")
-            db_logger.debug(f"Extracting skills from skill_vector_data...")
-        except Exception:
-            pass
+        _log("debug", "Extracting skills from skill_vector_data...")
         
         skills_list = skill_vector_data.get("skills", []) if isinstance(skill_vector_data, dict) else []
         
         # Log the extraction process
-        try:
-            from database.logger import get_db_logger
-            db_logger = get_db_logger("main")
-            db_logger.debug(f"skills_list type: {type(skills_list)}, length: {len(skills_list) if isinstance(skills_list, list) else 'N/A'}")
+        if debug_enabled:
+            _log("debug", "skills_list type: %s, length: %s", type(skills_list), len(skills_list) if isinstance(skills_list, list) else "N/A")
             if skills_list:
-                db_logger.debug(f"First skill item: {skills_list[0] if len(skills_list) > 0 else 'N/A'}")
-        except Exception:
-            pass
+                _log("debug", "First skill item: %s", skills_list[0])
         
-        skill_vector_dict = {}
-        for skill in skills_list:
-            if isinstance(skill, dict) and "name" in skill and "score" in skill:
-                skill_vector_dict[skill["name"]] = skill["score"]
-            elif isinstance(skill, dict):
-                # Log unexpected structure
-                try:
-                    from database.logger import get_db_logger
-                    db_logger = get_db_logger("main")
-                    db_logger.warning(f"Skill item has unexpected structure: {skill}")
-                except Exception:
-                    pass
+        skill_vector_dict = {
+            skill["name"]: skill["score"]
+            for skill in skills_list
+            if isinstance(skill, dict) and "name" in skill and "score" in skill
+        }
+        # Log unexpected structures (only rescans when something was dropped)
+        if len(skill_vector_dict) < len(skills_list):
+            for skill in skills_list:
+                if isinstance(skill, dict) and not ("name" in skill and "score" in skill):
+                    _log("warning", f"Skill item has unexpected structure: {skill}")
         
         # Generate output for display
         if skill_vector_dict:
-            formatted_skills = [f"  {name}: {score}" for name, score in sorted(skill_vector_dict.items(), key=lambda x: x[1], reverse=True)]
+            sorted_skills = sorted(skill_vector_dict.items(), key=itemgetter(1), reverse=True)
+            body = "\n".join(f"  {name}: {score}" for name, score in sorted_skills) or "  No skills identified"
             username = skill_vector_data.get("username", args.username) if isinstance(skill_vector_data, dict) else args.username
-            output = f"""
-Skill Vector for {username} (Repository: {args.repo}):
-{chr(10).join(formatted_skills) if formatted_skills else '  No skills identified'}
-            """.strip()
+            output = f"Skill Vector for {username} (Repository: {args.repo}):\n{body}"
             
             print("\n" + "="*60)
             print(output)
             print("="*60)
         else:
             print("\n⚠ Skill vector found but no skills extracted")
-            try:
-                from database.logger import get_db_logger
-                db_logger = get_db_logger("main")
-                db_logger.warning(f"skill_vector_data structure: {type(skill_vector_data)}")
-                db_logger.debug(f"skill_vector_data: {skill_vector_data}")
-            except Exception:
-                pass
+            _log("warning", f"skill_vector_data structure: {type(skill_vector_data)}")
+            _log("debug", "skill_vector_data: %s", skill_vector_data)
         
         # Log whether skill_vector_dict exists and attempt to save
-        try:
-            from database.logger import get_db_logger
-            db_logger = get_db_logger("main")
-            if skill_vector_dict:
-                db_logger.info(f"✓ Extracted skill_vector_dict with {len(skill_vector_dict)} skills")
-                db_logger.debug(f"Skill vector dict: {skill_vector_dict}")
-            else:
-                db_logger.warning("⚠ Failed to extract skills from skill_vector_data")
-                db_logger.debug(f"skill_vector_data type: {type(skill_vector_data)}, content: {skill_vector_data}")
-        except Exception:
-            pass
+        if skill_vector_dict:
+            _log("info", f"✓ Extracted skill_vector_dict with {len(skill_vector_dict)} skills")
+            _log("debug", "Skill vector dict: %s", skill_vector_dict)
+        else:
+            _log("warning", "⚠ Failed to extract skills from skill_vector_data")
+            _log("debug", "skill_vector_data type: %s, content: %s", type(skill_vector_data), skill_vector_data)
         
         # Save to database if we have skills
         if skill_vector_dict:
             # Log that we're attempting to save
-            try:
-                from database.logger import get_db_logger
-                db_logger = get_db_logger("main")
-                db_logger.info("=" * 60)
-                db_logger.info("Attempting to save skill vector to database")
-                db_logger.info(f"Username: {args.username}, Repo: {args.repo}")
-                db_logger.info(f"Skills count: {len(skill_vector_dict)}")
-            except Exception:
-                pass
+            _log("debug", "=" * 60)
+            _log("info", "Attempting to save skill vector to database")
+            _log("debug", "Username: %s, Repo: %s", args.username, args.repo)
+            _log("debug", "Skills count: %d", len(skill_vector_dict))
             
             print(f"\n{'='*60}")
             print(f"📊 Skill Vector Summary:")
             print(f"   Total skills: {len(skill_vector_dict)}")
-            print(f"   Skills: {', '.join(list(skill_vector_dict.keys())[:5])}{'...' if len(skill_vector_dict) > 5 else ''}")
+            top_skills = heapq.nlargest(5, skill_vector_dict.items(), key=itemgetter(1))
+            print(f"   Skills: {', '.join(name for name, _ in top_skills)}{'...' if len(skill_vector_dict) > 5 else ''}")
             print(f"{'='*60}\n")
             
-            # Verify logs directory exists before saving
-            logs_dir = Path(__file__).parent.parent / "logs"
-            if not logs_dir.exists():
-                print(f"⚠ Creating logs directory: {logs_dir}")
-                logs_dir.mkdir(exist_ok=True)
-                print(f"✓ Logs directory created")
+            # Ensure logs directory exists before saving
+            _LOGS_DIR.mkdir(parents=True, exist_ok=True)
             
-            try:
-                # Import and verify database modules are available
-                print("📦 Verifying database modules...")
-                from utils.db_utils import save_skill_vector_to_db
-                from database.logger import get_db_logger
-                from database.db import DatabaseManager
-                print("✓ All database modules imported successfully")
-                
-                # Verify logger is working
-                test_logger = get_db_logger("main")
-                test_logger.info("About to save skill vector to database")
-                print(f"✓ Database logger is working (check logs/database_*.log)")
-                
-                # Save to database
-                print(f"\n💾 Saving to database...")
-                saved = save_skill_vector_to_db(
-                    username=args.username,
-                    repo_name=args.repo,
-                    skills=skill_vector_dict
-                )
-                if saved:
-                    print(f"\n✓ Skill vector saved to database successfully!")
-                    test_logger.info("Skill vector save completed successfully")
-                else:
-                    if os.environ.get("SUPABASE_URL") and os.environ.get("SUPABASE_KEY"):
-                        print(f"\n⚠ Database save failed - check logs/database_*.log for details")
-                        test_logger.warning("Database save returned False")
-                    else:
-                        missing = []
-                        if not os.environ.get("SUPABASE_URL"):
-                            missing.append("SUPABASE_URL")
-                        if not os.environ.get("SUPABASE_KEY"):
-                            missing.append("SUPABASE_KEY")
-                        print(f"\n⚠ {', '.join(missing)} not set - skipping database save")
-                        test_logger.warning(f"{', '.join(missing)} not set, save skipped")
-            except ImportError as e:
-                print(f"\n❌ Database module import failed: {e}")
-                try:
-                    from database.logger import get_db_logger
-                    error_logger = get_db_logger("main")
-                    error_logger.error(f"Database module import failed: {e}", exc_info=True)
-                except Exception:
-                    pass
-                import traceback
-                traceback.print_exc()
-            except Exception as e:
-                print(f"\n❌ Unexpected error saving to database: {e}")
-                print(f"   Check logs/database_*.log for full error details")
-                import traceback
-                traceback.print_exc()
-                # Try to log the error
+            if save_skill_vector_to_db is None:
+                print(f"\n❌ Database module import failed: {_DB_IMPORT_ERROR}")
+                _log("error", f"Database module import failed: {_DB_IMPORT_ERROR}")
+            else:
                 try:
-                    from database.logger import get_db_logger
-                    error_logger = get_db_logger("main")
-                    error_logger.error(f"Unexpected error in main: {e}", exc_info=True)
-                except Exception:
-                    pass
+                    # Verify logger is working
+                    _log("debug", "About to save skill vector to database")
+                    print(f"✓ Database logger is working (check logs/database_*.log)")
+                    
+                    # Save to database
+                    print(f"\n💾 Saving to database...")
+                    saved = save_skill_vector_to_db(
+                        username=args.username,
+                        repo_name=args.repo,
+                        skills=skill_vector_dict
+                    )
+                    if saved:
+                        print(f"\n✓ Skill vector saved to database successfully!")
+                        _log("info", "Skill vector save completed successfully")
+                    else:
+                        if not _MISSING_DB_ENV:
+                            print(f"\n⚠ Database save failed - check logs/database_*.log for details")
+                            _log("warning", "Database save returned False")
+                        else:
+                            missing = ", ".join(_MISSING_DB_ENV)
+                            print(f"\n⚠ {missing} not set - skipping database save")
+                            _log("warning", f"{missing} not set, save skipped")
+                except Exception as e:
+                    print(f"\n❌ Unexpected error saving to database: {e}")
+                    print(f"   Check logs/database_*.log for full error details")
+                    import traceback
+                    traceback.print_exc()
+                    # Try to log the error
+                    _log("error", f"Unexpected error in main: {e}", exc_info=True)
         else:
             # Log that skill_vector_dict is missing
-            try:
-                from database.logger import get_db_logger
-                db_logger = get_db_logger("main")
-                db_logger.warning("skill_vector_dict is None or empty - cannot save to database")
-                db_logger.debug(f"Session state keys available: {list(updated_session.state.keys()) if updated_session else 'No session'}")
-            except Exception:
-                pass
+            _log("warning", "skill_vector_dict is None or empty - cannot save to database")
+            if debug_enabled:
+                _log("debug", "Session state keys available: %s", list(updated_session.state.keys()) if updated_session else "No session")
             print(f"\n⚠ No skill_vector_dict found - cannot save to database")
     
     else:
         # Log if skill_vector_output is missing
-        try:
-            from database.logger import get_db_logger
-            db_logger = get_db_logger("main")
-            if not updated_session:
-                db_logger.error("No updated session found after agent execution")
-            elif "skill_vector_output" not in updated_session.state:
-                db_logger.warning("skill_vector_output not found in session state")
-                db_logger.debug(f"Available keys: {list(updated_session.state.keys())}")
-        except Exception:
-            pass
+        if not updated_session:
+            _log("error", "No updated session found after agent execution")
+        elif "skill_vector_output" not in updated_session.state:
+            _log("warning", "skill_vector_output not found in session state")
+            if debug_enabled:
+                _log("debug", "Available keys: %s", list(updated_session.state.keys()))
         print(f"\n⚠ No skill_vector_output found in session state")
 
 
@@ -9,7 +9,9 @@ from agent.nodes import (
     fetch_file_tree,
     fetch_files,
     fetch_metadata,
+    is_trivial_repo,
     persist,
+    score_from_languages,
     score_skills,
     select_files,
     validate_input,
@@ -21,6 +23,14 @@ def _route_after_validate(state: AgentState) -> str:
     return "error_end" if state.get("error") else "fetch_metadata"
 
 
+def _route_after_metadata(state: AgentState) -> str:
+    if state.get("error"):
+        return "error_end"
+    if is_trivial_repo(state):
+        return "score_from_languages"   # metadata is decisive — skip the LLM
+    return "fetch_file_tree"
+
+
 def _route_after_file_cache(state: AgentState) -> str:
     if state.get("error"):
         return "error_end"
@@ -48,6 +58,7 @@ def build_graph() -> StateGraph:
     g.add_node("fetch_files", fetch_files)
     g.add_node("compute_complexity", compute_complexity)
     g.add_node("score_skills", score_skills)
+    g.add_node("score_from_languages", score_from_languages)
     g.add_node("validate_scores", validate_scores)
     g.add_node("persist", persist)
     g.add_node("error_end", _error_node)
@@ -60,7 +71,16 @@ def build_graph() -> StateGraph:
         {"fetch_metadata": "fetch_metadata", "error_end": "error_end"},
     )
 
-    g.add_edge("fetch_metadata", "fetch_file_tree")
+    g.add_conditional_edges(
+        "fetch_metadata",
+        _route_after_metadata,
+        {
+            "fetch_file_tree": "fetch_file_tree",
+            "score_from_languages": "score_from_languages",
+            "error_end": "error_end",
+        },
+    )
+
     g.add_edge("fetch_file_tree", "select_files")
     g.add_edge("select_files", "check_file_cache")
 
@@ -77,6 +97,7 @@ def build_graph() -> StateGraph:
     g.add_edge("fetch_files", "compute_complexity")
     g.add_edge("compute_complexity", "score_skills")
     g.add_edge("score_skills", "validate_scores")
+    g.add_edge("score_from_languages", "validate_scores")
 
     g.add_conditional_edges(
         "validate_scores",
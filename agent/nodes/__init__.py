@@ -6,6 +6,7 @@ from .check_file_cache import check_file_cache
 from .fetch_files import fetch_files
 from .compute_complexity import compute_complexity
 from .score_skills import score_skills
+from .score_from_languages import is_trivial_repo, score_from_languages
 from .validate_scores import validate_scores
 from .persist import persist
 
@@ -18,6 +19,8 @@ __all__ = [
     "fetch_files",
     "compute_complexity",
     "score_skills",
+    "is_trivial_repo",
+    "score_from_languages",
     "validate_scores",
     "persist",
 ]
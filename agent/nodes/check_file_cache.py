@@ -1,6 +1,7 @@
 """Node: check file_skill_cache for each selected file by (repo, path, blob_sha)."""
 
 import os
+import threading
 
 from agent.state import AgentState
 
@@ -10,6 +11,35 @@ except ImportError:
     create_client = None  # type: ignore[assignment]
 
 
+# One Supabase client per credentials for the process, shared with persist, so
+# runs reuse its open connections instead of reconnecting (TCP + TLS) each time
+_clients: dict[tuple[str, str], object] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(url: str, key: str):
+    """Return the shared Supabase client for (url, key), creating it on first use."""
+    if create_client is None:
+        raise RuntimeError("supabase is not installed")
+    with _clients_lock:
+        client = _clients.get((url, key))
+        if client is None:
+            client = _clients[(url, key)] = create_client(url, key)
+    return client
+
+
+def merge_cache_hit_skills(cache_hits: list, skills: dict | None = None) -> dict[str, int]:
+    """Fold the skill_json of cache hits into skills, keeping the max score per skill."""
+    merged: dict[str, int] = dict(skills or {})
+    for hit in cache_hits:
+        for skill, score in (hit.get("skill_json") or {}).items():
+            try:
+                merged[skill] = max(merged.get(skill, 0), int(score))
+            except (TypeError, ValueError):
+                pass
+    return merged
+
+
 def check_file_cache(state: AgentState) -> dict:
     repo_full_name = state.get("repo_full_name", "")
     selected_files: list = state.get("selected_files", [])
@@ -24,7 +54,7 @@ def check_file_cache(state: AgentState) -> dict:
         return {"cache_hits": [], "cache_misses": selected_files}
 
     try:
-        client = create_client(url, key)
+        client = get_client(url, key)
     except Exception:
         return {"cache_hits": [], "cache_misses": selected_files}
 
@@ -7,7 +7,7 @@ from tools.github import fetch_repo_file_tree
 def fetch_file_tree(state: AgentState) -> dict:
     owner = state["owner"]
     repo_full_name = state["repo_full_name"]
-    repo_name = repo_full_name.split("/", 1)[1]
+    repo_name = repo_full_name.partition("/")[2]
     branch = state.get("default_branch", "main")
 
     result = fetch_repo_file_tree(owner, repo_name, branch)
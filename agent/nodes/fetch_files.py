@@ -1,22 +1,27 @@
 """Node: fetch content for each cache-miss file."""
 
+from concurrent.futures import ThreadPoolExecutor
+
 from agent.state import AgentState
 from tools.github import fetch_repo_file
 
 _MAX_FILE_BYTES = 80_000  # skip files larger than 80 KB
+_MAX_WORKERS = 10         # concurrent GitHub content requests
 
 
 def fetch_files(state: AgentState) -> dict:
     owner = state["owner"]
     repo_full_name = state["repo_full_name"]
-    repo_name = repo_full_name.split("/", 1)[1]
+    repo_name = repo_full_name.partition("/")[2]
     branch = state.get("default_branch", "main")
     cache_misses: list = state.get("cache_misses", [])  # [{"path": str, "blob_sha": str}]
 
+    paths = [file_item["path"] for file_item in cache_misses]
+    with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as pool:
+        results = list(pool.map(lambda p: fetch_repo_file(owner, repo_name, p, branch), paths))
+
     file_contents: dict[str, str] = {}
-    for file_item in cache_misses:
-        path = file_item["path"]
-        result = fetch_repo_file(owner, repo_name, path, branch)
+    for path, result in zip(paths, results):
         if "error" in result:
             continue
         content: str = result.get("content", "")
@@ -1,4 +1,6 @@
-"""Node: fetch repo details + language bytes from GitHub (2 API calls)."""
+"""Node: fetch repo details + language bytes from GitHub (2 concurrent API calls)."""
+
+from concurrent.futures import ThreadPoolExecutor
 
 from agent.state import AgentState
 from tools.github import fetch_repo_details, fetch_repo_languages
@@ -7,13 +9,18 @@ from tools.github import fetch_repo_details, fetch_repo_languages
 def fetch_metadata(state: AgentState) -> dict:
     owner = state["owner"]
     repo_full_name = state["repo_full_name"]
-    repo_name = repo_full_name.split("/", 1)[1]
+    repo_name = repo_full_name.partition("/")[2]
+
+    # the two calls are independent — overlap their round trips
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        details_future = pool.submit(fetch_repo_details, owner, repo_name)
+        languages_future = pool.submit(fetch_repo_languages, owner, repo_name)
+        metadata = details_future.result()
+        languages = languages_future.result()
 
-    metadata = fetch_repo_details(owner, repo_name)
     if "error" in metadata:
         return {"error": metadata["error"], "error_class": "GitHubAPIError"}
 
-    languages = fetch_repo_languages(owner, repo_name)
     if isinstance(languages, dict) and "error" in languages:
         languages = {}
 
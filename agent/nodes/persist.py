@@ -8,22 +8,26 @@ Writes to three tables:
 
 import json
 import os
+import threading
 from datetime import datetime, timezone
 
+from agent.nodes.check_file_cache import get_client, merge_cache_hit_skills
 from agent.state import AgentState
 
 _PROMPT_VERSION = os.environ.get("PROMPT_VERSION", "v1")
 _SCORING_VERSION = os.environ.get("SCORING_VERSION", "v1")
 _MODEL_ID = "gemini-2.5-pro"
+# postgrest's ReturnMethod.minimal (a str enum) as a plain string, so importing
+# this node (and so the graph) doesn't require supabase/postgrest
+_RETURN_MINIMAL = "minimal"
 
 
 def _get_client():
-    from supabase import create_client
     url = os.environ.get("SUPABASE_URL", "")
     key = os.environ.get("SUPABASE_SECRET_KEY", "") or os.environ.get("SUPABASE_KEY", "")
     if not url or not key:
         raise RuntimeError("SUPABASE_URL / SUPABASE_SECRET_KEY not set")
-    return create_client(url, key)
+    return get_client(url, key)
 
 
 def _load_vocabulary(client) -> dict[str, int]:
@@ -34,23 +38,49 @@ def _load_vocabulary(client) -> dict[str, int]:
         return {}
 
 
-def _save_vocabulary(client, vocab: dict[str, int]):
+# skill_vocabulary as last loaded/extended by this process, per client. It is
+# reloaded only when a run brings a skill it doesn't know (another process may
+# have added that skill, or taken the next index, in the meantime).
+_vocabularies: dict[object, dict[str, int]] = {}
+_vocabularies_lock = threading.Lock()
+
+
+def _get_vocabulary(client, skills: dict[str, int], max_dim: int = 200) -> dict[str, int]:
+    with _vocabularies_lock:
+        vocab = _vocabularies.get(client)
+    if vocab is None or (len(vocab) < max_dim and any(name not in vocab for name in skills)):
+        vocab = _load_vocabulary(client)
+        with _vocabularies_lock:
+            _vocabularies[client] = vocab
+    return vocab
+
+
+def _save_vocabulary(client, vocab: dict[str, int]) -> bool:
+    """Upsert vocab entries (callers pass only the ones they added); False if that failed."""
     if not vocab:
-        return
+        return True
     rows = [{"skill_name": name, "idx": idx} for name, idx in vocab.items()]
     try:
-        client.table("skill_vocabulary").upsert(rows, on_conflict="skill_name").execute()
+        client.table("skill_vocabulary").upsert(
+            rows, on_conflict="skill_name", returning=_RETURN_MINIMAL
+        ).execute()
+        return True
     except Exception:
-        pass
+        return False
 
 
-def _skills_to_vector(skills: dict[str, int], vocab: dict[str, int], max_dim: int = 200) -> list[float]:
-    vec = [0.0] * max_dim
+def _skills_to_vector(skills: dict[str, int], vocab: dict[str, int], max_dim: int = 200) -> str:
+    """
+    The skill vector as a pgvector text literal. Mostly zeros, written as "0"
+    rather than JSON's "0.0, ", so the request body carries ~400 bytes instead
+    of ~1 KB for the 200 dimensions.
+    """
+    vec = ["0"] * max_dim
     for name, score in skills.items():
         idx = vocab.get(name)
         if idx is not None and idx < max_dim:
-            vec[idx] = min(1.0, max(0.0, score / 100.0))
-    return vec
+            vec[idx] = f"{min(1.0, max(0.0, score / 100.0)):g}"
+    return "[" + ",".join(vec) + "]"
 
 
 def _extend_vocabulary(existing: dict[str, int], new_skills: dict[str, int], max_dim: int = 200) -> dict[str, int]:
@@ -68,16 +98,11 @@ def persist(state: AgentState) -> dict:
     cache_hits: list = state.get("cache_hits", [])
     cache_misses: list = state.get("cache_misses", [])
     complexity_score: float = state.get("complexity_score", 0.0)
+    model_id: str = state.get("model_id") or _MODEL_ID
 
     # When all files were cache hits, validated_skills is empty — aggregate from hits
     if not validated_skills and cache_hits:
-        aggregated: dict[str, int] = {}
-        for hit in cache_hits:
-            for skill, score in (hit.get("skill_json") or {}).items():
-                try:
-                    aggregated[skill] = max(aggregated.get(skill, 0), int(score))
-                except (TypeError, ValueError):
-                    pass
+        aggregated = merge_cache_hit_skills(cache_hits)
         if not aggregated:
             return {}
         validated_skills = aggregated
@@ -108,14 +133,25 @@ def persist(state: AgentState) -> dict:
                     "analyzed_at": datetime.now(timezone.utc).isoformat(),
                 },
                 on_conflict="repo_full_name,file_path,blob_sha",
+                returning=_RETURN_MINIMAL,
             ).execute()
         except Exception:
             pass  # non-fatal
 
     # --- vocabulary ---
-    vocab = _load_vocabulary(client)
-    vocab = _extend_vocabulary(vocab, validated_skills)
-    _save_vocabulary(client, vocab)
+    vocab = _get_vocabulary(client, validated_skills)
+    extended = _extend_vocabulary(vocab, validated_skills)
+    if len(extended) > len(vocab):
+        if _save_vocabulary(client, {name: idx for name, idx in extended.items() if name not in vocab}):
+            with _vocabularies_lock:
+                _vocabularies[client] = extended
+            vocab = extended
+        else:
+            # Not stored (e.g. another process took those indices): leave the new
+            # skills out of the vector rather than write indices other
+            # processes read as different skills, and reload next run
+            with _vocabularies_lock:
+                _vocabularies.pop(client, None)
 
     skill_vector = _skills_to_vector(validated_skills, vocab)
 
@@ -133,7 +169,7 @@ def persist(state: AgentState) -> dict:
         "repo_hash": "",  # no longer used as cache key
         "prompt_version": _PROMPT_VERSION,
         "scoring_version": _SCORING_VERSION,
-        "model_id": _MODEL_ID,
+        "model_id": model_id,
         "files_examined": files_examined,
         "analyzed_at": now,
         "updated_at": now,
@@ -153,8 +189,10 @@ def persist(state: AgentState) -> dict:
         pass
 
     try:
+        # Nothing is read back, so don't have PostgREST echo the row (and its
+        # 200-float vector) in the response
         client.table("developer_skills").upsert(
-            ds_data, on_conflict="username,repo_name"
+            ds_data, on_conflict="username,repo_name", returning=_RETURN_MINIMAL
         ).execute()
     except Exception as e:
         return {"error": f"DB write failed: {e}", "error_class": "PersistError"}
@@ -165,7 +203,7 @@ def persist(state: AgentState) -> dict:
         "repo_hash": "",  # kept for schema compatibility, no longer a cache key
         "prompt_version": _PROMPT_VERSION,
         "scoring_version": _SCORING_VERSION,
-        "model_id": _MODEL_ID,
+        "model_id": model_id,
         "skill_json": validated_skills,
         "complexity": complexity_int,
         "hits": 0,
@@ -178,6 +216,7 @@ def persist(state: AgentState) -> dict:
         client.table("repo_cache").upsert(
             rc_data,
             on_conflict="repo_full_name,repo_hash,prompt_version,scoring_version,model_id",
+            returning=_RETURN_MINIMAL,
         ).execute()
     except Exception as rc_exc:
         import logging as _log
@@ -0,0 +1,42 @@
+"""Node: deterministic skill vector for trivially small repos (no LLM call).
+
+When GitHub metadata alone is decisive — the repo is tiny — the Pro-tier
+scoring call adds cost without adding signal. Skills are derived from the
+language byte shares instead, capped at the beginner band.
+"""
+
+from agent.nodes.compute_complexity import compute_complexity
+from agent.state import AgentState
+
+TRIVIAL_MAX_SIZE_KB = 50       # GitHub reports repo size in KB
+TRIVIAL_MAX_CODE_BYTES = 10_000
+_MAX_SCORE = 30                # a tiny repo can show at most beginner-level evidence
+# Recorded as model_id by persist, so these rows aren't attributed to the LLM
+HEURISTIC_MODEL_ID = "language-heuristic"
+
+
+def is_trivial_repo(state: AgentState) -> bool:
+    language_bytes: dict = state.get("language_bytes") or {}
+    if not language_bytes:
+        return False  # nothing to score from — let the full pipeline decide
+    # GitHub's size is often 0 or stale right after a push, so it only counts
+    # together with the language bytes, never on its own
+    size_kb = (state.get("repo_metadata") or {}).get("size", 0)
+    return size_kb < TRIVIAL_MAX_SIZE_KB and sum(language_bytes.values()) < TRIVIAL_MAX_CODE_BYTES
+
+
+def score_from_languages(state: AgentState) -> dict:
+    language_bytes: dict = state.get("language_bytes") or {}
+    total_bytes = sum(language_bytes.values())
+
+    skills = [
+        {"name": lang.lower(), "score": max(1, round(_MAX_SCORE * bytes_ / total_bytes))}
+        for lang, bytes_ in language_bytes.items()
+        if bytes_ > 0
+    ]
+
+    return {
+        **compute_complexity(state),
+        "skill_vector": {"skills": skills},
+        "model_id": HEURISTIC_MODEL_ID,
+    }
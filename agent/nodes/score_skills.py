@@ -5,11 +5,15 @@ from pathlib import Path
 
 from langchain_google_genai import ChatGoogleGenerativeAI
 
+from agent.nodes.check_file_cache import merge_cache_hit_skills
 from agent.state import AgentState
 from models.skill_vector import SkillVector
 
 _PROMPT_PATH = Path(__file__).parent.parent.parent / "prompts" / "scoring_v1.md"
 _MODEL_ID = "gemini-2.5-pro"
+# Scoring runs offline (nobody waits on a single call), so default to the
+# cheaper Flex tier; set GEMINI_SERVICE_TIER=standard to opt out.
+_SERVICE_TIER = os.environ.get("GEMINI_SERVICE_TIER", "flex")
 
 
 def _load_prompt() -> str:
@@ -58,19 +62,15 @@ def score_skills(state: AgentState) -> dict:
     )
     structured_llm = llm.with_structured_output(SkillVector)
 
-    result: SkillVector = structured_llm.invoke(prompt)
+    result: SkillVector = structured_llm.invoke(prompt, service_tier=_SERVICE_TIER)
+    # Already validated by with_structured_output; read the fields directly
+    # rather than serialising the whole model again with model_dump()
     fresh_skills: dict[str, int] = {
-        item["name"]: item["score"]
-        for item in (result.model_dump().get("skills") or [])
+        item.name: item.score for item in (result.skills or [])
     }
 
     # Merge cache_hits skill_json — take max per skill so cached strengths are preserved
-    for hit in cache_hits:
-        for skill, score in (hit.get("skill_json") or {}).items():
-            try:
-                fresh_skills[skill] = max(fresh_skills.get(skill, 0), int(score))
-            except (TypeError, ValueError):
-                pass
+    fresh_skills = merge_cache_hit_skills(cache_hits, fresh_skills)
 
     return {
         "skill_vector": {
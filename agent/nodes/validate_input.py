@@ -1,7 +1,15 @@
 """Node: validate and normalise the username / repo inputs."""
 
+import re
+
 from agent.state import AgentState
 
+# GitHub logins: alphanumerics and hyphens, at most 39 chars, no leading hyphen
+_USERNAME_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9-]{0,38}")
+# "repo" or "owner/repo"; repo names allow alphanumerics, "_", "." and "-"
+# but may not be "." or ".."
+_REPO_RE = re.compile(r"(?!\.{1,2}(?:/|$))[A-Za-z0-9_.-]+(?:/(?!\.{1,2}$)[A-Za-z0-9_.-]+)?")
+
 
 def validate_input(state: AgentState) -> dict:
     username: str = state.get("username", "").strip()
@@ -11,9 +19,13 @@ def validate_input(state: AgentState) -> dict:
         return {"error": "username is required", "error_class": "ValidationError"}
     if not repo:
         return {"error": "repo is required", "error_class": "ValidationError"}
+    if not _USERNAME_RE.fullmatch(username):
+        return {"error": f"invalid GitHub username: {username!r}", "error_class": "ValidationError"}
+    if not _REPO_RE.fullmatch(repo):
+        return {"error": f"invalid repository name: {repo!r}", "error_class": "ValidationError"}
 
-    if "/" in repo:
-        owner, repo_name = repo.split("/", 1)
+    owner, sep, repo_name = repo.partition("/")
+    if sep:
         repo_full_name = f"{owner}/{repo_name}"
     else:
         owner = username
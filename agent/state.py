@@ -35,6 +35,7 @@ class AgentState(TypedDict, total=False):
 
     # --- after score_skills ---
     skill_vector: Optional[dict]  # {"skills": [{"name": str, "score": int}]}
+    model_id: str  # only set by score_from_languages; persist falls back to the LLM id
 
     # --- after validate_scores ---
     validated_skills: Optional[dict]  # {name: score (0-100)}
@@ -1,7 +1,26 @@
 """Database package for DevIndex with Supabase."""
 
-from database.db import DatabaseManager
-from database.vector_utils import merge_skill_vectors, skills_to_vector
+from importlib import import_module
 
-__all__ = ["DatabaseManager", "merge_skill_vectors", "skills_to_vector"]
+__all__ = ["AsyncDatabaseManager", "DatabaseManager", "merge_skill_vectors", "skills_to_vector"]
 
+# Re-exports are resolved on first access so that importing a submodule
+# (e.g. database.logger) does not pull in the Supabase client.
+_LAZY_EXPORTS = {
+    "AsyncDatabaseManager": ".db_async",
+    "DatabaseManager": ".db",
+    "merge_skill_vectors": ".vector_utils",
+    "skills_to_vector": ".vector_utils",
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_EXPORTS:
+        value = getattr(import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,21 +1,331 @@
 """Database connection and operations using Supabase Python client."""
 
+import functools
+import importlib.util
 import os
+import random
+import threading
 import time
-from datetime import datetime, timezone
-from typing import Dict, Optional, List
-from supabase import create_client, Client
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, List, Tuple
+import httpx
+from postgrest.exceptions import APIError
+from supabase import ClientOptions, create_client, Client
 from database.vector_utils import (
-    merge_skill_vectors,
-    skills_to_vector,
-    build_vocabulary_from_db,
+    merge_skill_vectors_into,
+    skills_to_sparse,
+    build_vocabulary_from_counts,
+    encode_batch,
+    format_sparse,
     load_vocabulary_from_supabase,
+    persist_skill_indices,
+    persisted_skills,
+    unpersisted_skill_names,
 )
 from database.logger import get_db_logger
 
-# Initialize logger immediately when module is imported
+# The logger's file and listener thread are only set up on the first record
 logger = get_db_logger("db")
-logger.debug("Database module (db.py) imported and logger initialized")
+
+# numpy (optional) for the vectorized filter_by_skills; imported on first use
+# since most processes never take that path. False once found missing.
+_np = None
+
+
+def _numpy():
+    global _np
+    if _np is None:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:
+            _np = False
+    return _np or None
+
+# One Supabase client (and its HTTP connection pool) per (url, key) for the
+# whole process, shared by every DatabaseManager instance
+_CLIENT_CACHE: Dict[Tuple[str, str], Client] = {}
+_CLIENT_LOCK = threading.Lock()
+
+# HTTP/2 lets concurrent PostgREST requests share one connection; it needs
+# the h2 package (httpx[http2]), so fall back to HTTP/1.1 without it
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+HTTP_TIMEOUT = 120  # supabase-py's default postgrest_client_timeout
+
+
+def get_shared_client(supabase_url: str, supabase_key: str) -> Client:
+    key = (supabase_url, supabase_key)
+    with _CLIENT_LOCK:
+        client = _CLIENT_CACHE.get(key)
+        if client is None:
+            http_client = httpx.Client(http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+            client = create_client(supabase_url, supabase_key, options=ClientOptions(httpx_client=http_client))
+            _CLIENT_CACHE[key] = client
+            logger.info("Initialized Supabase client for: %s", supabase_url)
+    return client
+
+# Columns returned by list/search queries: everything but the 200-float
+# skill_vector, which callers fetch per record with get_vector()
+LIST_COLUMNS = "id, username, repo_name, skill_json, updated_at"
+
+# Columns read back from the upsert RPCs; the written vector is not echoed
+WRITE_COLUMNS = "id, username, repo_name, user_id, skill_json, updated_at"
+
+# Short-lived read cache for get_skill_vector / get_all_repos_for_user, shared
+# by every DatabaseManager and AsyncDatabaseManager in the process. Keys are
+# (method, username, ...); a save drops every entry for that username.
+# Cached records are shared objects - callers must not mutate them.
+_READ_CACHE_TTL = 60.0
+_READ_CACHE_MAXSIZE = 10_000
+_read_cache: "OrderedDict[tuple, Tuple[float, Any]]" = OrderedDict()
+# Cached keys per username (key[1]), so a save drops its entries without a scan
+_read_keys_by_user: Dict[str, set] = {}
+# Bumped by invalidate_reads; a fetch started before a save must not cache
+# what it read (see read_generation). Only invalidated usernames get an entry.
+_read_generations: Dict[str, int] = {}
+_read_cache_lock = threading.RLock()
+
+
+def cache_lookup(key: tuple) -> Tuple[bool, Any]:
+    """(True, value) if key has a fresh cached value, else (False, None)."""
+    with _read_cache_lock:
+        hit = _read_cache.get(key)
+        if hit is not None and hit[0] > time.monotonic():
+            _read_cache.move_to_end(key)
+            return True, hit[1]
+    return False, None
+
+
+def read_generation(username: str) -> int:
+    """Invalidation count for username; take it before fetching and pass it to cache_store."""
+    with _read_cache_lock:
+        return _read_generations.get(username, 0)
+
+
+def cache_store(key: tuple, value: Any, generation: int):
+    """Cache value for key unless key's username was invalidated since generation was read."""
+    with _read_cache_lock:
+        if _read_generations.get(key[1], 0) != generation:
+            return
+        _read_cache[key] = (time.monotonic() + _READ_CACHE_TTL, value)
+        _read_cache.move_to_end(key)
+        _read_keys_by_user.setdefault(key[1], set()).add(key)
+        while len(_read_cache) > _READ_CACHE_MAXSIZE:
+            evicted, _ = _read_cache.popitem(last=False)
+            _forget_key(evicted)
+
+
+def _forget_key(key: tuple):
+    """Drop key from _read_keys_by_user (caller holds _read_cache_lock)."""
+    keys = _read_keys_by_user.get(key[1])
+    if keys is not None:
+        keys.discard(key)
+        if not keys:
+            del _read_keys_by_user[key[1]]
+
+
+def _cached_read(key: tuple, fetch: Callable[[], Any]) -> Any:
+    """Return a fresh cached value for key, or call fetch() and cache it (errors are not cached)."""
+    found, value = cache_lookup(key)
+    if not found:
+        generation = read_generation(key[1])
+        value = fetch()
+        cache_store(key, value, generation)
+    return value
+
+
+def invalidate_reads(*usernames: str):
+    """Drop every cached read for these usernames (cost proportional to their entries)."""
+    with _read_cache_lock:
+        for username in usernames:
+            _read_generations[username] = _read_generations.get(username, 0) + 1
+            for key in _read_keys_by_user.pop(username, ()):
+                _read_cache.pop(key, None)
+
+
+def resolve_credentials(supabase_url: Optional[str] = None, supabase_key: Optional[str] = None) -> Tuple[str, str]:
+    """Fill in missing Supabase credentials from the environment (raises ValueError if unset)."""
+    if supabase_url is None:
+        supabase_url = os.environ.get("SUPABASE_URL")
+        if not supabase_url:
+            error_msg = "SUPABASE_URL environment variable not set"
+            logger.error(error_msg)
+            raise ValueError(
+                f"{error_msg}. "
+                "Format: https://<project-ref>.supabase.co"
+            )
+    
+    if supabase_key is None:
+        supabase_key = (
+            os.environ.get("SUPABASE_SECRET_KEY")
+            or os.environ.get("SUPABASE_KEY")
+        )
+        if not supabase_key:
+            error_msg = "SUPABASE_SECRET_KEY environment variable not set"
+            logger.error(error_msg)
+            raise ValueError(
+                f"{error_msg}. "
+                "Get it from Supabase Dashboard -> Settings -> API -> secret key"
+            )
+    return supabase_url, supabase_key
+
+
+# Transport failures worth retrying; the builtins cover asyncpg/socket errors
+RETRYABLE_EXC = (
+    httpx.TimeoutException,
+    httpx.ConnectError,
+    httpx.RemoteProtocolError,
+    ConnectionError,
+    TimeoutError,
+)
+# HTTP statuses worth retrying. postgrest-py puts the status in APIError.code
+# when the gateway answers with a non-JSON body (e.g. a 502 page)
+RETRYABLE_STATUS = frozenset({"408", "429", "502", "503", "504"})
+
+
+MAX_ATTEMPTS = 3
+RETRY_DELAY = 2.0  # seconds before the first retry
+MAX_RETRY_DELAY = 30.0
+
+
+def is_retryable_error(e: Exception) -> bool:
+    """Whether e is a transient transport/gateway failure."""
+    if isinstance(e, RETRYABLE_EXC):
+        return True
+    return isinstance(e, APIError) and str(e.code) in RETRYABLE_STATUS
+
+
+def backoff_delay(retry_delay: float, attempt: int) -> float:
+    """Exponential backoff with +/-50% jitter so retrying workers spread out."""
+    return min(random.uniform(0.5, 1.5) * retry_delay * (2 ** attempt), MAX_RETRY_DELAY)
+
+
+def retry_db(func: Callable) -> Callable:
+    """Retry func on transient errors (is_retryable_error) with jittered backoff."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                if attempt == MAX_ATTEMPTS - 1 or not is_retryable_error(e):
+                    raise
+                wait_time = backoff_delay(RETRY_DELAY, attempt)
+                logger.warning(
+                    "Error on attempt %d/%d: %s. Retrying in %.1f seconds...",
+                    attempt + 1, MAX_ATTEMPTS, e, wait_time,
+                )
+                time.sleep(wait_time)
+    return wrapper
+
+
+@retry_db
+def _execute(builder):
+    """Run a PostgREST query builder, retrying transient failures."""
+    return builder.execute()
+
+
+@retry_db
+def _get_rows(session: httpx.Client, url: str, headers: Dict[str, str], params: Dict[str, str]) -> List[dict]:
+    """GET a PostgREST table URL on the client's session, without a query builder."""
+    response = session.get(url, headers=headers, params=params)
+    if not response.is_success:
+        # Same shape postgrest-py raises, so is_retryable_error applies
+        raise APIError({"message": response.text, "code": response.status_code})
+    return response.json()
+
+
+def _merge_is_noop(existing: dict, new_skills: Dict[str, int]) -> bool:
+    """Whether merging new_skills into a stored row leaves it unchanged (see migration 016)."""
+    if existing.get("skill_vector") is None:
+        return False
+    stored = existing.get("skill_json") or {}
+    return all(skill in stored and stored[skill] >= score for skill, score in new_skills.items())
+
+
+# Below this many records the NumPy setup costs more than the Python loop
+_VECTORIZE_MIN_RECORDS = 64
+
+
+def _skill_score(skill_json: dict, skill_name: str) -> float:
+    value = skill_json.get(skill_name, 0)
+    # Non-numeric scores never satisfy a filter
+    return value if isinstance(value, (int, float)) else float("-inf")
+
+
+def filter_by_skills(records: List[dict], skill_filters: Dict[str, int], limit: int) -> List[dict]:
+    """Keep records whose skill_json meets every minimum score, up to limit."""
+    np = _numpy() if skill_filters and len(records) >= _VECTORIZE_MIN_RECORDS else None
+    if np is not None:
+        keys = list(skill_filters)
+        thresholds = np.array([skill_filters[key] for key in keys], dtype=float)
+        values = np.array(
+            [[_skill_score(record.get("skill_json") or {}, key) for key in keys] for record in records],
+            dtype=float,
+        )
+        matches = np.flatnonzero((values >= thresholds).all(axis=1))[:limit]
+        return [records[i] for i in matches]
+    
+    filtered_results = []
+    for record in records:
+        skill_json = record.get("skill_json") or {}
+        matches_all = True
+        
+        # Check if record matches all skill filters
+        for skill_name, min_score in skill_filters.items():
+            skill_value = skill_json.get(skill_name, 0)
+            if not isinstance(skill_value, (int, float)) or skill_value < min_score:
+                matches_all = False
+                break
+        
+        if matches_all:
+            filtered_results.append(record)
+            if len(filtered_results) >= limit:
+                break
+    
+    return filtered_results
+
+
+def build_batch_rows(
+    items: List[Tuple[str, str, Dict[str, int]]],
+    user_ids: Dict[str, str],
+    max_dimensions: int = 200,
+) -> List[dict]:
+    """
+    Build the p_rows payload for the batch_upsert_skills RPC.
+    
+    Items for the same (username, repo_name) are merged first with
+    max(old_score, new_score), since one upsert statement cannot touch a row twice.
+    Vectors only hold skills with a stored skill_vocabulary index (call
+    persist_skill_indices first); a row with none of those gets no vector.
+    """
+    merged: Dict[Tuple[str, str], Dict[str, int]] = {}
+    for username, repo_name, skills in items:
+        key = (username, repo_name)
+        if key in merged:
+            # Already a private copy: merge in place rather than copy per duplicate
+            merge_skill_vectors_into(merged[key], skills)
+        else:
+            merged[key] = dict(skills)
+    
+    # Canonical key order, as in save_or_update_skill_vector; then encode every
+    # row against the vocabulary in one pass
+    keys = list(merged)
+    skill_dicts = [dict(sorted(merged[key].items())) for key in keys]
+    indptr, indices, values = encode_batch([persisted_skills(skills) for skills in skill_dicts], max_dimensions)
+    
+    rows = []
+    for i, ((username, repo_name), skills) in enumerate(zip(keys, skill_dicts)):
+        start, end = indptr[i], indptr[i + 1]
+        rows.append({
+            "username": username,
+            "repo_name": repo_name,
+            "user_id": user_ids.get(username),
+            "skill_json": skills,
+            "skill_vector": format_sparse(indices[start:end], values[start:end], max_dimensions) if end > start else None,
+        })
+    return rows
 
 
 class DatabaseManager:
@@ -31,36 +341,20 @@ class DatabaseManager:
             supabase_key: Supabase service role key (for server-side operations)
                          If None, reads from SUPABASE_KEY environment variable.
         """
-        if supabase_url is None:
-            supabase_url = os.environ.get("SUPABASE_URL")
-            if not supabase_url:
-                error_msg = "SUPABASE_URL environment variable not set"
-                logger.error(error_msg)
-                raise ValueError(
-                    f"{error_msg}. "
-                    "Format: https://<project-ref>.supabase.co"
-                )
-        
-        if supabase_key is None:
-            supabase_key = (
-                os.environ.get("SUPABASE_SECRET_KEY")
-                or os.environ.get("SUPABASE_KEY")
-            )
-            if not supabase_key:
-                error_msg = "SUPABASE_SECRET_KEY environment variable not set"
-                logger.error(error_msg)
-                raise ValueError(
-                    f"{error_msg}. "
-                    "Get it from Supabase Dashboard -> Settings -> API -> secret key"
-                )
+        supabase_url, supabase_key = resolve_credentials(supabase_url, supabase_key)
         
-        # Create Supabase client
+        # Reuse the process-wide Supabase client for these credentials
         try:
-            self.client: Client = create_client(supabase_url, supabase_key)
-            logger.info(f"Initialized Supabase client for: {supabase_url}")
-            logger.debug("Supabase client created successfully")
+            self.client: Client = get_shared_client(supabase_url, supabase_key)
+            # Prebuilt URL and auth headers for the plain table reads below,
+            # which skip the PostgREST builder chain
+            postgrest = self.client.postgrest
+            self._rest: httpx.Client = postgrest.session
+            self._rest_headers = dict(postgrest.headers)
+            self._skills_url = str(postgrest.base_url.joinpath("developer_skills"))
+            logger.debug("Supabase client ready")
         except Exception as e:
-            logger.error(f"Failed to create Supabase client: {e}", exc_info=True)
+            logger.error("Failed to create Supabase client: %s", e, exc_info=True)
             raise
     
     def create_tables(self):
@@ -80,25 +374,41 @@ class DatabaseManager:
         logger.warning("Table dropping should be done via Supabase SQL Editor")
     
     def initialize_vocabulary(self, max_dimensions: int = 200):
-        """Load vocabulary from skill_vocabulary table (DB-backed, survives restarts)."""
+        """
+        Load vocabulary from skill_vocabulary table (DB-backed, survives restarts).
+        
+        If that table is empty, seeds the vocabulary from the skills already in
+        developer_skills, counted server-side by the skill_key_counts RPC
+        (migrations/023_skill_key_counts.sql) so only ~max_dimensions
+        (name, count) rows are transferred instead of every skill_json, and
+        writes the seeded indices to skill_vocabulary.
+        """
         try:
-            load_vocabulary_from_supabase(self.client, max_dimensions)
-            logger.debug("Vocabulary loaded from skill_vocabulary table")
+            if load_vocabulary_from_supabase(self.client, max_dimensions):
+                logger.debug("Vocabulary loaded from skill_vocabulary table")
+                return
+            response = _execute(self.client.rpc("skill_key_counts", {"max_dims": max_dimensions}))
+            names = build_vocabulary_from_counts(response.data or [], max_dimensions)
+            persist_skill_indices(self.client, names, max_dimensions)
+            logger.debug("Vocabulary built from %d skill counts", len(response.data or []))
         except Exception as e:
-            logger.warning(f"Vocabulary initialization failed (non-critical): {e}")
+            logger.warning("Vocabulary initialization failed (non-critical): %s", e)
     
     def save_or_update_skill_vector(
         self,
         username: str,
         repo_name: str,
         new_skills: Dict[str, int],
-        max_dimensions: int = 200
+        max_dimensions: int = 200,
+        prefetched: Optional[Dict[Tuple[str, str], dict]] = None
     ) -> dict:
         """
         Save or update skill vector for a developer and repository.
         
         Merges with existing vector using max(old_score, new_score) for existing skills
-        and adds new skills.
+        and adds new skills. The merge runs server-side in the upsert_developer_skill
+        RPC, so a save is a single INSERT ... ON CONFLICT statement; a save that
+        would not change the stored scores leaves the row untouched.
         
         Example:
             Existing: {"javascript": 20, "react": 50}
@@ -110,97 +420,113 @@ class DatabaseManager:
             repo_name: Repository name that was analyzed
             new_skills: Dictionary of new skills and scores from current analysis
             max_dimensions: Maximum vector dimensions
+            prefetched: Rows from prefetch_existing(). A prefetched row supplies
+                        user_id (no profiles lookup), and if the merge would not
+                        change it the row is returned without a write.
             
         Returns:
             Dictionary with saved record data (includes 'id' field)
         """
-        logger.info(f"Saving skill vector - Username: {username}, Repo: {repo_name}, Skills: {len(new_skills)}")
-        logger.debug(f"New skills: {new_skills}")
+        logger.info("Saving skill vector - Username: %s, Repo: %s, Skills: %d", username, repo_name, len(new_skills))
+        logger.debug("New skills: %s", new_skills)
+        # Sorted keys: identical skill sets give identical payloads, and new
+        # skills get vocabulary indices in a stable order
+        new_skills = dict(sorted(new_skills.items()))
         
-        # Retry logic for transient failures
-        max_retries = 3
-        retry_delay = 2  # Start with 2 seconds
+        existing = prefetched.get((username, repo_name)) if prefetched else None
+        if existing and existing.get("user_id") and _merge_is_noop(existing, new_skills):
+            logger.debug("No score increases for %s/%s, skipping write", username, repo_name)
+            return existing
         
-        for attempt in range(max_retries):
-            try:
-                # Try to find existing record
-                existing_response = self.client.table("developer_skills").select("*").eq(
-                    "username", username
-                ).eq("repo_name", repo_name).execute()
-                
-                existing = existing_response.data[0] if existing_response.data else None
-                
-                if existing and existing.get("skill_json"):
-                    # Merge with existing: max(old_score, new_score) for existing skills
-                    old_skills = existing.get("skill_json") or {}
-                    merged_skills = merge_skill_vectors(old_skills, new_skills)
-                    logger.info(f"Merging with existing vector - Found {len(old_skills)} existing skills, {len(new_skills)} new skills, {len(merged_skills)} merged")
-                    logger.debug(f"Old skills: {old_skills}, New skills: {new_skills}, Merged: {merged_skills}")
-                else:
-                    # No existing record, use new skills as-is
-                    merged_skills = new_skills.copy()
-                    logger.info(f"Creating new vector (no existing record found)")
-                
-                # Convert merged skills to vector
-                vector = None
-                try:
-                    vector = skills_to_vector(merged_skills, max_dimensions)
-                    logger.debug(f"Vector created: {len(vector)} dimensions")
-                except Exception as vec_error:
-                    logger.warning(f"Vector conversion failed: {vec_error}", exc_info=True)
-                    # Continue without vector - skill_json is more important
-                user_id = self.client.table("profiles").select("user_id").eq("github_username", username).single().execute().data["user_id"]
-                # Prepare data for insert/update
-                # Note: id, created_at, and updated_at have defaults in the database schema
-                # We only need to set updated_at explicitly on UPDATE
-                data = {
-                    "username": username,
-                    "repo_name": repo_name,
-                    "user_id": user_id,
-                    "skill_json": merged_skills,
-                }
-                
-                if vector is not None:
-                    data["skill_vector"] = vector
-                
-                if existing:
-                    # Update existing record
-                    # Set updated_at to current timestamp (database default only applies on INSERT)
-                    data["updated_at"] = datetime.now(timezone.utc).isoformat()
-                    
-                    logger.info(f"Updating existing record (ID: {existing.get('id')})")
-                    update_response = self.client.table("developer_skills").update(data).eq(
-                        "id", existing["id"]
-                    ).execute()
-                    
-                    result = update_response.data[0] if update_response.data else existing
-                    logger.info(f"✓ Record updated successfully! ID: {result.get('id')}, Skills: {len(merged_skills)}")
-                    return result
-                else:
-                    # Create new record
-                    # id, created_at, and updated_at will use database defaults
-                    logger.info(f"Creating new record")
-                    insert_response = self.client.table("developer_skills").insert(data).execute()
-                    
-                    result = insert_response.data[0] if insert_response.data else data
-                    logger.info(f"✓ Record created successfully! ID: {result.get('id')}, Skills: {len(merged_skills)}")
-                    return result
-                    
-            except Exception as e:
-                error_str = str(e).lower()
-                is_retryable = "timeout" in error_str or "connection" in error_str or "network" in error_str
-                
-                if attempt < max_retries - 1 and is_retryable:
-                    wait_time = retry_delay * (2 ** attempt)  # Exponential backoff
-                    logger.warning(
-                        f"Error on attempt {attempt + 1}/{max_retries}: {e}. "
-                        f"Retrying in {wait_time} seconds..."
-                    )
-                    time.sleep(wait_time)
-                    continue
-                else:
-                    logger.error(f"Error in save_or_update_skill_vector after {attempt + 1} attempts: {e}", exc_info=True)
-                    raise
+        # Convert new skills to a sparse vector (only the scored entries go over
+        # the wire); the RPC densifies it and merges it with the stored vector
+        # element-wise, same as the skill_json merge. That is only sound when
+        # every index means the same skill in every process, so new skills are
+        # written to skill_vocabulary first and unstored ones are left out.
+        vector = None
+        try:
+            persist_skill_indices(self.client, new_skills, max_dimensions)
+            indexed = persisted_skills(new_skills)
+            vector = skills_to_sparse(indexed, max_dimensions) if indexed else None
+            logger.debug("Vector created: %s", vector)
+        except Exception as vec_error:
+            logger.warning("Vector conversion failed: %s", vec_error)
+            # Continue without vector - skill_json is more important;
+            # the RPC keeps the stored vector when none is sent
+        
+        # Retries transient failures itself (retry_db)
+        try:
+            # Single round trip: INSERT ... ON CONFLICT merges skill_json with
+            # max(old_score, new_score) server-side (see
+            # migrations/012_upsert_developer_skill.sql), and resolves user_id
+            # from profiles when none is passed (024)
+            upsert_response = _execute(self.client.rpc(
+                "upsert_developer_skill",
+                {
+                    "p_username": username,
+                    "p_repo": repo_name,
+                    "p_new": new_skills,
+                    "p_sparse": vector,
+                    "p_user_id": existing.get("user_id") if existing else None,
+                },
+            ).select(WRITE_COLUMNS))
+        except Exception as e:
+            logger.error("Error in save_or_update_skill_vector: %s", e, exc_info=True)
+            raise
+        invalidate_reads(username)
+        
+        result = upsert_response.data[0] if upsert_response.data else {
+            "username": username,
+            "repo_name": repo_name,
+            "skill_json": new_skills,
+        }
+        logger.info("✓ Record saved successfully! ID: %s, Skills: %d", result.get("id"), len(result.get("skill_json") or {}))
+        return result
+    
+    def prefetch_existing(self, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], dict]:
+        """
+        Fetch the stored rows for many (username, repo_name) pairs in one query.
+        
+        Pass the result as prefetched= to save_or_update_skill_vector when
+        saving many repos in a loop, instead of one lookup per save.
+        
+        Returns:
+            Dict mapping (username, repo_name) to the stored row; missing pairs
+            are absent
+        """
+        if not keys:
+            return {}
+        pairs = [{"username": username, "repo_name": repo_name} for username, repo_name in set(keys)]
+        response = _execute(self.client.rpc("fetch_existing_skills", {"pairs": pairs}))
+        return {(row["username"], row["repo_name"]): row for row in response.data or []}
+    
+    def save_or_update_skill_vectors_batch(
+        self,
+        items: List[Tuple[str, str, Dict[str, int]]],
+        max_dimensions: int = 200
+    ) -> List[dict]:
+        """
+        Save or update many skill vectors with one batch_upsert_skills RPC.
+        
+        Same merge semantics as save_or_update_skill_vector, but N rows cost one
+        upsert round trip instead of N (user_ids are resolved server-side).
+        
+        Args:
+            items: (username, repo_name, skills) tuples
+            max_dimensions: Maximum vector dimensions
+            
+        Returns:
+            List of saved record dictionaries
+        """
+        if not items:
+            return []
+        usernames = {username for username, _, _ in items}
+        persist_skill_indices(self.client, unpersisted_skill_names(skills for _, _, skills in items), max_dimensions)
+        rows = build_batch_rows(items, {}, max_dimensions)
+        response = _execute(self.client.rpc("batch_upsert_skills", {"p_rows": rows}).select(WRITE_COLUMNS))
+        invalidate_reads(*usernames)
+        logger.info("✓ Batch saved %d skill vectors", len(rows))
+        return response.data or []
     
     def get_skill_vector(
         self,
@@ -217,19 +543,35 @@ class DatabaseManager:
         Returns:
             Dictionary with skill vector data, or None if not found
         """
-        try:
-            query = self.client.table("developer_skills").select("*").eq("username", username)
-            
+        def fetch() -> Optional[dict]:
+            params = {"select": "*", "username": f"eq.{username}", "limit": "1"}
             if repo_name:
-                query = query.eq("repo_name", repo_name)
-            
-            response = query.limit(1).execute()
-            
-            if response.data:
-                return response.data[0]
+                params["repo_name"] = f"eq.{repo_name}"
+            rows = _get_rows(self._rest, self._skills_url, self._rest_headers, params)
+            return rows[0] if rows else None
+        
+        try:
+            return _cached_read(("get_skill_vector", username, repo_name), fetch)
+        except Exception as e:
+            logger.error("Error getting skill vector: %s", e, exc_info=True)
             return None
+    
+    def get_vector(self, record_id: str) -> Optional[List[float]]:
+        """
+        Get only the skill_vector of one record (list queries leave it out).
+        
+        Args:
+            record_id: developer_skills row id
+            
+        Returns:
+            The vector as a list of floats, or None if not found
+        """
+        try:
+            params = {"select": "skill_vector", "id": f"eq.{record_id}", "limit": "1"}
+            rows = _get_rows(self._rest, self._skills_url, self._rest_headers, params)
+            return rows[0]["skill_vector"] if rows else None
         except Exception as e:
-            logger.error(f"Error getting skill vector: {e}", exc_info=True)
+            logger.error("Error getting vector: %s", e, exc_info=True)
             return None
     
     def get_all_repos_for_user(self, username: str) -> List[dict]:
@@ -242,11 +584,14 @@ class DatabaseManager:
         Returns:
             List of skill vector dictionaries
         """
+        def fetch() -> List[dict]:
+            params = {"select": LIST_COLUMNS, "username": f"eq.{username}"}
+            return _get_rows(self._rest, self._skills_url, self._rest_headers, params)
+        
         try:
-            response = self.client.table("developer_skills").select("*").eq("username", username).execute()
-            return response.data or []
+            return _cached_read(("get_all_repos_for_user", username), fetch)
         except Exception as e:
-            logger.error(f"Error getting repos for user: {e}", exc_info=True)
+            logger.error("Error getting repos for user: %s", e, exc_info=True)
             return []
     
     def search_by_skills(
@@ -258,8 +603,9 @@ class DatabaseManager:
         """
         Search developers by skills using JSONB queries.
         
-        Note: Complex JSONB filtering may require RPC functions in Supabase.
-        This implementation fetches records and filters in Python for simplicity.
+        Filtering runs server-side in the search_by_min_skills RPC
+        (migrations/014_search_by_min_skills.sql). If that function is not
+        deployed yet, falls back to fetching records and filtering in Python.
         
         Args:
             skill_filters: Dictionary of skills and minimum scores,
@@ -270,39 +616,29 @@ class DatabaseManager:
         Returns:
             List of developer skill vectors matching the criteria
         """
+        try:
+            response = _execute(self.client.rpc(
+                "search_by_min_skills",
+                {"filters": skill_filters, "lim": limit, "repo": repo_name},
+            ).select(LIST_COLUMNS))
+            return response.data or []
+        except Exception as rpc_error:
+            logger.warning("search_by_min_skills RPC failed, filtering in Python: %s", rpc_error)
+        
         try:
             # Start with base query
-            query = self.client.table("developer_skills").select("*")
+            query = self.client.table("developer_skills").select(LIST_COLUMNS)
             
             # Optional repository filter (simple equality filter)
             if repo_name:
                 query = query.eq("repo_name", repo_name)
             
-            # Fetch records (PostgREST JSONB filtering is complex, so we filter in Python)
-            # For better performance with large datasets, consider creating an RPC function
-            response = query.limit(limit * 2).execute()  # Fetch more to account for filtering
+            response = _execute(query.limit(limit * 2))  # Fetch more to account for filtering
             
             # Filter by skills in Python
-            filtered_results = []
-            for record in response.data or []:
-                skill_json = record.get("skill_json") or {}
-                matches_all = True
-                
-                # Check if record matches all skill filters
-                for skill_name, min_score in skill_filters.items():
-                    skill_value = skill_json.get(skill_name, 0)
-                    if not isinstance(skill_value, (int, float)) or skill_value < min_score:
-                        matches_all = False
-                        break
-                
-                if matches_all:
-                    filtered_results.append(record)
-                    if len(filtered_results) >= limit:
-                        break
-            
-            return filtered_results
+            return filter_by_skills(response.data or [], skill_filters, limit)
         except Exception as e:
-            logger.error(f"Error searching by skills: {e}", exc_info=True)
+            logger.error("Error searching by skills: %s", e, exc_info=True)
             return []
     
     def search_by_vector_similarity(
@@ -314,8 +650,8 @@ class DatabaseManager:
         """
         Search developers using vector similarity (cosine similarity).
         
-        Requires pgvector extension and vector indexes in Supabase.
-        Note: This requires using RPC functions in Supabase for vector similarity search.
+        Runs the match_developer_skills RPC (migrations/015_match_developer_skills.sql),
+        which orders by pgvector cosine distance using the HNSW index.
         
         Args:
             query_vector: Query vector to compare against
@@ -323,20 +659,17 @@ class DatabaseManager:
             similarity_threshold: Minimum similarity score (0-1)
             
         Returns:
-            List of developer skill vectors sorted by similarity
+            List of developer skill records (without skill_vector) with a
+            'similarity' field, most similar first
         """
         try:
-            # For vector similarity, we need to use a Postgres function
-            # This is a simplified version - you may need to create a function in Supabase
-            # that performs the vector similarity search
-            logger.warning("Vector similarity search requires custom Postgres function")
-            logger.warning("This feature needs to be implemented with a Supabase RPC function")
-            
-            # For now, return empty list
-            # TODO: Implement with Supabase RPC function for vector similarity
-            return []
+            response = _execute(self.client.rpc(
+                "match_developer_skills",
+                {"query": query_vector, "k": limit, "thresh": similarity_threshold},
+            ))
+            return response.data or []
         except Exception as e:
-            logger.error(f"Error in vector similarity search: {e}", exc_info=True)
+            logger.error("Error in vector similarity search: %s", e, exc_info=True)
             return []
     
     def get_all_developers(self, limit: int = 100) -> List[dict]:
@@ -350,8 +683,45 @@ class DatabaseManager:
             List of all developer skill vectors
         """
         try:
-            response = self.client.table("developer_skills").select("*").limit(limit).execute()
-            return response.data or []
+            params = {"select": LIST_COLUMNS, "limit": str(limit)}
+            return _get_rows(self._rest, self._skills_url, self._rest_headers, params)
         except Exception as e:
-            logger.error(f"Error getting all developers: {e}", exc_info=True)
+            logger.error("Error getting all developers: %s", e, exc_info=True)
             return []
+
+
+class BatchWriter:
+    """
+    Buffers skill-vector saves and writes them with save_or_update_skill_vectors_batch.
+    
+    Flushes automatically every flush_size rows and on context-manager exit:
+    
+        with BatchWriter(db) as writer:
+            for username, repo, skills in results:
+                writer.add(username, repo, skills)
+    """
+    
+    def __init__(self, db: DatabaseManager, flush_size: int = 500, max_dimensions: int = 200):
+        self.db = db
+        self.flush_size = flush_size
+        self.max_dimensions = max_dimensions
+        self._pending: List[Tuple[str, str, Dict[str, int]]] = []
+    
+    def add(self, username: str, repo_name: str, skills: Dict[str, int]):
+        self._pending.append((username, repo_name, skills))
+        if len(self._pending) >= self.flush_size:
+            self.flush()
+    
+    def flush(self) -> List[dict]:
+        if not self._pending:
+            return []
+        items, self._pending = self._pending, []
+        return self.db.save_or_update_skill_vectors_batch(items, self.max_dimensions)
+    
+    def __enter__(self) -> "BatchWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        # Don't write a partial batch over the top of an error
+        if exc_type is None:
+            self.flush()
@@ -0,0 +1,479 @@
+"""Async database operations using the Supabase async client.
+
+Mirrors the hot read/write paths of DatabaseManager for async callers
+(FastAPI/aiohttp handlers) so queries await instead of blocking a thread.
+
+When asyncpg is installed and DATABASE_URL is set, the hot paths
+(save_or_update_skill_vector, get_skill_vector, search_by_skills) talk to
+Postgres directly over a connection pool instead of going through PostgREST.
+"""
+
+import asyncio
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import httpx
+from supabase import AsyncClient, AsyncClientOptions, acreate_client
+
+try:
+    import asyncpg
+except ImportError:  # optional: direct Postgres access for hot paths
+    asyncpg = None
+
+try:
+    import orjson
+
+    def _json_dumps(value) -> str:
+        return orjson.dumps(value).decode()
+
+    _json_loads = orjson.loads
+except ImportError:  # optional: faster jsonb encode/decode on the asyncpg path
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
+from database.db import (
+    HTTP2_AVAILABLE,
+    HTTP_LIMITS,
+    HTTP_TIMEOUT,
+    LIST_COLUMNS,
+    MAX_ATTEMPTS,
+    WRITE_COLUMNS,
+    RETRY_DELAY,
+    backoff_delay,
+    build_batch_rows,
+    cache_lookup,
+    cache_store,
+    filter_by_skills,
+    get_shared_client,
+    invalidate_reads,
+    is_retryable_error,
+    read_generation,
+    resolve_credentials,
+)
+from database.logger import get_db_logger
+from database.vector_utils import (
+    persist_skill_indices,
+    persisted_skills,
+    skills_to_sparse,
+    unpersisted_skill_names,
+)
+
+logger = get_db_logger("db_async")
+
+# Sized for Supabase's connection caps: DB_POOL_SIZE connections stay open,
+# up to DB_POOL_OVERFLOW more under load, closed again after _POOL_MAX_IDLE s idle
+_POOL_MIN_SIZE = int(os.environ.get("DB_POOL_SIZE", "3"))
+_POOL_MAX_SIZE = _POOL_MIN_SIZE + int(os.environ.get("DB_POOL_OVERFLOW", "2"))
+_POOL_MAX_IDLE = 300.0
+
+# Supabase's transaction-mode pooler (Supavisor); 5432 is a direct/session connection
+_TRANSACTION_POOLER_PORT = 6543
+
+# postgres[ql]://user[:password]@host[:port][/db][?params]
+_DATABASE_URL_RE = re.compile(
+    r"^(?P<scheme>postgres(?:ql)?)://(?:(?P<user>[^:@/]*)(?P<password>:[^/?#]*)?@)?"
+    r"(?P<host>[^:/?]+)(?::(?P<port>\d+))?(?P<rest>[/?].*)?$"
+)
+# libpq also accepts the password as a query parameter (?password=...)
+_QUERY_PASSWORD_RE = re.compile(r"([?&]password=)[^&#]*", re.IGNORECASE)
+
+# Rows per batch_upsert_skills RPC when bulk_load_skills has no pool
+_BULK_RPC_CHUNK = 500
+
+# Merges the COPY-loaded staging rows through batch_upsert_skills, so a bulk
+# load has the same max-merge semantics (and user_id lookup) as every other write
+_BULK_UPSERT_SQL = """
+SELECT count(*) FROM public.batch_upsert_skills((
+  SELECT jsonb_agg(jsonb_build_object(
+    'username',     s.username,
+    'repo_name',    s.repo_name,
+    'skill_json',   s.skill_json::jsonb,
+    'skill_vector', s.skill_vector::jsonb
+  ))
+  FROM _skills_staging s
+))
+"""
+
+# Columns of developer_skills shaped exactly like PostgREST returns them:
+# uuids as strings, timestamps as their JSON (ISO 8601) strings and the vector
+# in its text form. These rows share the read cache with DatabaseManager's
+# PostgREST rows under the same keys, so either manager may get the other's.
+_RECORD_COLUMNS = (
+    "id::text AS id, username, repo_name, user_id::text AS user_id, skill_json, "
+    "skill_vector::text AS skill_vector, repo_hash, prompt_version, scoring_version, "
+    "model_id, files_examined, to_json(analyzed_at)#>>'{}' AS analyzed_at, "
+    "to_json(created_at)#>>'{}' AS created_at, to_json(updated_at)#>>'{}' AS updated_at"
+)
+# WRITE_COLUMNS in the same PostgREST shape
+_WRITE_RECORD_COLUMNS = (
+    "id::text AS id, username, repo_name, user_id::text AS user_id, skill_json, "
+    "to_json(updated_at)#>>'{}' AS updated_at"
+)
+
+
+async def _init_connection(conn):
+    """Decode json/jsonb straight to Python objects."""
+    for type_name in ("json", "jsonb"):
+        await conn.set_type_codec(type_name, encoder=_json_dumps, decoder=_json_loads, schema="pg_catalog")
+
+
+async def _retrying(func, *args):
+    """Await func(*args), retrying transient failures like database.db.retry_db."""
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            return await func(*args)
+        except Exception as e:
+            if attempt == MAX_ATTEMPTS - 1 or not is_retryable_error(e):
+                raise
+            wait_time = backoff_delay(RETRY_DELAY, attempt)
+            logger.warning(
+                "Error on attempt %d/%d: %s. Retrying in %.1f seconds...",
+                attempt + 1, MAX_ATTEMPTS, e, wait_time,
+            )
+            await asyncio.sleep(wait_time)
+
+
+async def _execute(builder):
+    """Run a PostgREST query builder, retrying transient failures."""
+    return await _retrying(builder.execute)
+
+
+def _parse_database_url(dsn: str) -> Tuple[Optional[int], str]:
+    """(port, URL with the password masked, in the userinfo or the query) from one regex match."""
+    match = _DATABASE_URL_RE.match(dsn)
+    if match is None:
+        return None, "<unparseable DATABASE_URL>"
+    user = match["user"] or ""
+    if match["password"] is not None:
+        user += ":***"
+    userinfo = f"{user}@" if user else ""
+    port = match["port"]
+    rest = _QUERY_PASSWORD_RE.sub(r"\1***", match["rest"] or "")
+    masked = f"{match['scheme']}://{userinfo}{match['host']}{':' + port if port else ''}{rest}"
+    return (int(port) if port else None), masked
+
+
+def mask_database_url(dsn: str) -> str:
+    """DATABASE_URL safe to print or log."""
+    return _parse_database_url(dsn)[1]
+
+
+def _record_to_dict(record) -> dict:
+    # _RECORD_COLUMNS / _WRITE_RECORD_COLUMNS already select the PostgREST shape
+    return dict(record)
+
+
+class AsyncDatabaseManager:
+    """Async counterpart of DatabaseManager; the client is created on first use."""
+
+    def __init__(self, supabase_url: str = None, supabase_key: str = None, database_url: str = None):
+        """
+        Args:
+            supabase_url: Supabase project URL. If None, reads from SUPABASE_URL.
+            supabase_key: Supabase service role key. If None, reads from
+                         SUPABASE_SECRET_KEY (or SUPABASE_KEY).
+            database_url: Postgres connection string for the direct path. If None,
+                         reads from DATABASE_URL; unused without asyncpg.
+        """
+        self._supabase_url, self._supabase_key = resolve_credentials(supabase_url, supabase_key)
+        self._client: Optional[AsyncClient] = None
+        self._client_lock = asyncio.Lock()
+        self._database_url = database_url or os.environ.get("DATABASE_URL")
+        self._database_port, self._masked_database_url = (
+            _parse_database_url(self._database_url) if self._database_url else (None, "")
+        )
+        self._pool = None
+        self._pool_lock = asyncio.Lock()
+
+    async def client(self) -> AsyncClient:
+        if self._client is None:
+            async with self._client_lock:
+                if self._client is None:
+                    # Concurrent handlers multiplex their requests over one HTTP/2 connection
+                    http_client = httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+                    self._client = await acreate_client(
+                        self._supabase_url,
+                        self._supabase_key,
+                        options=AsyncClientOptions(httpx_client=http_client),
+                    )
+                    logger.info("Initialized async Supabase client for: %s", self._supabase_url)
+        return self._client
+
+    async def pool(self):
+        """The asyncpg pool, or None when asyncpg or DATABASE_URL is unavailable."""
+        if asyncpg is None or not self._database_url:
+            return None
+        if self._pool is None:
+            async with self._pool_lock:
+                if self._pool is None:
+                    options = {
+                        "min_size": _POOL_MIN_SIZE,
+                        "max_size": _POOL_MAX_SIZE,
+                        "max_inactive_connection_lifetime": _POOL_MAX_IDLE,
+                        "init": _init_connection,
+                    }
+                    pooler = self._database_port == _TRANSACTION_POOLER_PORT
+                    if pooler:
+                        # Consecutive transactions may land on different server
+                        # connections, so prepared statements can't be reused, and
+                        # the pooler already pools: keep no idle connections here
+                        options.update(statement_cache_size=0, min_size=0)
+                    self._pool = await asyncpg.create_pool(dsn=self._database_url, **options)
+                    logger.info(
+                        "Initialized asyncpg pool for %s (%s)",
+                        self._masked_database_url,
+                        "transaction pooler" if pooler else "prepared statements cached",
+                    )
+        return self._pool
+
+    async def _persist_skill_indices(self, skill_dicts: Iterable[Dict[str, int]], max_dimensions: int):
+        """
+        persist_skill_indices for new skills in skill_dicts, through the shared
+        sync client in a worker thread. Only new skills cost any I/O, and those
+        are rare once the vocabulary has settled.
+        """
+        names = unpersisted_skill_names(skill_dicts)
+        if names:
+            client = get_shared_client(self._supabase_url, self._supabase_key)
+            await asyncio.to_thread(persist_skill_indices, client, names, max_dimensions)
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    async def save_or_update_skill_vector(
+        self,
+        username: str,
+        repo_name: str,
+        new_skills: Dict[str, int],
+        max_dimensions: int = 200
+    ) -> dict:
+        """Async DatabaseManager.save_or_update_skill_vector (same merge, same RPC)."""
+        pool = await self.pool()
+        client = None if pool is not None else await self.client()
+        new_skills = dict(sorted(new_skills.items()))
+        vector = None
+        try:
+            # Same rule as DatabaseManager: only stored vocabulary indices go in the vector
+            await self._persist_skill_indices([new_skills], max_dimensions)
+            indexed = persisted_skills(new_skills)
+            vector = skills_to_sparse(indexed, max_dimensions) if indexed else None
+        except Exception as vec_error:
+            logger.warning("Vector conversion failed: %s", vec_error)
+
+        try:
+            if pool is not None:
+                # One round trip: the RPC resolves user_id from profiles
+                record = await _retrying(
+                    pool.fetchrow,
+                    f"SELECT {_WRITE_RECORD_COLUMNS} FROM public.upsert_developer_skill("
+                    "$1, $2, $3::jsonb, p_sparse => $4::text)",
+                    username,
+                    repo_name,
+                    new_skills,
+                    vector,
+                )
+                invalidate_reads(username)
+                return _record_to_dict(record) if record else {
+                    "username": username,
+                    "repo_name": repo_name,
+                    "skill_json": new_skills,
+                }
+
+            response = await _execute(client.rpc(
+                "upsert_developer_skill",
+                {
+                    "p_username": username,
+                    "p_repo": repo_name,
+                    "p_new": new_skills,
+                    "p_sparse": vector,
+                },
+            ).select(WRITE_COLUMNS))
+        except Exception as e:
+            logger.error("Error in save_or_update_skill_vector: %s", e, exc_info=True)
+            raise
+        invalidate_reads(username)
+        return response.data[0] if response.data else {
+            "username": username,
+            "repo_name": repo_name,
+            "skill_json": new_skills,
+        }
+
+    async def save_or_update_skill_vectors_batch(
+        self,
+        items: List[Tuple[str, str, Dict[str, int]]],
+        max_dimensions: int = 200
+    ) -> List[dict]:
+        """Async DatabaseManager.save_or_update_skill_vectors_batch (one RPC for all rows)."""
+        if not items:
+            return []
+        client = await self.client()
+        usernames = {username for username, _, _ in items}
+        await self._persist_skill_indices((skills for _, _, skills in items), max_dimensions)
+        rows = build_batch_rows(items, {}, max_dimensions)
+        response = await _execute(client.rpc("batch_upsert_skills", {"p_rows": rows}).select(WRITE_COLUMNS))
+        invalidate_reads(*usernames)
+        return response.data or []
+
+    async def bulk_load_skills(
+        self,
+        items: Iterable[Tuple[str, str, Dict[str, int]]],
+        max_dimensions: int = 200
+    ) -> int:
+        """
+        Backfill many (username, repo_name, skills) rows; returns the number written.
+
+        With the asyncpg pool the rows are COPYed into a temp staging table and
+        merged in one statement. Without it they go through
+        save_or_update_skill_vectors_batch in chunks of _BULK_RPC_CHUNK.
+        """
+        items = list(items)
+        await self._persist_skill_indices((skills for _, _, skills in items), max_dimensions)
+        rows = build_batch_rows(items, {}, max_dimensions)
+        if not rows:
+            return 0
+
+        pool = await self.pool()
+        if pool is None:
+            written = 0
+            for start in range(0, len(rows), _BULK_RPC_CHUNK):
+                chunk = rows[start:start + _BULK_RPC_CHUNK]
+                saved = await self.save_or_update_skill_vectors_batch(
+                    [(row["username"], row["repo_name"], row["skill_json"]) for row in chunk],
+                    max_dimensions,
+                )
+                written += len(saved)
+            return written
+
+        records = [
+            (
+                row["username"],
+                row["repo_name"],
+                _json_dumps(row["skill_json"]),
+                _json_dumps(row["skill_vector"]) if row["skill_vector"] is not None else None,
+            )
+            for row in rows
+        ]
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    "CREATE TEMP TABLE _skills_staging "
+                    "(username text, repo_name text, skill_json text, skill_vector text) ON COMMIT DROP"
+                )
+                await conn.copy_records_to_table(
+                    "_skills_staging",
+                    records=records,
+                    columns=["username", "repo_name", "skill_json", "skill_vector"],
+                )
+                written = await conn.fetchval(_BULK_UPSERT_SQL)
+        invalidate_reads(*{row["username"] for row in rows})
+        logger.info("Bulk loaded %d skill vectors", written)
+        return written
+
+    async def get_skill_vector(self, username: str, repo_name: Optional[str] = None) -> Optional[dict]:
+        # Same cache (and keys) as DatabaseManager.get_skill_vector
+        key = ("get_skill_vector", username, repo_name)
+        found, cached = cache_lookup(key)
+        if found:
+            return cached
+        generation = read_generation(username)
+        try:
+            pool = await self.pool()
+            if pool is not None:
+                record = await _retrying(
+                    pool.fetchrow,
+                    f"SELECT {_RECORD_COLUMNS} FROM public.developer_skills "
+                    "WHERE username = $1 AND ($2::text IS NULL OR repo_name = $2) LIMIT 1",
+                    username,
+                    repo_name or None,
+                )
+                result = _record_to_dict(record) if record else None
+            else:
+                client = await self.client()
+                query = client.table("developer_skills").select("*").eq("username", username)
+                if repo_name:
+                    query = query.eq("repo_name", repo_name)
+                response = await _execute(query.limit(1))
+                result = response.data[0] if response.data else None
+        except Exception as e:
+            logger.error("Error getting skill vector: %s", e, exc_info=True)
+            return None
+        cache_store(key, result, generation)
+        return result
+
+    async def get_vector(self, record_id: str) -> Optional[List[float]]:
+        try:
+            client = await self.client()
+            response = await _execute(client.table("developer_skills").select("skill_vector").eq("id", record_id).limit(1))
+            return response.data[0]["skill_vector"] if response.data else None
+        except Exception as e:
+            logger.error("Error getting vector: %s", e, exc_info=True)
+            return None
+
+    async def get_all_repos_for_user(self, username: str) -> List[dict]:
+        key = ("get_all_repos_for_user", username)
+        found, cached = cache_lookup(key)
+        if found:
+            return cached
+        generation = read_generation(username)
+        try:
+            client = await self.client()
+            response = await _execute(client.table("developer_skills").select(LIST_COLUMNS).eq("username", username))
+        except Exception as e:
+            logger.error("Error getting repos for user: %s", e, exc_info=True)
+            return []
+        cache_store(key, response.data or [], generation)
+        return response.data or []
+
+    async def search_by_skills(
+        self,
+        skill_filters: Dict[str, int],
+        limit: int = 100,
+        repo_name: Optional[str] = None
+    ) -> List[dict]:
+        pool = await self.pool()
+        if pool is not None:
+            try:
+                records = await _retrying(
+                    pool.fetch,
+                    f"SELECT {LIST_COLUMNS} FROM public.search_by_min_skills($1::jsonb, $2, $3)",
+                    skill_filters,
+                    limit,
+                    repo_name,
+                )
+                return [dict(record) for record in records]
+            except Exception as e:
+                logger.error("Error searching by skills: %s", e, exc_info=True)
+                return []
+
+        client = await self.client()
+        try:
+            response = await _execute(client.rpc(
+                "search_by_min_skills",
+                {"filters": skill_filters, "lim": limit, "repo": repo_name},
+            ).select(LIST_COLUMNS))
+            return response.data or []
+        except Exception as rpc_error:
+            logger.warning("search_by_min_skills RPC failed, filtering in Python: %s", rpc_error)
+
+        try:
+            query = client.table("developer_skills").select(LIST_COLUMNS)
+            if repo_name:
+                query = query.eq("repo_name", repo_name)
+            response = await _execute(query.limit(limit * 2))
+            return filter_by_skills(response.data or [], skill_filters, limit)
+        except Exception as e:
+            logger.error("Error searching by skills: %s", e, exc_info=True)
+            return []
+
+    async def get_all_developers(self, limit: int = 100) -> List[dict]:
+        try:
+            client = await self.client()
+            response = await _execute(client.table("developer_skills").select(LIST_COLUMNS).limit(limit))
+            return response.data or []
+        except Exception as e:
+            logger.error("Error getting all developers: %s", e, exc_info=True)
+            return []
@@ -14,9 +14,9 @@ from database.db import DatabaseManager
 
 def main():
     """
-    Create database tables.
+    Verify the database is reachable and the developer_skills table exists.
     
-    Note: For Supabase, tables are typically created via SQL Editor.
+    Note: For Supabase, tables are created via SQL Editor / migrations.
     This script is mainly for local development/testing.
     """
     if not os.environ.get("SUPABASE_URL"):
@@ -25,7 +25,7 @@ def main():
         print("SUPABASE_URL=https://<project-ref>.supabase.co")
         sys.exit(1)
     
-    if not os.environ.get("SUPABASE_KEY"):
+    if not (os.environ.get("SUPABASE_SECRET_KEY") or os.environ.get("SUPABASE_KEY")):
         print("❌ SUPABASE_KEY environment variable not set.")
         print("Please set it in your .env file:")
         print("SUPABASE_KEY=<service-role-key>")
@@ -38,10 +38,10 @@ def main():
         print("See database/SUPABASE_SETUP.md for details.\n")
         
         db = DatabaseManager()
-        db.create_tables()
-        print("✓ Database connection verified!")
-        print("\nNote: Tables should be created via Supabase SQL Editor:")
-        print("  - developer_skills")
+        # Supabase owns the schema (create_tables is a no-op), so just confirm
+        # the table is there: one request, no rows returned
+        db.client.table("developer_skills").select("id").limit(0).execute()
+        print("✓ Database connection verified, developer_skills exists!")
     except Exception as e:
         print(f"❌ Error initializing database: {e}")
         import traceback
@@ -1,29 +1,30 @@
 """Database-specific logger that saves to file for debugging."""
 
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import sys
+import threading
 from pathlib import Path
 from datetime import datetime
 
 
-def get_db_logger(name: str = "database") -> logging.Logger:
-    """
-    Get a database logger that logs to both console and file.
-    
-    Args:
-        name: Logger name
-        
-    Returns:
-        Configured logger instance
-    """
-    logger = logging.getLogger(f"database.{name}")
-    
-    # Don't add handlers if they already exist (prevents duplicate logs)
-    if logger.handlers:
-        return logger
-    
-    logger.setLevel(logging.DEBUG)
-    
+# Records are handed to a background listener thread that owns the file and
+# console handlers, so log calls never block the caller on disk I/O.
+_log_queue: "queue.SimpleQueue[logging.LogRecord] | None" = None
+_listener: logging.handlers.QueueListener | None = None
+# Guards creating (and flushing) the listener, so only one is ever started
+_listener_lock = threading.Lock()
+
+_FILE_BUFFER_RECORDS = 256
+
+
+def _build_handlers() -> list[logging.Handler]:
+    """Create the file and console handlers shared by every database logger."""
+    handlers: list[logging.Handler] = []
+
     # Create logs directory if it doesn't exist
     log_dir = Path(__file__).parent.parent / "logs"
     try:
@@ -35,39 +36,108 @@ def get_db_logger(name: str = "database") -> logging.Logger:
         # If we can't create logs directory, still create logger but only to console
         print(f"⚠ Warning: Could not create logs directory {log_dir}: {e}")
         # Continue without file handler
-    
+
     # File handler - saves to logs/database_YYYY-MM-DD.log
     # Only add file handler if logs directory exists
     if log_dir.exists():
         date_str = datetime.now().strftime("%Y-%m-%d")
         log_file = log_dir / f"database_{date_str}.log"
-        
+
         try:
-            file_handler = logging.FileHandler(log_file, encoding="utf-8")
+            # delay: the file is opened by the first write, not up front
+            file_handler = logging.FileHandler(log_file, encoding="utf-8", delay=True)
             file_handler.setLevel(logging.DEBUG)
             file_formatter = logging.Formatter(
                 "%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s",
                 datefmt="%Y-%m-%d %H:%M:%S"
             )
             file_handler.setFormatter(file_formatter)
-            logger.addHandler(file_handler)
-            # Log that file handler was created
-            logger.debug(f"Log file handler created: {log_file}")
+            # Batch DEBUG/INFO records into one write per _FILE_BUFFER_RECORDS;
+            # a WARNING or above flushes immediately (and so does exit)
+            buffered = logging.handlers.MemoryHandler(
+                _FILE_BUFFER_RECORDS, flushLevel=logging.WARNING, target=file_handler
+            )
+            buffered.setLevel(logging.DEBUG)
+            handlers.append(buffered)
         except Exception as e:
             print(f"⚠ Warning: Could not create log file {log_file}: {e}")
-    
+
     # Console handler - only shows INFO and above
-    console_handler = logging.StreamHandler()
+    console_handler = logging.StreamHandler(sys.stderr)
     console_handler.setLevel(logging.INFO)
     console_formatter = logging.Formatter(
         "%(asctime)s - %(levelname)s - %(message)s",
         datefmt="%H:%M:%S"
     )
     console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
-    
+    # Not buffered: progress lines have to show up as they happen, and the
+    # listener thread already keeps stderr writes off the caller
+    handlers.append(console_handler)
+
+    return handlers
+
+
+def _get_log_queue() -> "queue.SimpleQueue[logging.LogRecord]":
+    """Start the background listener on first use and return its queue."""
+    global _log_queue, _listener
+    if _log_queue is not None:
+        return _log_queue
+    with _listener_lock:
+        if _log_queue is None:
+            listener = logging.handlers.QueueListener(
+                queue.SimpleQueue(), *_build_handlers(), respect_handler_level=True
+            )
+            listener.start()
+            # Drain pending records before the interpreter exits
+            atexit.register(listener.stop)
+            _listener = listener
+            # Published last: other threads skip the lock once this is set
+            _log_queue = listener.queue
+    return _log_queue
+
+
+def flush_db_logs():
+    """Write out every record logged so far (queued or buffered) before returning."""
+    with _listener_lock:
+        if _listener is None:
+            return
+        # stop() drains the queue; the MemoryHandlers then write what they hold
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.flush()
+        _listener.start()
+
+
+class _LazyQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler whose listener (and log file) is created by the first record."""
+
+    def __init__(self):
+        super().__init__(None)
+
+    def enqueue(self, record: logging.LogRecord):
+        _get_log_queue().put_nowait(record)
+
+
+def get_db_logger(name: str = "database") -> logging.Logger:
+    """
+    Get a database logger that logs to both console and file.
+
+    Args:
+        name: Logger name
+
+    Returns:
+        Configured logger instance
+    """
+    logger = logging.getLogger(f"database.{name}")
+
+    # Don't add handlers if they already exist (prevents duplicate logs)
+    if logger.handlers:
+        return logger
+
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(_LazyQueueHandler())
+
     # Prevent propagation to root logger (avoids duplicate logs)
     logger.propagate = False
-    
-    return logger
 
+    return logger
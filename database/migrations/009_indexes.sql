@@ -16,9 +16,19 @@ CREATE INDEX IF NOT EXISTS idx_dev_skills_username
   ON public.developer_skills (username);
 CREATE INDEX IF NOT EXISTS idx_dev_skills_skills_gin
   ON public.developer_skills USING GIN (skill_json);
-CREATE INDEX IF NOT EXISTS idx_dev_skills_vector
-  ON public.developer_skills USING ivfflat (skill_vector vector_cosine_ops)
-  WITH (lists = 50);
+-- Only while skill_vector is still vector: 015 replaces this index and 018
+-- turns the column into halfvec, where vector_cosine_ops does not apply, so
+-- a re-run of all migrations must skip it.
+DO $$
+BEGIN
+  IF (SELECT a.atttypid::regtype::text FROM pg_attribute a
+      WHERE a.attrelid = 'public.developer_skills'::regclass
+        AND a.attname = 'skill_vector') = 'vector' THEN
+    CREATE INDEX IF NOT EXISTS idx_dev_skills_vector
+      ON public.developer_skills USING ivfflat (skill_vector vector_cosine_ops)
+      WITH (lists = 50);
+  END IF;
+END $$;
 
 -- connected_repositories
 CREATE INDEX IF NOT EXISTS idx_conn_repos_user
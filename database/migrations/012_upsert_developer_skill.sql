@@ -0,0 +1,44 @@
+-- 012_upsert_developer_skill.sql
+-- Single-statement upsert used by DatabaseManager.save_or_update_skill_vector.
+-- Replaces the client-side SELECT + UPDATE/INSERT (two round trips and a race
+-- between them) with INSERT ... ON CONFLICT that merges on the server:
+-- each skill keeps max(old_score, new_score), and skill_vector is merged
+-- element-wise the same way (indices come from the shared skill_vocabulary,
+-- so the max of the two vectors is the vector of the merged skills).
+
+-- Written by the legacy agent (links a row to profiles.user_id); the
+-- column predates these migrations.
+ALTER TABLE public.developer_skills ADD COLUMN IF NOT EXISTS user_id uuid;
+
+CREATE OR REPLACE FUNCTION public.upsert_developer_skill(
+  p_username  text,
+  p_repo      text,
+  p_new       jsonb,
+  p_vector    vector(200) DEFAULT NULL,
+  p_user_id   uuid        DEFAULT NULL,
+  p_model_id  text        DEFAULT 'gemini-2.5-pro'
+) RETURNS SETOF public.developer_skills
+LANGUAGE sql
+AS $$
+  INSERT INTO public.developer_skills AS d
+    (username, repo_name, user_id, skill_json, skill_vector, repo_hash, model_id)
+  VALUES
+    (p_username, p_repo, p_user_id, p_new, p_vector, '', p_model_id)
+  ON CONFLICT (username, repo_name) DO UPDATE SET
+    skill_json = (
+      SELECT jsonb_object_agg(k, GREATEST((d.skill_json->>k)::numeric, (EXCLUDED.skill_json->>k)::numeric))
+      FROM jsonb_object_keys(d.skill_json || EXCLUDED.skill_json) AS k
+    ),
+    skill_vector = CASE
+      -- no vector on one side (e.g. it could not be built): keep the other
+      WHEN d.skill_vector IS NULL OR EXCLUDED.skill_vector IS NULL
+        THEN COALESCE(EXCLUDED.skill_vector, d.skill_vector)
+      ELSE (
+        SELECT array_agg(GREATEST(o, n) ORDER BY i)::vector
+        FROM unnest(d.skill_vector::real[], EXCLUDED.skill_vector::real[]) WITH ORDINALITY AS t(o, n, i)
+      )
+    END,
+    user_id    = COALESCE(EXCLUDED.user_id, d.user_id),
+    updated_at = NOW()
+  RETURNING d.*;
+$$;
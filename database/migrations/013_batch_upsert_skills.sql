@@ -0,0 +1,42 @@
+-- 013_batch_upsert_skills.sql
+-- Batch form of upsert_developer_skill (012) for bulk ingestion: one
+-- INSERT ... ON CONFLICT over every row in p_rows instead of one RPC per row.
+-- Rows arrive as a jsonb array of
+--   {"username", "repo_name", "user_id", "skill_json", "skill_vector"}
+-- (skill_vector as a JSON number array, which casts straight to vector).
+-- Callers must not send the same (username, repo_name) twice in one batch.
+
+CREATE OR REPLACE FUNCTION public.batch_upsert_skills(
+  p_rows      jsonb,
+  p_model_id  text DEFAULT 'gemini-2.5-pro'
+) RETURNS SETOF public.developer_skills
+LANGUAGE sql
+AS $$
+  INSERT INTO public.developer_skills AS d
+    (username, repo_name, user_id, skill_json, skill_vector, repo_hash, model_id)
+  SELECT
+    r->>'username',
+    r->>'repo_name',
+    (r->>'user_id')::uuid,
+    r->'skill_json',
+    (r->>'skill_vector')::vector,
+    '',
+    p_model_id
+  FROM jsonb_array_elements(p_rows) AS r
+  ON CONFLICT (username, repo_name) DO UPDATE SET
+    skill_json = (
+      SELECT jsonb_object_agg(k, GREATEST((d.skill_json->>k)::numeric, (EXCLUDED.skill_json->>k)::numeric))
+      FROM jsonb_object_keys(d.skill_json || EXCLUDED.skill_json) AS k
+    ),
+    skill_vector = CASE
+      WHEN d.skill_vector IS NULL OR EXCLUDED.skill_vector IS NULL
+        THEN COALESCE(EXCLUDED.skill_vector, d.skill_vector)
+      ELSE (
+        SELECT array_agg(GREATEST(o, n) ORDER BY i)::vector
+        FROM unnest(d.skill_vector::real[], EXCLUDED.skill_vector::real[]) WITH ORDINALITY AS t(o, n, i)
+      )
+    END,
+    user_id    = COALESCE(EXCLUDED.user_id, d.user_id),
+    updated_at = NOW()
+  RETURNING d.*;
+$$;
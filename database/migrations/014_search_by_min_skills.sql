@@ -0,0 +1,31 @@
+-- 014_search_by_min_skills.sql
+-- Server-side skill search for DatabaseManager.search_by_skills, replacing
+-- "fetch limit*2 rows, filter in Python". filters is {"skill": min_score, ...};
+-- a row matches when every listed skill is a number >= its minimum (a missing
+-- skill counts as 0, as in the Python filter it replaces).
+-- The ?& prefilter on the skills that must be present is served by the
+-- existing GIN index idx_dev_skills_skills_gin (jsonb_ops, see 009_indexes.sql).
+
+CREATE OR REPLACE FUNCTION public.search_by_min_skills(
+  filters  jsonb,
+  lim      int  DEFAULT 100,
+  repo     text DEFAULT NULL
+) RETURNS SETOF public.developer_skills
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT d.*
+  FROM public.developer_skills d
+  WHERE d.skill_json ?& ARRAY(SELECT f.key FROM jsonb_each(filters) f WHERE f.value::numeric > 0)
+    AND (repo IS NULL OR d.repo_name = repo)
+    AND NOT EXISTS (
+      SELECT 1
+      FROM jsonb_each(filters) f
+      WHERE CASE
+              WHEN jsonb_typeof(COALESCE(d.skill_json->f.key, '0')) = 'number'
+                THEN COALESCE(d.skill_json->f.key, '0')::numeric < f.value::numeric
+              ELSE true
+            END
+    )
+  LIMIT lim;
+$$;
@@ -0,0 +1,49 @@
+-- 015_match_developer_skills.sql
+-- Nearest-neighbour search over developer_skills.skill_vector for
+-- DatabaseManager.search_by_vector_similarity. Cosine distance (<=>) so it
+-- can use the vector_cosine_ops index below; rows come back nearest first
+-- without the 200-float vector itself.
+
+-- HNSW replaces the IVFFLAT index from 009_indexes.sql: no training step,
+-- so recall does not depend on how many rows existed when it was built.
+-- Skipped once 018 has made the column halfvec (it builds its own
+-- halfvec_cosine_ops HNSW index), so re-running all migrations still works.
+DROP INDEX IF EXISTS public.idx_dev_skills_vector;
+DO $$
+BEGIN
+  IF (SELECT a.atttypid::regtype::text FROM pg_attribute a
+      WHERE a.attrelid = 'public.developer_skills'::regclass
+        AND a.attname = 'skill_vector') = 'vector' THEN
+    CREATE INDEX IF NOT EXISTS idx_dev_skills_vector_hnsw
+      ON public.developer_skills USING hnsw (skill_vector vector_cosine_ops)
+      WITH (m = 16, ef_construction = 64);
+  END IF;
+END $$;
+
+CREATE OR REPLACE FUNCTION public.match_developer_skills(
+  query   vector(200),
+  k       int   DEFAULT 10,
+  thresh  float DEFAULT 0.5
+) RETURNS TABLE (
+  id          uuid,
+  username    text,
+  repo_name   text,
+  skill_json  jsonb,
+  updated_at  timestamptz,
+  similarity  float
+)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT
+    d.id,
+    d.username,
+    d.repo_name,
+    d.skill_json,
+    d.updated_at,
+    (1 - (d.skill_vector <=> query))::float AS similarity
+  FROM public.developer_skills d
+  WHERE 1 - (d.skill_vector <=> query) >= thresh
+  ORDER BY d.skill_vector <=> query
+  LIMIT k;
+$$;
@@ -0,0 +1,17 @@
+-- 017_fetch_existing_skills.sql
+-- Bulk lookup behind DatabaseManager.prefetch_existing: returns the stored
+-- rows for a jsonb array of {"username", "repo_name"} pairs in one query
+-- (an index join on the (username, repo_name) unique key) instead of one
+-- SELECT per repo.
+
+CREATE OR REPLACE FUNCTION public.fetch_existing_skills(
+  pairs jsonb
+) RETURNS SETOF public.developer_skills
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT d.*
+  FROM public.developer_skills d
+  JOIN jsonb_to_recordset(pairs) AS p(username text, repo_name text)
+    USING (username, repo_name);
+$$;
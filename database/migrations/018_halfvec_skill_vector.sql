@@ -0,0 +1,128 @@
+-- 018_halfvec_skill_vector.sql
+-- Store developer_skills.skill_vector as halfvec (FP16, pgvector >= 0.7)
+-- instead of vector (FP32). Entries are score / 100, so two decimals are
+-- all that is ever stored and FP16 loses nothing that matters for cosine
+-- ranking; the column, its TOAST copies and the HNSW index halve in size.
+--
+-- Functions taking a vector argument are dropped and recreated with
+-- halfvec (CREATE OR REPLACE cannot change argument types). Callers are
+-- unaffected: PostgREST and asyncpg send the vector as text "[...]".
+
+DROP INDEX IF EXISTS public.idx_dev_skills_vector_hnsw;
+
+ALTER TABLE public.developer_skills
+  ALTER COLUMN skill_vector TYPE halfvec(200) USING skill_vector::halfvec(200);
+
+CREATE INDEX IF NOT EXISTS idx_dev_skills_halfvec_hnsw
+  ON public.developer_skills USING hnsw (skill_vector halfvec_cosine_ops)
+  WITH (m = 16, ef_construction = 64);
+
+CREATE OR REPLACE FUNCTION public.batch_upsert_skills(
+  p_rows      jsonb,
+  p_model_id  text DEFAULT 'gemini-2.5-pro'
+) RETURNS SETOF public.developer_skills
+LANGUAGE sql
+AS $$
+  WITH input AS (
+    SELECT
+      r->>'username'                AS username,
+      r->>'repo_name'               AS repo_name,
+      (r->>'user_id')::uuid         AS user_id,
+      r->'skill_json'               AS skill_json,
+      (r->>'skill_vector')::halfvec AS skill_vector
+    FROM jsonb_array_elements(p_rows) AS r
+  ),
+  up AS (
+    INSERT INTO public.developer_skills AS d
+      (username, repo_name, user_id, skill_json, skill_vector, repo_hash, model_id)
+    SELECT username, repo_name, user_id, skill_json, skill_vector, '', p_model_id
+    FROM input
+    ON CONFLICT (username, repo_name) DO UPDATE SET
+      skill_json = (
+        SELECT jsonb_object_agg(k, GREATEST((d.skill_json->>k)::numeric, (EXCLUDED.skill_json->>k)::numeric))
+        FROM jsonb_object_keys(d.skill_json || EXCLUDED.skill_json) AS k
+      ),
+      skill_vector = CASE
+        WHEN d.skill_vector IS NULL OR EXCLUDED.skill_vector IS NULL
+          THEN COALESCE(EXCLUDED.skill_vector, d.skill_vector)
+        ELSE (
+          SELECT array_agg(GREATEST(o, n) ORDER BY i)::halfvec
+          FROM unnest(d.skill_vector::real[], EXCLUDED.skill_vector::real[]) WITH ORDINALITY AS t(o, n, i)
+        )
+      END,
+      user_id    = COALESCE(EXCLUDED.user_id, d.user_id),
+      updated_at = NOW()
+    WHERE EXISTS (
+            SELECT 1
+            FROM jsonb_each(EXCLUDED.skill_json) AS n
+            WHERE d.skill_json->n.key IS NULL
+               OR (d.skill_json->>n.key)::numeric < (n.value#>>'{}')::numeric
+          )
+       OR (EXCLUDED.user_id IS NOT NULL AND d.user_id IS DISTINCT FROM EXCLUDED.user_id)
+       OR (d.skill_vector IS NULL AND EXCLUDED.skill_vector IS NOT NULL)
+    RETURNING d.*
+  )
+  SELECT * FROM up
+  UNION ALL
+  SELECT d.*
+  FROM public.developer_skills d
+  JOIN input i USING (username, repo_name)
+  WHERE NOT EXISTS (
+    SELECT 1 FROM up WHERE up.username = d.username AND up.repo_name = d.repo_name
+  );
+$$;
+
+DROP FUNCTION IF EXISTS public.upsert_developer_skill(text, text, jsonb, vector, uuid, text);
+
+CREATE OR REPLACE FUNCTION public.upsert_developer_skill(
+  p_username  text,
+  p_repo      text,
+  p_new       jsonb,
+  p_vector    halfvec(200) DEFAULT NULL,
+  p_user_id   uuid         DEFAULT NULL,
+  p_model_id  text         DEFAULT 'gemini-2.5-pro'
+) RETURNS SETOF public.developer_skills
+LANGUAGE sql
+AS $$
+  SELECT *
+  FROM public.batch_upsert_skills(
+    jsonb_build_array(jsonb_build_object(
+      'username',     p_username,
+      'repo_name',    p_repo,
+      'user_id',      p_user_id,
+      'skill_json',   p_new,
+      'skill_vector', p_vector::text::jsonb
+    )),
+    p_model_id
+  );
+$$;
+
+DROP FUNCTION IF EXISTS public.match_developer_skills(vector, int, float);
+
+CREATE OR REPLACE FUNCTION public.match_developer_skills(
+  query   halfvec(200),
+  k       int   DEFAULT 10,
+  thresh  float DEFAULT 0.5
+) RETURNS TABLE (
+  id          uuid,
+  username    text,
+  repo_name   text,
+  skill_json  jsonb,
+  updated_at  timestamptz,
+  similarity  float
+)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT
+    d.id,
+    d.username,
+    d.repo_name,
+    d.skill_json,
+    d.updated_at,
+    (1 - (d.skill_vector <=> query))::float AS similarity
+  FROM public.developer_skills d
+  WHERE 1 - (d.skill_vector <=> query) >= thresh
+  ORDER BY d.skill_vector <=> query
+  LIMIT k;
+$$;
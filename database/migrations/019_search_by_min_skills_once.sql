@@ -0,0 +1,35 @@
+-- 019_search_by_min_skills_once.sql
+-- search_by_min_skills (014) re-expanded the filters jsonb with jsonb_each and
+-- re-cast every minimum to numeric for each candidate row. The filters are
+-- now unpacked once per call into a materialized (key, min_score) set that
+-- both the ?& index prefilter and the per-row check read. Same results; the
+-- only per-row work left is looking up the filtered skills in skill_json.
+
+CREATE OR REPLACE FUNCTION public.search_by_min_skills(
+  filters  jsonb,
+  lim      int  DEFAULT 100,
+  repo     text DEFAULT NULL
+) RETURNS SETOF public.developer_skills
+LANGUAGE sql
+STABLE
+PARALLEL SAFE
+AS $$
+  WITH f AS MATERIALIZED (
+    SELECT key, value::numeric AS min_score
+    FROM jsonb_each(filters)
+  )
+  SELECT d.*
+  FROM public.developer_skills d
+  WHERE d.skill_json ?& ARRAY(SELECT key FROM f WHERE min_score > 0)
+    AND (repo IS NULL OR d.repo_name = repo)
+    AND NOT EXISTS (
+      SELECT 1
+      FROM f
+      WHERE CASE
+              WHEN jsonb_typeof(COALESCE(d.skill_json->f.key, '0')) = 'number'
+                THEN COALESCE(d.skill_json->f.key, '0')::numeric < f.min_score
+              ELSE true
+            END
+    )
+  LIMIT lim;
+$$;
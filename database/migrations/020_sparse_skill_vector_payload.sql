@@ -0,0 +1,94 @@
+-- 020_sparse_skill_vector_payload.sql
+-- A skill vector has one non-zero entry per scored skill (typically 5-20 of
+-- 200), but callers sent all 200 floats on every write. Writers now send it
+-- as a pgvector sparsevec literal, "{idx:value,...}/200" (1-based indices),
+-- and it is densified to halfvec server-side:
+--   * batch_upsert_skills: a row's skill_vector may be a JSON number array
+--     (as before) or a sparsevec string.
+--   * upsert_developer_skill: new p_sparse argument, used when p_vector is
+--     NULL. The old signature is dropped so PostgREST sees one function.
+-- Needs pgvector >= 0.7 (sparsevec), like 018.
+
+CREATE OR REPLACE FUNCTION public.batch_upsert_skills(
+  p_rows      jsonb,
+  p_model_id  text DEFAULT 'gemini-2.5-pro'
+) RETURNS SETOF public.developer_skills
+LANGUAGE sql
+AS $$
+  WITH input AS (
+    SELECT
+      r->>'username'                AS username,
+      r->>'repo_name'               AS repo_name,
+      (r->>'user_id')::uuid         AS user_id,
+      r->'skill_json'               AS skill_json,
+      CASE jsonb_typeof(r->'skill_vector')
+        WHEN 'string' THEN (r->>'skill_vector')::sparsevec::vector::halfvec
+        ELSE (r->>'skill_vector')::halfvec
+      END                           AS skill_vector
+    FROM jsonb_array_elements(p_rows) AS r
+  ),
+  up AS (
+    INSERT INTO public.developer_skills AS d
+      (username, repo_name, user_id, skill_json, skill_vector, repo_hash, model_id)
+    SELECT username, repo_name, user_id, skill_json, skill_vector, '', p_model_id
+    FROM input
+    ON CONFLICT (username, repo_name) DO UPDATE SET
+      skill_json = (
+        SELECT jsonb_object_agg(k, GREATEST((d.skill_json->>k)::numeric, (EXCLUDED.skill_json->>k)::numeric))
+        FROM jsonb_object_keys(d.skill_json || EXCLUDED.skill_json) AS k
+      ),
+      skill_vector = CASE
+        WHEN d.skill_vector IS NULL OR EXCLUDED.skill_vector IS NULL
+          THEN COALESCE(EXCLUDED.skill_vector, d.skill_vector)
+        ELSE (
+          SELECT array_agg(GREATEST(o, n) ORDER BY i)::halfvec
+          FROM unnest(d.skill_vector::real[], EXCLUDED.skill_vector::real[]) WITH ORDINALITY AS t(o, n, i)
+        )
+      END,
+      user_id    = COALESCE(EXCLUDED.user_id, d.user_id),
+      updated_at = NOW()
+    WHERE EXISTS (
+            SELECT 1
+            FROM jsonb_each(EXCLUDED.skill_json) AS n
+            WHERE d.skill_json->n.key IS NULL
+               OR (d.skill_json->>n.key)::numeric < (n.value#>>'{}')::numeric
+          )
+       OR (EXCLUDED.user_id IS NOT NULL AND d.user_id IS DISTINCT FROM EXCLUDED.user_id)
+       OR (d.skill_vector IS NULL AND EXCLUDED.skill_vector IS NOT NULL)
+    RETURNING d.*
+  )
+  SELECT * FROM up
+  UNION ALL
+  SELECT d.*
+  FROM public.developer_skills d
+  JOIN input i USING (username, repo_name)
+  WHERE NOT EXISTS (
+    SELECT 1 FROM up WHERE up.username = d.username AND up.repo_name = d.repo_name
+  );
+$$;
+
+DROP FUNCTION IF EXISTS public.upsert_developer_skill(text, text, jsonb, halfvec, uuid, text);
+
+CREATE OR REPLACE FUNCTION public.upsert_developer_skill(
+  p_username  text,
+  p_repo      text,
+  p_new       jsonb,
+  p_vector    halfvec(200) DEFAULT NULL,
+  p_user_id   uuid         DEFAULT NULL,
+  p_model_id  text         DEFAULT 'gemini-2.5-pro',
+  p_sparse    text         DEFAULT NULL
+) RETURNS SETOF public.developer_skills
+LANGUAGE sql
+AS $$
+  SELECT *
+  FROM public.batch_upsert_skills(
+    jsonb_build_array(jsonb_build_object(
+      'username',     p_username,
+      'repo_name',    p_repo,
+      'user_id',      p_user_id,
+      'skill_json',   p_new,
+      'skill_vector', COALESCE(p_vector::text::jsonb, to_jsonb(p_sparse))
+    )),
+    p_model_id
+  );
+$$;
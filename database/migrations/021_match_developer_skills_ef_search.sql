@@ -0,0 +1,40 @@
+-- 021_match_developer_skills_ef_search.sql
+-- match_developer_skills (015, halfvec since 018) probed the HNSW index with
+-- the default hnsw.ef_search = 40 whatever k was, so k > 40 silently
+-- returned at most 40 rows and the similarity threshold, applied after
+-- the index scan, could cut that further. ef_search now scales with k
+-- (2*k, clamped to pgvector's 40..1000) for this transaction only, and the
+-- threshold is written as a bound on the same distance expression the scan
+-- orders by.
+
+CREATE OR REPLACE FUNCTION public.match_developer_skills(
+  query   halfvec(200),
+  k       int   DEFAULT 10,
+  thresh  float DEFAULT 0.5
+) RETURNS TABLE (
+  id          uuid,
+  username    text,
+  repo_name   text,
+  skill_json  jsonb,
+  updated_at  timestamptz,
+  similarity  float
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+BEGIN
+  PERFORM set_config('hnsw.ef_search', LEAST(1000, GREATEST(40, 2 * k))::text, true);
+  RETURN QUERY
+    SELECT
+      d.id,
+      d.username,
+      d.repo_name,
+      d.skill_json,
+      d.updated_at,
+      (1 - (d.skill_vector <=> query))::float AS similarity
+    FROM public.developer_skills d
+    WHERE d.skill_vector <=> query <= 1 - thresh
+    ORDER BY d.skill_vector <=> query
+    LIMIT k;
+END;
+$$;
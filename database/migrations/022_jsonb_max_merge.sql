@@ -0,0 +1,74 @@
+-- 022_jsonb_max_merge.sql
+-- The per-key max merge of two skill_json objects was written inline in
+-- batch_upsert_skills (and so in upsert_developer_skill, which delegates to
+-- it). It is now a named IMMUTABLE function, jsonb_max_merge(a, b), so other
+-- SQL (ad-hoc backfills, future RPCs) merges skills the same way without
+-- shipping the stored skill_json to a client and back. batch_upsert_skills is
+-- otherwise unchanged from 020.
+
+CREATE OR REPLACE FUNCTION public.jsonb_max_merge(a jsonb, b jsonb)
+RETURNS jsonb
+LANGUAGE sql
+IMMUTABLE PARALLEL SAFE
+AS $$
+  SELECT COALESCE(
+    jsonb_object_agg(k, GREATEST((a->>k)::numeric, (b->>k)::numeric)),
+    '{}'::jsonb
+  )
+  FROM jsonb_object_keys(COALESCE(a, '{}'::jsonb) || COALESCE(b, '{}'::jsonb)) AS k;
+$$;
+
+CREATE OR REPLACE FUNCTION public.batch_upsert_skills(
+  p_rows      jsonb,
+  p_model_id  text DEFAULT 'gemini-2.5-pro'
+) RETURNS SETOF public.developer_skills
+LANGUAGE sql
+AS $$
+  WITH input AS (
+    SELECT
+      r->>'username'                AS username,
+      r->>'repo_name'               AS repo_name,
+      (r->>'user_id')::uuid         AS user_id,
+      r->'skill_json'               AS skill_json,
+      CASE jsonb_typeof(r->'skill_vector')
+        WHEN 'string' THEN (r->>'skill_vector')::sparsevec::vector::halfvec
+        ELSE (r->>'skill_vector')::halfvec
+      END                           AS skill_vector
+    FROM jsonb_array_elements(p_rows) AS r
+  ),
+  up AS (
+    INSERT INTO public.developer_skills AS d
+      (username, repo_name, user_id, skill_json, skill_vector, repo_hash, model_id)
+    SELECT username, repo_name, user_id, skill_json, skill_vector, '', p_model_id
+    FROM input
+    ON CONFLICT (username, repo_name) DO UPDATE SET
+      skill_json = public.jsonb_max_merge(d.skill_json, EXCLUDED.skill_json),
+      skill_vector = CASE
+        WHEN d.skill_vector IS NULL OR EXCLUDED.skill_vector IS NULL
+          THEN COALESCE(EXCLUDED.skill_vector, d.skill_vector)
+        ELSE (
+          SELECT array_agg(GREATEST(o, n) ORDER BY i)::halfvec
+          FROM unnest(d.skill_vector::real[], EXCLUDED.skill_vector::real[]) WITH ORDINALITY AS t(o, n, i)
+        )
+      END,
+      user_id    = COALESCE(EXCLUDED.user_id, d.user_id),
+      updated_at = NOW()
+    WHERE EXISTS (
+            SELECT 1
+            FROM jsonb_each(EXCLUDED.skill_json) AS n
+            WHERE d.skill_json->n.key IS NULL
+               OR (d.skill_json->>n.key)::numeric < (n.value#>>'{}')::numeric
+          )
+       OR (EXCLUDED.user_id IS NOT NULL AND d.user_id IS DISTINCT FROM EXCLUDED.user_id)
+       OR (d.skill_vector IS NULL AND EXCLUDED.skill_vector IS NOT NULL)
+    RETURNING d.*
+  )
+  SELECT * FROM up
+  UNION ALL
+  SELECT d.*
+  FROM public.developer_skills d
+  JOIN input i USING (username, repo_name)
+  WHERE NOT EXISTS (
+    SELECT 1 FROM up WHERE up.username = d.username AND up.repo_name = d.repo_name
+  );
+$$;
@@ -0,0 +1,20 @@
+-- 023_skill_key_counts.sql
+-- Per-skill usage counts across developer_skills, most used first. Used by
+-- DatabaseManager.initialize_vocabulary to seed the vocabulary when
+-- skill_vocabulary is empty, so the client receives at most max_dims
+-- (skill_name, c) rows instead of every row's skill_json.
+
+CREATE OR REPLACE FUNCTION public.skill_key_counts(
+  max_dims  integer DEFAULT 200
+) RETURNS TABLE (skill_name text, c bigint)
+LANGUAGE sql
+STABLE PARALLEL SAFE
+AS $$
+  SELECT k AS skill_name, count(*) AS c
+  FROM public.developer_skills d,
+       jsonb_object_keys(d.skill_json) AS k
+  WHERE d.skill_json IS NOT NULL
+  GROUP BY k
+  ORDER BY c DESC, k
+  LIMIT max_dims;
+$$;
@@ -0,0 +1,35 @@
+-- 024_upsert_skill_resolves_user_id.sql
+-- Callers looked up profiles.user_id in a separate round trip before every
+-- upsert_developer_skill call. When p_user_id is NULL the function now
+-- resolves it from profiles.github_username itself, so a single save is one
+-- round trip. A username without a profile is written with user_id NULL
+-- (and keeps any user_id already on the row), as the batch path already does.
+-- Signature unchanged from 020.
+
+CREATE OR REPLACE FUNCTION public.upsert_developer_skill(
+  p_username  text,
+  p_repo      text,
+  p_new       jsonb,
+  p_vector    halfvec(200) DEFAULT NULL,
+  p_user_id   uuid         DEFAULT NULL,
+  p_model_id  text         DEFAULT 'gemini-2.5-pro',
+  p_sparse    text         DEFAULT NULL
+) RETURNS SETOF public.developer_skills
+LANGUAGE sql
+AS $$
+  SELECT *
+  FROM public.batch_upsert_skills(
+    jsonb_build_array(jsonb_build_object(
+      'username',     p_username,
+      'repo_name',    p_repo,
+      'user_id',      COALESCE(
+                        p_user_id,
+                        (SELECT p.user_id FROM public.profiles p
+                         WHERE p.github_username = p_username LIMIT 1)
+                      ),
+      'skill_json',   p_new,
+      'skill_vector', COALESCE(p_vector::text::jsonb, to_jsonb(p_sparse))
+    )),
+    p_model_id
+  );
+$$;
@@ -0,0 +1,64 @@
+-- 025_batch_upsert_resolves_user_id.sql
+-- Same change as 024, for the batch path: a row without "user_id" gets it
+-- from profiles.github_username inside batch_upsert_skills, so batch and
+-- bulk writers no longer look profiles up in a round trip of their own.
+-- Otherwise unchanged from 022.
+
+CREATE OR REPLACE FUNCTION public.batch_upsert_skills(
+  p_rows      jsonb,
+  p_model_id  text DEFAULT 'gemini-2.5-pro'
+) RETURNS SETOF public.developer_skills
+LANGUAGE sql
+AS $$
+  WITH input AS (
+    SELECT
+      r->>'username'                AS username,
+      r->>'repo_name'               AS repo_name,
+      COALESCE(
+        (r->>'user_id')::uuid,
+        (SELECT p.user_id FROM public.profiles p
+         WHERE p.github_username = r->>'username' LIMIT 1)
+      )                             AS user_id,
+      r->'skill_json'               AS skill_json,
+      CASE jsonb_typeof(r->'skill_vector')
+        WHEN 'string' THEN (r->>'skill_vector')::sparsevec::vector::halfvec
+        ELSE (r->>'skill_vector')::halfvec
+      END                           AS skill_vector
+    FROM jsonb_array_elements(p_rows) AS r
+  ),
+  up AS (
+    INSERT INTO public.developer_skills AS d
+      (username, repo_name, user_id, skill_json, skill_vector, repo_hash, model_id)
+    SELECT username, repo_name, user_id, skill_json, skill_vector, '', p_model_id
+    FROM input
+    ON CONFLICT (username, repo_name) DO UPDATE SET
+      skill_json = public.jsonb_max_merge(d.skill_json, EXCLUDED.skill_json),
+      skill_vector = CASE
+        WHEN d.skill_vector IS NULL OR EXCLUDED.skill_vector IS NULL
+          THEN COALESCE(EXCLUDED.skill_vector, d.skill_vector)
+        ELSE (
+          SELECT array_agg(GREATEST(o, n) ORDER BY i)::halfvec
+          FROM unnest(d.skill_vector::real[], EXCLUDED.skill_vector::real[]) WITH ORDINALITY AS t(o, n, i)
+        )
+      END,
+      user_id    = COALESCE(EXCLUDED.user_id, d.user_id),
+      updated_at = NOW()
+    WHERE EXISTS (
+            SELECT 1
+            FROM jsonb_each(EXCLUDED.skill_json) AS n
+            WHERE d.skill_json->n.key IS NULL
+               OR (d.skill_json->>n.key)::numeric < (n.value#>>'{}')::numeric
+          )
+       OR (EXCLUDED.user_id IS NOT NULL AND d.user_id IS DISTINCT FROM EXCLUDED.user_id)
+       OR (d.skill_vector IS NULL AND EXCLUDED.skill_vector IS NOT NULL)
+    RETURNING d.*
+  )
+  SELECT * FROM up
+  UNION ALL
+  SELECT d.*
+  FROM public.developer_skills d
+  JOIN input i USING (username, repo_name)
+  WHERE NOT EXISTS (
+    SELECT 1 FROM up WHERE up.username = d.username AND up.repo_name = d.repo_name
+  );
+$$;
@@ -0,0 +1,46 @@
+-- 026_match_developer_skills_distance_once.sql
+-- match_developer_skills (021) wrote skill_vector <=> query three times:
+-- in the similarity column, the threshold filter and the ORDER BY. The
+-- ordering is served by the HNSW index, but the other two were evaluated
+-- again on every returned row. The distance is now computed once per row
+-- in an inner query ordered by it (still an HNSW scan), and the threshold
+-- and similarity read that column. Because rows come back nearest first, the
+-- rows that pass the threshold are a prefix of the top k, so filtering after
+-- the LIMIT returns the same rows.
+
+CREATE OR REPLACE FUNCTION public.match_developer_skills(
+  query   halfvec(200),
+  k       int   DEFAULT 10,
+  thresh  float DEFAULT 0.5
+) RETURNS TABLE (
+  id          uuid,
+  username    text,
+  repo_name   text,
+  skill_json  jsonb,
+  updated_at  timestamptz,
+  similarity  float
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+BEGIN
+  PERFORM set_config('hnsw.ef_search', LEAST(1000, GREATEST(40, 2 * k))::text, true);
+  RETURN QUERY
+    SELECT
+      n.id,
+      n.username,
+      n.repo_name,
+      n.skill_json,
+      n.updated_at,
+      (1 - n.dist)::float AS similarity
+    FROM (
+      SELECT d.id, d.username, d.repo_name, d.skill_json, d.updated_at,
+             d.skill_vector <=> query AS dist
+      FROM public.developer_skills d
+      ORDER BY dist
+      LIMIT k
+    ) AS n
+    WHERE n.dist <= 1 - thresh
+    ORDER BY n.dist;
+END;
+$$;
@@ -53,9 +53,9 @@ class DeveloperSkills(Base):
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     
-    # Composite index on username and repo_name for fast lookups
+    # Unique (username, repo_name): the conflict target of the upsert RPCs
     __table_args__ = (
-        Index('idx_username_repo', 'username', 'repo_name'),
+        Index('idx_username_repo', 'username', 'repo_name', unique=True),
         Index('idx_skill_jsonb', 'skill_json', postgresql_using='gin'),
     )
     
@@ -5,11 +5,23 @@ The skill vocabulary (skill_name → vector index) is now backed by the
 The in-memory cache is still used within a single process for speed.
 """
 
-from typing import Dict, List, Optional
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
 
 # --- in-process cache (loaded lazily from DB on first use) ---
 _skill_vocabulary: Dict[str, int] = {}
 _vocab_loaded: bool = False
+# Names whose index is stored in skill_vocabulary (read from it, or inserted by
+# this process). Only these may go into a vector that is written to the
+# database: an index assigned in-process can be given to a different skill by
+# another process, and the stored max-merge would then mix the two in one slot.
+_persisted_names: Set[str] = set()
+_vocab_lock = threading.RLock()
+# Tries for persist_skill_indices when another process takes the same names or indices
+_VOCAB_INSERT_ATTEMPTS = 3
+# Bumped on every change to _skill_vocabulary; keys the index → name cache
+_vocab_version: int = 0
+_reverse_cache: Tuple[int, List[Optional[str]]] = (-1, [])
 
 
 # ---------------------------------------------------------------------------
@@ -17,72 +29,276 @@ _vocab_loaded: bool = False
 # ---------------------------------------------------------------------------
 
 def get_or_create_skill_index(skill_name: str, max_dimensions: int = 200) -> int:
-    global _skill_vocabulary
+    global _skill_vocabulary, _vocab_version
     if skill_name not in _skill_vocabulary:
         if len(_skill_vocabulary) >= max_dimensions:
             raise ValueError(f"Max skill vocabulary ({max_dimensions}) reached")
         _skill_vocabulary[skill_name] = len(_skill_vocabulary)
+        _vocab_version += 1
     return _skill_vocabulary[skill_name]
 
 
 def load_vocabulary_from_skills(skills: Dict[str, int], max_dimensions: int = 200):
+    # Usually every skill is known already; only new ones take the slow path
+    # (in the caller's key order, so indices are assigned deterministically)
     for skill_name in skills:
-        get_or_create_skill_index(skill_name, max_dimensions)
+        if skill_name not in _skill_vocabulary:
+            get_or_create_skill_index(skill_name, max_dimensions)
 
 
 def skills_to_vector(skills: Dict[str, int], max_dimensions: int = 200) -> List[float]:
-    load_vocabulary_from_skills(skills, max_dimensions)
     vec = [0.0] * max_dimensions
-    for name, score in skills.items():
-        if name in _skill_vocabulary:
-            idx = _skill_vocabulary[name]
-            if idx < max_dimensions:
-                vec[idx] = float(score) / 100.0
+    indices, values = skills_to_indices(skills, max_dimensions)
+    for idx, value in zip(indices, values):
+        vec[idx] = value
     return vec
 
 
+def skills_to_indices(skills: Dict[str, int], max_dimensions: int = 200) -> Tuple[List[int], List[float]]:
+    """
+    skills_to_vector in sparse form: (indices, values) of the non-zero entries,
+    sorted by index (0-based). Sized by len(skills) rather than max_dimensions.
+    """
+    load_vocabulary_from_skills(skills, max_dimensions)
+    entries = sorted(
+        (_skill_vocabulary[name], float(score) / 100.0)
+        for name, score in skills.items()
+        if name in _skill_vocabulary and _skill_vocabulary[name] < max_dimensions and score
+    )
+    return [idx for idx, _ in entries], [value for _, value in entries]
+
+
+def encode_batch(
+    skill_dicts: Sequence[Dict[str, int]],
+    max_dimensions: int = 200,
+) -> Tuple[List[int], List[int], List[float]]:
+    """
+    skills_to_indices for many skill dicts at once, in CSR form:
+    (indptr, indices, values), where row i is indices/values[indptr[i]:indptr[i + 1]].
+
+    New skills are added to the vocabulary in one pass up front (in order of
+    first appearance). Skills that no longer fit once the vocabulary is full
+    are left out of their row instead of failing it.
+    """
+    global _vocab_version
+    vocab = _skill_vocabulary
+    size = len(vocab)
+    for skills in skill_dicts:
+        for name in skills:
+            if name not in vocab and len(vocab) < max_dimensions:
+                vocab[name] = len(vocab)
+    if len(vocab) != size:
+        _vocab_version += 1
+    indptr, indices, values = [0], [], []
+    for skills in skill_dicts:
+        entries = sorted(
+            (idx, float(score) / 100.0)
+            for idx, score in ((vocab.get(name), score) for name, score in skills.items())
+            if idx is not None and idx < max_dimensions and score
+        )
+        indices.extend(idx for idx, _ in entries)
+        values.extend(value for _, value in entries)
+        indptr.append(len(indices))
+    return indptr, indices, values
+
+
+def format_sparse(indices: Sequence[int], values: Sequence[float], max_dimensions: int = 200) -> str:
+    """pgvector sparsevec literal for 0-based indices: "{idx:value,...}/dims", 1-based."""
+    return "{" + ",".join(f"{idx + 1}:{value}" for idx, value in zip(indices, values)) + f"}}/{max_dimensions}"
+
+
+def skills_to_sparse(skills: Dict[str, int], max_dimensions: int = 200) -> str:
+    """skills_to_vector as a pgvector sparsevec literal: "{idx:value,...}/dims", 1-based."""
+    indices, values = skills_to_indices(skills, max_dimensions)
+    return format_sparse(indices, values, max_dimensions)
+
+
 def vector_to_skills(
-    vector: List[float],
+    vector: Union[Sequence[float], Tuple[Sequence[int], Sequence[float]], Any],
     vocabulary: Optional[Dict[str, int]] = None,
 ) -> Dict[str, int]:
-    vocab = vocabulary if vocabulary is not None else _skill_vocabulary
-    rev = {idx: name for name, idx in vocab.items()}
-    return {rev[i]: int(v * 100) for i, v in enumerate(vector) if i in rev and v > 0}
+    """
+    Inverse of skills_to_vector. Also accepts the (indices, values) pair from
+    skills_to_indices or a numpy array; either way only the non-zero entries
+    are visited.
+    """
+    rev = _reverse_vocabulary() if vocabulary is None else _invert(vocabulary)
+    if isinstance(vector, tuple) and len(vector) == 2 and not isinstance(vector[0], (int, float)):
+        pairs = zip(*vector)
+    elif hasattr(vector, "nonzero") and hasattr(vector, "tolist"):
+        # numpy array: find the non-zero slots in one C-level scan
+        nz = vector.nonzero()[0]
+        pairs = zip(nz.tolist(), vector[nz].tolist())
+    else:
+        pairs = ((i, v) for i, v in enumerate(vector) if v)
+    size = len(rev)
+    return {rev[i]: round(v * 100) for i, v in pairs if v > 0 and i < size and rev[i] is not None}
+
+
+def _invert(vocabulary: Dict[str, int]) -> List[Optional[str]]:
+    """index → name as a list (None for unused slots)."""
+    rev: List[Optional[str]] = [None] * (max(vocabulary.values(), default=-1) + 1)
+    for name, idx in vocabulary.items():
+        rev[idx] = name
+    return rev
+
+
+def _reverse_vocabulary() -> List[Optional[str]]:
+    """_invert(_skill_vocabulary), rebuilt only after the vocabulary changes."""
+    global _reverse_cache
+    if _reverse_cache[0] != _vocab_version:
+        _reverse_cache = (_vocab_version, _invert(_skill_vocabulary))
+    return _reverse_cache[1]
 
 
 def merge_skill_vectors(old: Dict[str, int], new: Dict[str, int]) -> Dict[str, int]:
-    merged = old.copy()
+    return merge_skill_vectors_into(old.copy(), new)
+
+
+def merge_skill_vectors_into(merged: Dict[str, int], new: Dict[str, int]) -> Dict[str, int]:
+    """merge_skill_vectors updating merged in place (and returning it)."""
+    # Per-key max over dicts of ~5-20 skills; a dense numpy maximum would
+    # spend more on encoding/decoding 200 slots than on the max itself
+    get = merged.get
     for name, score in new.items():
-        merged[name] = max(merged.get(name, 0), score)
+        current = get(name)
+        if current is None:
+            merged[name] = score if score > 0 else 0
+        elif score > current:
+            merged[name] = score
     return merged
 
 
 def build_vocabulary_from_db(skill_jsons: List[Dict[str, int]], max_dimensions: int = 200):
-    """Rebuild in-memory vocab from a list of skill dicts (used during initialisation)."""
-    global _skill_vocabulary
-    all_skills: set[str] = set()
+    """
+    Rebuild in-memory vocab from a list of skill dicts (used during initialisation).
+
+    One pass over the dicts, stopping as soon as the vocabulary would be full;
+    the new names then get indices in name order. When there are more new
+    skills than free slots, the first ones seen win.
+    """
+    global _vocab_version
+    free = max_dimensions - len(_skill_vocabulary)
+    if free <= 0:
+        return
+    new: Dict[str, None] = {}
     for s in skill_jsons:
-        if s:
-            all_skills.update(s.keys())
-    for name in sorted(all_skills):
+        for name in s or ():
+            if name not in _skill_vocabulary and name not in new:
+                new[name] = None
+                if len(new) == free:
+                    break
+        if len(new) == free:
+            break
+    for name in sorted(new):
+        _skill_vocabulary[name] = len(_skill_vocabulary)
+    if new:
+        _vocab_version += 1
+
+
+def build_vocabulary_from_counts(rows: List[dict], max_dimensions: int = 200) -> List[str]:
+    """
+    Rebuild in-memory vocab from per-skill counts aggregated in Postgres.
+
+    rows are {"skill_name", "c"} dicts from the skill_key_counts RPC; the most
+    used skills win when there are more than max_dimensions, and they get
+    indices in name order as in build_vocabulary_from_db.
+
+    Returns the chosen names, in index order.
+    """
+    global _vocab_version
+    top = sorted(rows, key=lambda r: (-r["c"], r["skill_name"]))[:max_dimensions]
+    names = sorted(r["skill_name"] for r in top)
+    for name in names:
         if len(_skill_vocabulary) < max_dimensions:
             _skill_vocabulary.setdefault(name, len(_skill_vocabulary))
+    _vocab_version += 1
+    return names
 
 
 # ---------------------------------------------------------------------------
 # DB-backed vocabulary (called by DatabaseManager.initialize_vocabulary)
 # ---------------------------------------------------------------------------
 
-def load_vocabulary_from_supabase(client, max_dimensions: int = 200):
-    """Fetch skill_vocabulary rows from Supabase and populate in-memory cache."""
-    global _skill_vocabulary, _vocab_loaded
-    try:
-        resp = client.table("skill_vocabulary").select("skill_name, idx").execute()
-        for row in resp.data or []:
-            name = row["skill_name"]
-            idx = row["idx"]
-            if idx < max_dimensions:
-                _skill_vocabulary[name] = idx
-        _vocab_loaded = True
-    except Exception:
-        pass  # table may not exist yet; fall back to in-memory behaviour
+def load_vocabulary_from_supabase(client, max_dimensions: int = 200, force: bool = False) -> int:
+    """
+    Fetch skill_vocabulary rows from Supabase and populate in-memory cache.
+
+    The table is only read once per process; pass force=True to re-read it.
+    Rows beyond max_dimensions are filtered server-side. The table replaces
+    the in-memory vocabulary, dropping indices that were only assigned here.
+
+    Returns the size of the in-memory vocabulary afterwards.
+    """
+    global _vocab_loaded, _vocab_version
+    with _vocab_lock:
+        if _vocab_loaded and not force:
+            return len(_skill_vocabulary)
+        try:
+            resp = (
+                client.table("skill_vocabulary")
+                .select("skill_name, idx")
+                .lt("idx", max_dimensions)
+                .execute()
+            )
+            stored = {row["skill_name"]: row["idx"] for row in resp.data or []}
+            _skill_vocabulary.clear()
+            _skill_vocabulary.update(stored)
+            _persisted_names.clear()
+            _persisted_names.update(stored)
+            _vocab_version += 1
+            _vocab_loaded = True
+        except Exception:
+            pass  # table may not exist yet; fall back to in-memory behaviour
+        return len(_skill_vocabulary)
+
+
+def unpersisted_skill_names(skill_dicts: Iterable[Dict[str, int]]) -> List[str]:
+    """Names in skill_dicts without a skill_vocabulary row known to this process, sorted."""
+    return sorted({name for skills in skill_dicts for name in skills if name not in _persisted_names})
+
+
+def persisted_skills(skills: Dict[str, int]) -> Dict[str, int]:
+    """The entries of skills whose index is stored in skill_vocabulary (safe to put in a vector)."""
+    return {name: score for name, score in skills.items() if name in _persisted_names}
+
+
+def persist_skill_indices(client, skill_names: Iterable[str], max_dimensions: int = 200) -> None:
+    """
+    Give each of skill_names a row in skill_vocabulary before its index is
+    written anywhere. No I/O when every name is already known to be stored.
+
+    The table is re-read first (another process may have added these names,
+    or taken the next free indices), then the missing names are inserted with
+    the next indices, in name order. The unique constraints on skill_name and
+    idx reject an insert that lost a race; it is retried after re-reading.
+    Names that don't fit once the vocabulary is full (or that still fail)
+    stay unpersisted, and persisted_skills leaves them out of vectors.
+    """
+    global _vocab_version
+    missing = {name for name in skill_names if name not in _persisted_names}
+    if not missing:
+        return
+    with _vocab_lock:
+        for _ in range(_VOCAB_INSERT_ATTEMPTS):
+            load_vocabulary_from_supabase(client, max_dimensions, force=True)
+            names = sorted(name for name in missing if name not in _persisted_names)
+            if not names:
+                return
+            start = max(_skill_vocabulary.values(), default=-1) + 1
+            rows = [
+                {"skill_name": name, "idx": start + i}
+                for i, name in enumerate(names)
+                if start + i < max_dimensions
+            ]
+            if not rows:
+                return  # vocabulary full
+            try:
+                client.table("skill_vocabulary").insert(rows, returning="minimal").execute()
+            except Exception:
+                continue
+            for row in rows:
+                _skill_vocabulary[row["skill_name"]] = row["idx"]
+                _persisted_names.add(row["skill_name"])
+            _vocab_version += 1
+            return
@@ -2,11 +2,14 @@
 
 import os
 import sys
+from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
 
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
 # Load environment variables
-env_path = Path(__file__).parent.parent / ".env"
+env_path = REPO_ROOT / ".env"
 load_dotenv(dotenv_path=env_path)
 
 
@@ -18,7 +21,7 @@ def verify_setup():
     
     # 1. Check logs directory
     print("\n1. Checking logs directory...")
-    logs_dir = Path(__file__).parent.parent / "logs"
+    logs_dir = REPO_ROOT / "logs"
     try:
         logs_dir.mkdir(parents=True, exist_ok=True)
         if logs_dir.exists():
@@ -33,13 +36,15 @@ def verify_setup():
     # 2. Check logger
     print("\n2. Checking database logger...")
     try:
-        from database.logger import get_db_logger
+        from database.logger import flush_db_logs, get_db_logger
         logger = get_db_logger("verify")
         logger.info("Test log message - logger is working")
         print("   ✓ Logger imported and initialized")
+        # The record is queued and buffered; write it out before looking for the file
+        flush_db_logs()
         
         # Check if log file was created
-        date_str = __import__("datetime").datetime.now().strftime("%Y-%m-%d")
+        date_str = datetime.now().strftime("%Y-%m-%d")
         log_file = logs_dir / f"database_{date_str}.log"
         if log_file.exists():
             print(f"   ✓ Log file exists: {log_file}")
@@ -55,9 +60,8 @@ def verify_setup():
     print("\n3. Checking DATABASE_URL...")
     db_url = os.environ.get("DATABASE_URL")
     if db_url:
-        # Mask password
-        masked_url = db_url.split("@")[0] + "@***" if "@" in db_url else db_url
-        print(f"   ✓ DATABASE_URL is set: {masked_url}")
+        from database.db_async import mask_database_url
+        print(f"   ✓ DATABASE_URL is set: {mask_database_url(db_url)}")
     else:
         print("   ⚠ DATABASE_URL not set (database operations will be skipped)")
         return True  # This is OK, just means DB won't work
@@ -110,10 +114,14 @@ def verify_setup():
         "database/vector_utils.py",
         "utils/db_utils.py",
     ]
+    # One directory listing per folder instead of a stat per file
+    existing = set()
+    for folder in {file_path.split("/")[0] for file_path in db_files}:
+        with os.scandir(REPO_ROOT / folder) as entries:
+            existing.update(f"{folder}/{entry.name}" for entry in entries)
     all_exist = True
     for file_path in db_files:
-        full_path = Path(__file__).parent.parent / file_path
-        if full_path.exists():
+        if file_path in existing:
             print(f"   ✓ {file_path}")
         else:
             print(f"   ❌ {file_path} not found")
@@ -21,7 +21,8 @@ def test_check_file_cache_hit():
     mock_client = _mock_client_with_row([{"skill_json": {"python": 80}, "complexity": 60}])
 
     with patch("agent.nodes.check_file_cache.os") as mock_os, \
-         patch("agent.nodes.check_file_cache.create_client", return_value=mock_client):
+         patch("agent.nodes.check_file_cache.create_client", return_value=mock_client), \
+         patch.dict("agent.nodes.check_file_cache._clients", clear=True):
         mock_os.environ.get.side_effect = lambda k, d="": "val" if k in ("SUPABASE_URL", "SUPABASE_SECRET_KEY") else d
         result = check_file_cache({
             "repo_full_name": "jatin/myapp",
@@ -38,7 +39,8 @@ def test_check_file_cache_miss():
     mock_client = _mock_client_with_row([])  # empty = miss
 
     with patch("agent.nodes.check_file_cache.os") as mock_os, \
-         patch("agent.nodes.check_file_cache.create_client", return_value=mock_client):
+         patch("agent.nodes.check_file_cache.create_client", return_value=mock_client), \
+         patch.dict("agent.nodes.check_file_cache._clients", clear=True):
         mock_os.environ.get.side_effect = lambda k, d="": "val" if k in ("SUPABASE_URL", "SUPABASE_SECRET_KEY") else d
         result = check_file_cache({
             "repo_full_name": "jatin/myapp",
@@ -69,3 +71,18 @@ def test_check_file_cache_empty_selected_files():
 
     assert result["cache_hits"] == []
     assert result["cache_misses"] == []
+
+
+def test_merge_cache_hit_skills_keeps_max_per_skill():
+    from agent.nodes.check_file_cache import merge_cache_hit_skills
+
+    hits = [
+        {"path": "a.py", "skill_json": {"python": 60, "docker": 40}},
+        {"path": "b.py", "skill_json": {"python": 80, "bad": "n/a"}},
+        {"path": "c.py", "skill_json": None},
+    ]
+
+    assert merge_cache_hit_skills(hits) == {"python": 80, "docker": 40}
+    assert merge_cache_hit_skills(hits, {"python": 90, "react": 50}) == {
+        "python": 90, "react": 50, "docker": 40,
+    }
@@ -3,7 +3,13 @@ import pytest
 import sys, os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
+from collections import OrderedDict
+
+import database.db as db
+import tools.github as github
+import tools.github_tools as github_tools
 from tools.github import fetch_repo_file_tree
+from tools.github_tools import _trim_patch
 
 
 def test_fetch_repo_file_tree_returns_blobs_only():
@@ -44,3 +50,77 @@ def test_fetch_repo_file_tree_propagates_api_error():
         result = fetch_repo_file_tree("owner", "missing", "main")
 
     assert "error" in result
+
+
+@pytest.mark.parametrize("max_lines", [-1, 0, 1])
+def test_trim_patch_with_tiny_budget_keeps_head_and_tail(max_lines):
+    patch_text = "\n".join(f"line {i}" for i in range(10))
+    result = _trim_patch(patch_text, max_lines)
+
+    if max_lines <= 0:
+        assert result == patch_text  # no budget means no trimming
+    else:
+        assert result.split("\n") == ["line 0", "... <8 lines trimmed> ...", "line 9"]
+
+
+def test_trim_patch_leaves_short_patch_alone():
+    assert _trim_patch("a\nb", 1) == "a\nb"
+
+
+def test_response_cache_evicts_oldest_past_byte_budget():
+    with patch.object(github_tools, "_response_cache", OrderedDict()), \
+            patch.object(github_tools, "_response_cache_bytes", 0), \
+            patch.object(github_tools, "_RESPONSE_CACHE_MAX_BYTES", 10), \
+            patch.object(github_tools, "_MAX_CACHED_BODY_BYTES", 8):
+        github_tools._cache_body(("a", None, False), b"12345")
+        github_tools._cache_body(("b", None, False), b"12345")
+        github_tools._cache_body(("c", None, False), b"123")  # pushes "a" out
+        github_tools._cache_body(("d", None, False), b"123456789")  # too big to keep
+
+        assert list(github_tools._response_cache) == [("b", None, False), ("c", None, False)]
+        assert github_tools._response_cache_bytes == 8
+
+
+def test_etag_cache_evicts_oldest_past_byte_budget():
+    with patch.object(github, "_etag_cache", OrderedDict()), \
+            patch.object(github, "_etag_cache_bytes", 0), \
+            patch.object(github, "_ETAG_CACHE_MAX_BYTES", 10), \
+            patch.object(github, "_ETAG_MAX_BODY_BYTES", 8):
+        github._store_etag(("a",), "e1", b"12345")
+        github._store_etag(("b",), "e2", b"12345")
+        github._store_etag(("a",), "e3", b"123")  # replaces "a" and its bytes
+        github._store_etag(("c",), "e4", b"1234")  # pushes "b" out
+        github._store_etag(("d",), "e5", b"123456789")  # too big to keep
+
+        assert list(github._etag_cache) == [("a",), ("c",)]
+        assert github._etag_cache_bytes == 7
+
+
+def test_read_cache_invalidates_only_that_username():
+    with patch.object(db, "_read_cache", OrderedDict()), \
+            patch.object(db, "_read_keys_by_user", {}), \
+            patch.object(db, "_read_generations", {}):
+        db._cached_read(("get_skill_vector", "alice", None), lambda: {"id": 1})
+        db._cached_read(("get_all_repos_for_user", "alice"), lambda: [{"id": 1}])
+        db._cached_read(("get_skill_vector", "bob", None), lambda: {"id": 2})
+
+        db.invalidate_reads("alice")
+
+        assert db.cache_lookup(("get_skill_vector", "alice", None)) == (False, None)
+        assert db.cache_lookup(("get_all_repos_for_user", "alice")) == (False, None)
+        assert db.cache_lookup(("get_skill_vector", "bob", None)) == (True, {"id": 2})
+        assert "alice" not in db._read_keys_by_user
+
+
+def test_read_cache_skips_fetch_that_raced_an_invalidation():
+    key = ("get_skill_vector", "alice", None)
+
+    def fetch_while_saving():
+        db.invalidate_reads("alice")  # a save lands mid-fetch
+        return {"id": 1, "stale": True}
+
+    with patch.object(db, "_read_cache", OrderedDict()), \
+            patch.object(db, "_read_keys_by_user", {}), \
+            patch.object(db, "_read_generations", {}):
+        assert db._cached_read(key, fetch_while_saving) == {"id": 1, "stale": True}
+        assert db.cache_lookup(key) == (False, None)
@@ -0,0 +1,36 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from agent.nodes.score_from_languages import is_trivial_repo, score_from_languages
+
+
+def test_small_repo_is_trivial():
+    state = {"repo_metadata": {"size": 12}, "language_bytes": {"Python": 4_000}}
+    assert is_trivial_repo(state)
+
+
+def test_small_reported_size_with_lots_of_code_is_not_trivial():
+    """GitHub's size is 0/stale for freshly pushed repos; the code bytes decide too."""
+    state = {"repo_metadata": {"size": 0}, "language_bytes": {"Python": 500_000}}
+    assert not is_trivial_repo(state)
+
+
+def test_large_repo_is_not_trivial():
+    state = {"repo_metadata": {"size": 4_000}, "language_bytes": {"Python": 500_000}}
+    assert not is_trivial_repo(state)
+
+
+def test_repo_without_languages_is_not_trivial():
+    """No language data means nothing to score from — run the full pipeline."""
+    assert not is_trivial_repo({"repo_metadata": {"size": 1}, "language_bytes": {}})
+
+
+def test_scores_follow_language_share_and_stay_in_beginner_band():
+    state = {"language_bytes": {"Python": 3_000, "Shell": 1_000}, "selected_files": []}
+    result = score_from_languages(state)
+
+    skills = {s["name"]: s["score"] for s in result["skill_vector"]["skills"]}
+    assert skills == {"python": 22, "shell": 8}
+    assert all(score <= 30 for score in skills.values())
+    assert "complexity_score" in result
+    assert result["model_id"] == "language-heuristic"
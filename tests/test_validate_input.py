@@ -0,0 +1,29 @@
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from agent.nodes.validate_input import validate_input
+
+
+def test_validate_input_expands_bare_repo_to_owner():
+    result = validate_input({"username": "jatin", "repo": "myapp"})
+    assert result["repo_full_name"] == "jatin/myapp"
+    assert result["owner"] == "jatin"
+    assert result["error"] is None
+
+
+def test_validate_input_keeps_explicit_owner():
+    result = validate_input({"username": "jatin", "repo": "octo-org/my.app_v2"})
+    assert result["repo_full_name"] == "octo-org/my.app_v2"
+    assert result["owner"] == "octo-org"
+
+
+def test_validate_input_rejects_malformed_repo():
+    for repo in ("a/b/c", "owner/", "repo name", "../etc"):
+        result = validate_input({"username": "jatin", "repo": repo})
+        assert result["error_class"] == "ValidationError", repo
+
+
+def test_validate_input_rejects_malformed_username():
+    for username in ("-jatin", "ja tin", "x" * 40):
+        result = validate_input({"username": username, "repo": "myapp"})
+        assert result["error_class"] == "ValidationError", username
@@ -3,12 +3,50 @@
 import base64
 import json
 import os
-import urllib.error
-import urllib.request
+import threading
+from collections import OrderedDict
 from typing import Optional
 
+import httpx
+
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # optional: faster parsing of large tree/contents responses
+    _json_loads = json.loads
+
 _BASE_URL = "https://api.github.com"
 
+# One keep-alive client for every call in the process: after the first request
+# to api.github.com the TCP/TLS connection is reused. Sized for the fetch_files
+# node's worker pool.
+_HTTP_LIMITS = httpx.Limits(max_connections=10, max_keepalive_connections=10)
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+
+
+def _get_client() -> httpx.Client:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                # follow_redirects: renamed/transferred repos answer 301, which urllib followed
+                _client = httpx.Client(
+                    base_url=_BASE_URL, limits=_HTTP_LIMITS, timeout=20, follow_redirects=True
+                )
+    return _client
+
+# Last ETag and raw body per (endpoint, Authorization). Every call still goes
+# to GitHub, but with If-None-Match: an unchanged resource answers 304 with no
+# body, and 304s do not count against the rate limit. Small LRU, bounded by
+# total body bytes too since bodies can be whole files; bodies over
+# _ETAG_MAX_BODY_BYTES are not kept.
+_ETAG_CACHE_SIZE = 256
+_ETAG_CACHE_MAX_BYTES = 32 * 1024 * 1024
+_ETAG_MAX_BODY_BYTES = 256 * 1024
+_etag_cache: "OrderedDict[tuple, tuple[str, bytes]]" = OrderedDict()
+_etag_cache_bytes = 0
+_etag_lock = threading.Lock()
+
 _IGNORED_DIRS = {
     "node_modules", ".git", ".svn", ".hg", "__pycache__", ".pytest_cache",
     ".mypy_cache", ".venv", "venv", "env", "dist", "build", ".next",
@@ -29,14 +67,41 @@ def _headers() -> dict:
     return h
 
 
+def _store_etag(key: tuple, etag: str, body: bytes):
+    global _etag_cache_bytes
+    with _etag_lock:
+        old = _etag_cache.pop(key, None)
+        if old is not None:
+            _etag_cache_bytes -= len(old[1])
+        if len(body) > _ETAG_MAX_BODY_BYTES:
+            return
+        _etag_cache[key] = (etag, body)
+        _etag_cache_bytes += len(body)
+        while len(_etag_cache) > _ETAG_CACHE_SIZE or _etag_cache_bytes > _ETAG_CACHE_MAX_BYTES:
+            _, (_, evicted) = _etag_cache.popitem(last=False)
+            _etag_cache_bytes -= len(evicted)
+
+
 def _get(endpoint: str) -> dict | list:
-    url = f"{_BASE_URL}{endpoint}"
-    req = urllib.request.Request(url, headers=_headers())
     try:
-        with urllib.request.urlopen(req, timeout=20) as resp:
-            return json.loads(resp.read().decode())
-    except urllib.error.HTTPError as e:
-        return {"error": f"HTTP {e.code}: {e.reason}", "status_code": e.code}
+        headers = _headers()
+        key = (endpoint, headers.get("Authorization"))
+        with _etag_lock:
+            cached = _etag_cache.get(key)
+            if cached is not None:
+                _etag_cache.move_to_end(key)
+        if cached is not None:
+            headers["If-None-Match"] = cached[0]
+        resp = _get_client().get(endpoint, headers=headers)
+        if resp.status_code == 304 and cached is not None:
+            return _json_loads(cached[1])
+        if resp.is_error:
+            return {"error": f"HTTP {resp.status_code}: {resp.reason_phrase}", "status_code": resp.status_code}
+        etag = resp.headers.get("ETag")
+        if etag:
+            _store_etag(key, etag, resp.content)
+        # Both parsers take the raw bytes (UTF-8 detected), no separate decode
+        return _json_loads(resp.content)
     except Exception as e:
         return {"error": str(e)}
 
@@ -80,35 +145,12 @@ def fetch_default_branch_sha(owner: str, repo: str, branch: str) -> str:
     return data.get("object", {}).get("sha", "")
 
 
-def fetch_repo_file_paths(owner: str, repo: str, branch: str) -> dict:
-    """
-    Return all file paths in the repo using the Git Trees API (single call).
-    Ignores common build / dependency directories.
-    """
-    data = _get(f"/repos/{owner}/{repo}/git/trees/{branch}?recursive=1")
-    if "error" in data:
-        return data
-
-    all_files = []
-    for item in data.get("tree", []):
-        if item.get("type") != "blob":
-            continue
-        path: str = item.get("path", "")
-        parts = path.split("/")
-        # drop if any dir component is in the ignore list
-        if any(p in _IGNORED_DIRS for p in parts[:-1]):
-            continue
-        if path.endswith(_IGNORED_SUFFIXES):
-            continue
-        all_files.append(path)
-
-    return {
-        "repo": f"{owner}/{repo}",
-        "branch": branch,
-        "total_files": len(all_files),
-        "file_paths": sorted(all_files),
-        "truncated": data.get("truncated", False),
-    }
+def _is_ignored_path(path: str) -> bool:
+    parts = path.split("/")
+    # drop if any dir component is in the ignore list
+    if any(p in _IGNORED_DIRS for p in parts[:-1]):
+        return True
+    return path.endswith(_IGNORED_SUFFIXES)
 
 
 def fetch_repo_file_tree(owner: str, repo: str, branch: str) -> dict:
@@ -126,10 +168,7 @@ def fetch_repo_file_tree(owner: str, repo: str, branch: str) -> dict:
         if item.get("type") != "blob":
             continue
         path: str = item.get("path", "")
-        parts = path.split("/")
-        if any(p in _IGNORED_DIRS for p in parts[:-1]):
-            continue
-        if path.endswith(_IGNORED_SUFFIXES):
+        if _is_ignored_path(path):
             continue
         file_tree.append({"path": path, "blob_sha": item.get("sha", "")})
 
@@ -142,6 +181,24 @@ def fetch_repo_file_tree(owner: str, repo: str, branch: str) -> dict:
     }
 
 
+def fetch_repo_file_paths(owner: str, repo: str, branch: str) -> dict:
+    """
+    Return all file paths in the repo using the Git Trees API (single call).
+    Ignores common build / dependency directories.
+    """
+    result = fetch_repo_file_tree(owner, repo, branch)
+    if "error" in result:
+        return result
+
+    return {
+        "repo": result["repo"],
+        "branch": branch,
+        "total_files": result["total_files"],
+        "file_paths": sorted(f["path"] for f in result["file_tree"]),
+        "truncated": result["truncated"],
+    }
+
+
 def fetch_repo_file(owner: str, repo: str, file_path: str, branch: str) -> dict:
     """Fetch the decoded content of a single file."""
     data = _get(f"/repos/{owner}/{repo}/contents/{file_path}?ref={branch}")
@@ -1,20 +1,343 @@
 
+import asyncio
+import functools
 import os
+import re
+import shlex
 import subprocess
-import base64
-from typing import List, Dict, Any, Optional
+import hashlib
+import operator
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import quote
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
 import json
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # optional: faster parsing of large list/tree responses
+    _json_loads = json.loads
+
+import requests
+from requests.adapters import HTTPAdapter
+
 from tools.logger import get_tool_logger as get_logger
+from tools.utils import _literal_matcher, _ripgrep_files, _search_tree
+
+# Upper bound on concurrent GitHub requests issued by the batch tools
+_MAX_CONCURRENT_FETCHES = 10
+_REQUEST_TIMEOUT = 30  # seconds
+# Raw file downloads are streamed and abandoned past this size (the JSON
+# contents API's own limit for inline content); larger files are rarely
+# source an agent can use, and raw allows up to 100 MB
+_MAX_RAW_FILE_BYTES = 1024 * 1024
+_RAW_CHUNK_SIZE = 64 * 1024
+
+# Recent API response bodies keyed by (url, token): an agent exploring a repo
+# re-requests the same endpoints within seconds. Raw bytes are cached and
+# decoded per hit so callers never share (and mutate) one object; the
+# Link rel="next" URL is kept alongside for paginated endpoints. Past the
+# TTL an entry is revalidated with its ETag: a 304 does not count against
+# the rate limit and carries no body. Stale entries are kept for that, so the
+# cache is bounded by total body bytes as well as entry count, and bodies
+# larger than _MAX_CACHED_BODY_BYTES (big raw files) are not cached at all.
+_RESPONSE_CACHE_SIZE = 1024
+_RESPONSE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+_MAX_CACHED_BODY_BYTES = 256 * 1024
+_RESPONSE_TTL = 60.0  # seconds
+_CacheKey = Tuple[str, Optional[str], bool]  # (url, token, raw)
+_response_cache: "OrderedDict[_CacheKey, Tuple[float, bytes, Optional[str], Optional[str]]]" = OrderedDict()
+_response_cache_lock = threading.Lock()
+_response_cache_bytes = 0
+
+
+def _cached_entry(key: _CacheKey) -> Optional[Tuple[bool, bytes, Optional[str], Optional[str]]]:
+    """Return (fresh, body, next_url, etag) for a cached response, stale or not."""
+    with _response_cache_lock:
+        hit = _response_cache.get(key)
+        if hit is None:
+            return None
+        _response_cache.move_to_end(key)
+        return hit[0] > time.monotonic(), hit[1], hit[2], hit[3]
+
+
+def _cache_body(
+    key: _CacheKey,
+    body: bytes,
+    next_url: Optional[str] = None,
+    etag: Optional[str] = None,
+):
+    global _response_cache_bytes
+    with _response_cache_lock:
+        old = _response_cache.pop(key, None)
+        if old is not None:
+            _response_cache_bytes -= len(old[1])
+        if len(body) > _MAX_CACHED_BODY_BYTES:
+            return
+        _response_cache[key] = (time.monotonic() + _RESPONSE_TTL, body, next_url, etag)
+        _response_cache_bytes += len(body)
+        while len(_response_cache) > _RESPONSE_CACHE_SIZE or _response_cache_bytes > _RESPONSE_CACHE_MAX_BYTES:
+            _, evicted = _response_cache.popitem(last=False)
+            _response_cache_bytes -= len(evicted[1])
+
+
+# Epoch second at which each (token, rate-limit resource) may call again, set
+# once GitHub reports the quota as used up. Until then requests are answered
+# locally: more calls would only come back 403/429 and delay the reset.
+_rate_limit_resets: Dict[Tuple[Optional[str], str], float] = {}
+
+
+def _rate_limit_resource(url: str) -> str:
+    return "search" if "/search/" in url else "core"
+
+
+def _note_rate_limit(key: Tuple[Optional[str], str], response: requests.Response):
+    """Record when the quota resets if this response used it up (or was throttled)."""
+    headers = response.headers
+    if response.status_code in (403, 429) and "Retry-After" in headers:
+        # secondary (abuse) limit: no reset time, just a delay
+        _rate_limit_resets[key] = time.time() + float(headers["Retry-After"])
+    elif headers.get("X-RateLimit-Remaining") == "0" and "X-RateLimit-Reset" in headers:
+        _rate_limit_resets[key] = float(headers["X-RateLimit-Reset"])
+
+
+@functools.lru_cache(maxsize=1)
+def _default_session() -> requests.Session:
+    """Process-wide keep-alive session shared by all GithubTools instances."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=_MAX_CONCURRENT_FETCHES)
+    session.mount("https://", adapter)
+    return session
+
+
+# fetch_user_repos output field -> (GitHub API field, default)
+_REPO_FIELDS = {
+    "name": ("name", ""),
+    "full_name": ("full_name", ""),
+    "description": ("description", ""),
+    "language": ("language", ""),
+    "stars": ("stargazers_count", 0),
+    "forks": ("forks_count", 0),
+    "created_at": ("created_at", ""),
+    "updated_at": ("updated_at", ""),
+    "size": ("size", 0),
+    "default_branch": ("default_branch", "main"),
+}
+
+# fetch_user_pull_requests output field -> (GitHub API field, default); "repo" is derived
+_PULL_REQUEST_FIELDS = {
+    "number": ("number", 0),
+    "title": ("title", ""),
+    "body": ("body", ""),
+    "state": ("state", ""),
+    "created_at": ("created_at", ""),
+    "updated_at": ("updated_at", ""),
+    "url": ("html_url", ""),
+}
+
+# fetch_commit_diff "files_changed" field -> (GitHub API field, default); "patch" is trimmed separately
+_DIFF_FILE_FIELDS = {
+    "filename": ("filename", ""),
+    "status": ("status", ""),  # added, modified, removed, renamed
+    "additions": ("additions", 0),
+    "deletions": ("deletions", 0),
+    "changes": ("changes", 0),
+}
+
+
+def _projector(fields: Dict[str, Tuple[str, Any]]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """
+    item -> {output field: item[API field]} for one of the field maps above.
+    GitHub sends every field (null rather than absent), so one itemgetter call
+    does the lookups; an item missing one falls back to .get with the defaults.
+    """
+    names = tuple(fields)
+    getter = operator.itemgetter(*(key for key, _ in fields.values()))
+
+    def project(item: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            return dict(zip(names, getter(item)))
+        except KeyError:
+            return {field: item.get(key, default) for field, (key, default) in fields.items()}
+
+    return project
+
+
+_project_repo = _projector(_REPO_FIELDS)
+_project_pull_request = _projector(_PULL_REQUEST_FIELDS)
+_project_diff_file = _projector(_DIFF_FILE_FIELDS)
+
+
+def _read_git_head(working_dir: str) -> Optional[Tuple[Optional[str], str]]:
+    """
+    (branch or None if detached, commit SHA) of the repo at working_dir, read
+    straight from .git without spawning git; None when it can't be resolved
+    this way (worktree/submodule .git files, missing refs, ...).
+    """
+    git_dir = os.path.join(working_dir, ".git")
+    try:
+        with open(os.path.join(git_dir, "HEAD")) as f:
+            head = f.read().strip()
+        if not head.startswith("ref: "):
+            return None, head
+        ref = head[5:]
+        try:
+            with open(os.path.join(git_dir, ref)) as f:
+                sha = f.read().strip()
+        except FileNotFoundError:
+            sha = None
+            with open(os.path.join(git_dir, "packed-refs")) as f:
+                for line in f:
+                    if line.endswith(f" {ref}\n") or line.endswith(f" {ref}"):
+                        sha = line.split(" ", 1)[0]
+                        break
+        if not sha:
+            return None
+        return ref.removeprefix("refs/heads/"), sha
+    except OSError:
+        return None
+
+
+# Common directories and files to ignore when listing a repository
+_IGNORED_PATTERNS = [
+    "node_modules",
+    ".git",
+    ".svn",
+    ".hg",
+    "__pycache__",
+    ".pytest_cache",
+    ".mypy_cache",
+    ".venv",
+    "venv",
+    "env",
+    ".env",
+    "dist",
+    "build",
+    ".next",
+    ".nuxt",
+    ".cache",
+    "coverage",
+    ".nyc_output",
+    ".idea",
+    ".vscode",
+    ".DS_Store",
+    "*.pyc",
+    "*.pyo",
+    "*.pyd",
+    ".classpath",
+    ".project",
+    ".settings",
+    "target",
+    "out",
+    "bin",
+    "obj",
+    ".gradle",
+    ".mvn",
+    "vendor",
+    "bower_components",
+    ".sass-cache",
+    ".parcel-cache",
+]
+# Split once: path parts are matched by set lookup, "*.x" patterns by one endswith
+_IGNORE_EXACT = frozenset(p.lower() for p in _IGNORED_PATTERNS if not p.startswith("*"))
+_IGNORE_SUFFIXES = tuple(p[1:].lower() for p in _IGNORED_PATTERNS if p.startswith("*"))
+
+
+def _is_ignored_name(name: str) -> bool:
+    """Check if one path component (file or directory name) is ignored."""
+    name = name.lower()
+    # ".env.local", ".env.production", ... are env files too
+    return name in _IGNORE_EXACT or name.endswith(_IGNORE_SUFFIXES) or name.startswith(".env.")
+
+
+def _should_ignore_path(path: str) -> bool:
+    """Check if a path should be ignored based on common patterns."""
+    return any(_is_ignored_name(part) for part in path.split("/"))
+
+
+def _local_tree_paths(working_dir: str, owner: str, repo: str, branch: str) -> Optional[List[str]]:
+    """
+    Paths of the regular files on branch, read with git ls-tree from a clone
+    of owner/repo at working_dir; None when there is no such clone or it
+    doesn't have the branch (callers then ask the API).
+    """
+    if not os.path.isdir(os.path.join(working_dir, ".git")):
+        return None
+
+    def _git(*args: str) -> Optional[bytes]:
+        result = subprocess.run(
+            ["git", *args], cwd=working_dir, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        return result.stdout if result.returncode == 0 else None
+
+    origin = _git("config", "--get", "remote.origin.url")
+    if origin is None:
+        return None
+    # https://github.com/owner/repo(.git) or git@github.com:owner/repo(.git)
+    origin_repo = origin.decode().strip().replace(":", "/").removesuffix(".git").lower()
+    if not origin_repo.endswith(f"/{owner}/{repo}".lower()):
+        return None
+    for ref in (f"refs/remotes/origin/{branch}", f"refs/heads/{branch}"):
+        listing = _git("ls-tree", "-r", "-z", ref)
+        if listing is not None:
+            break
+    else:
+        return None
+    paths = []
+    # "<mode> <type> <sha>\t<path>" entries, NUL-terminated
+    for entry in listing.decode("utf-8", "surrogateescape").split("\0"):
+        meta, _, path = entry.partition("\t")
+        # Regular files only, as from the trees API
+        if path and meta.split(" ")[1:2] == ["blob"] and not meta.startswith("120000"):
+            paths.append(path)
+    return paths
+
+
+# Characters that need /bin/sh to interpret (git_tool falls back to the shell)
+_SHELL_SYNTAX = re.compile(r"[|&;<>()$`*?~\n]")
+
+
+def _read_capped(response: requests.Response, limit: int) -> Optional[bytes]:
+    """Body of a streamed response, read in chunks; None once it exceeds limit (the rest is never downloaded)."""
+    length = response.headers.get("Content-Length", "")
+    if length.isdigit() and int(length) > limit:
+        return None
+    body = bytearray()
+    for chunk in response.iter_content(_RAW_CHUNK_SIZE):
+        body += chunk
+        if len(body) > limit:
+            return None
+    return bytes(body)
+
+
+def _trim_patch(patch: str, max_lines: int) -> str:
+    """Keep the first and last max_lines // 2 lines of a long patch, with a marker in between."""
+    if max_lines <= 0 or patch.count("\n") < max_lines:
+        return patch
+    lines = patch.split("\n")
+    half = max(1, max_lines // 2)
+    trimmed = len(lines) - 2 * half
+    if trimmed <= 0:
+        return patch
+    return "\n".join(lines[:half] + [f"... <{trimmed} lines trimmed> ..."] + lines[len(lines) - half:])
 
 
 class GithubTools:
     """Tools for interacting with Github repositories and API."""
 
-    def __init__(self, working_dir: str = ".", github_token: Optional[str] = None):
+    def __init__(
+        self,
+        working_dir: str = ".",
+        github_token: Optional[str] = None,
+        session: Optional[requests.Session] = None,
+    ):
         self.working_dir = working_dir
         self.github_token = github_token or os.environ.get("GITHUB_TOKEN")
         self.base_url = "https://api.github.com"
+        # Reuse pooled connections to api.github.com across calls and instances
+        self.session = session or _default_session()
 
     def get_tools(self):
         return [
@@ -31,6 +354,9 @@ class GithubTools:
             self.fetch_repo_details,
             self.fetch_repo_file_paths,
             self.fetch_repo_file,
+            self.fetch_repo_files_batch,
+            self.fetch_commit_diffs_batch,
+            self.fetch_repo_languages_batch,
         ]
 
     def read_file(self, file_path: str) -> str:
@@ -72,28 +398,31 @@ class GithubTools:
             logger.error(f"Error listing directory: {e}")
             return [f"Error listing directory: {e}"]
 
-    def search_file_content(self, pattern: str, path: str = ".") -> List[str]:
+    def search_file_content(
+        self, pattern: str, path: str = ".", more_patterns: Optional[List[str]] = None
+    ) -> List[str]:
         """
         Searches for a pattern in files in a given path.
 
         Args:
             pattern: The pattern to search for.
             path: The path to the directory.
+            more_patterns: Further patterns; a file matches if it contains any
+                           of them. All patterns are searched in one pass.
 
         Returns:
             A list of files containing the pattern.
         """
         logger = get_logger("search_file_content")
         full_path = os.path.join(self.working_dir, path)
-        logger.info(f"Searching for pattern '{pattern}' in path '{full_path}'")
+        patterns = [pattern, *(more_patterns or [])]
+        logger.info(f"Searching for pattern(s) {patterns} in path '{full_path}'")
         try:
-            matching_files = []
-            for root, _, files in os.walk(full_path):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    if self.read_file(file_path).find(pattern) != -1:
-                        matching_files.append(file_path)
-            return matching_files
+            found = _ripgrep_files(patterns, full_path)
+            if found is not None:
+                return found
+            
+            return _search_tree(full_path, _literal_matcher(tuple(patterns)))
         except Exception as e:
             logger.error(f"Error searching for pattern: {e}")
             return [f"Error searching for pattern: {e}"]
@@ -137,54 +466,210 @@ class GithubTools:
         """
         logger = get_logger("git_tool")
         logger.info(f"Executing git command: {command}")
-        return self.run_shell_command(f"git {command}")
+        # The most common queries are answered from .git directly (no fork/exec)
+        query = " ".join(command.split())
+        if query in ("rev-parse HEAD", "rev-parse --abbrev-ref HEAD", "branch --show-current"):
+            head = _read_git_head(self.working_dir)
+            if head is not None:
+                branch, sha = head
+                if query == "rev-parse HEAD":
+                    return f"{sha}\n"
+                if query == "branch --show-current":
+                    return f"{branch}\n" if branch else ""
+                return f"{branch or 'HEAD'}\n"
+        # Plain git invocations are exec'd directly; only commands that use
+        # shell syntax (pipes, redirects, ...) still go through /bin/sh
+        if _SHELL_SYNTAX.search(command):
+            return self.run_shell_command(f"git {command}")
+        try:
+            args = shlex.split(command)
+        except ValueError:  # unbalanced quotes: let the shell report it
+            return self.run_shell_command(f"git {command}")
+        try:
+            result = subprocess.run(
+                ["git", *args],
+                check=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                cwd=self.working_dir,
+            )
+            return result.stdout
+        except subprocess.CalledProcessError as e:
+            logger.error(f"Error executing command: {e.stderr}")
+            return f"Error executing command: {e.stderr}"
+        except OSError as e:  # git not installed
+            logger.error(f"Error executing command: {e}")
+            return f"Error executing command: {e}"
 
-    def _make_api_request(self, endpoint: str) -> Dict[str, Any]:
+    def _make_api_request(self, endpoint: str, raw: bool = False) -> Dict[str, Any]:
         """
         Make a GitHub API request.
         
         Args:
             endpoint: API endpoint (e.g., '/users/username/repos')
+            raw: Ask for file contents as raw bytes (see _api_get)
             
         Returns:
             JSON response as dictionary.
         """
+        return self._api_get(f"{self.base_url}{endpoint}", raw=raw)[0]
+
+    def _api_get(self, url: str, raw: bool = False) -> Tuple[Any, Optional[str]]:
+        """
+        GET an absolute GitHub API URL.
+        
+        With raw=True the request asks for the application/vnd.github.raw media
+        type, and a contents endpoint answers with the file itself, returned as
+        bytes. Anything GitHub still answers with JSON (e.g. a directory listing)
+        is parsed as usual.
+        
+        Returns:
+            (JSON response, URL of the next page from the Link header or None).
+            Errors come back as an {"error": ...} dict, as from _make_api_request.
+        """
         logger = get_logger("github_api")
-        url = f"{self.base_url}{endpoint}"
-        headers = {"Accept": "application/vnd.github.v3+json"}
+        cache_key = (url, self.github_token, raw)
+        decode = bytes if raw else _json_loads  # only raw file bodies are cached for raw requests
+        hit = _cached_entry(cache_key)
+        if hit is not None and hit[0]:
+            logger.debug(f"Serving cached API response for: {url}")
+            return decode(hit[1]), hit[2]
+        
+        limit_key = (self.github_token, _rate_limit_resource(url))
+        reset_at = _rate_limit_resets.get(limit_key)
+        if reset_at is not None and reset_at > time.time():
+            error_msg = (
+                f"GitHub API rate limit exhausted until {time.strftime('%H:%M:%S', time.localtime(reset_at))}"
+                " - not sending request"
+            )
+            logger.warning(error_msg)
+            return {"error": error_msg, "status_code": 403, "reset_at": int(reset_at)}, None
+        
+        headers = {"Accept": "application/vnd.github.raw" if raw else "application/vnd.github.v3+json"}
         
         if self.github_token:
             headers["Authorization"] = f"token {self.github_token}"
+        if hit is not None and hit[3]:
+            headers["If-None-Match"] = hit[3]
         
         logger.info(f"Making API request to: {url}")
         
+        response = None
         try:
-            import urllib.request
-            import urllib.error
-            
-            req = urllib.request.Request(url, headers=headers)
-            with urllib.request.urlopen(req) as response:
-                data = json.loads(response.read().decode())
-                return data
-        except urllib.error.HTTPError as e:
-            error_msg = f"GitHub API error: {e.code} - {e.reason}"
-            if e.code == 404:
+            response = self.session.get(url, headers=headers, timeout=_REQUEST_TIMEOUT, stream=raw)
+            _note_rate_limit(limit_key, response)
+            if response.status_code == 304 and hit is not None:
+                logger.debug(f"Cached API response still valid for: {url}")
+                _cache_body(cache_key, hit[1], hit[2], hit[3])
+                return decode(hit[1]), hit[2]
+            response.raise_for_status()
+            if raw:
+                if response.headers.get("Content-Type", "").startswith("application/json"):
+                    return _json_loads(response.content), None
+                body = _read_capped(response, _MAX_RAW_FILE_BYTES)
+                if body is None:
+                    error_msg = f"File is larger than {_MAX_RAW_FILE_BYTES} bytes, not downloaded"
+                    logger.warning(f"{error_msg}: {url}")
+                    return {"error": error_msg}, None
+                _cache_body(cache_key, body, None, response.headers.get("ETag"))
+                return body, None
+            data = _json_loads(response.content)
+            next_url = response.links.get("next", {}).get("url")
+            # only successful responses
+            _cache_body(cache_key, response.content, next_url, response.headers.get("ETag"))
+            return data, next_url
+        except requests.HTTPError as e:
+            status_code = e.response.status_code
+            error_msg = f"GitHub API error: {status_code} - {e.response.reason}"
+            if status_code == 404:
                 error_msg += " (User or resource not found)"
-            elif e.code == 403:
+            elif status_code in (403, 429):
                 error_msg += " (Rate limit exceeded or forbidden - consider using GITHUB_TOKEN)"
             logger.error(error_msg)
-            return {"error": error_msg, "status_code": e.code}
+            error = {"error": error_msg, "status_code": status_code}
+            if status_code in (403, 429) and limit_key in _rate_limit_resets:
+                error["reset_at"] = int(_rate_limit_resets[limit_key])
+            return error, None
         except Exception as e:
             logger.error(f"Error making API request: {e}")
-            return {"error": str(e)}
+            return {"error": str(e)}, None
+        finally:
+            if response is not None:
+                response.close()  # a streamed body may be left partly unread
+
+    def _paginate(self, url: str, items_key: Optional[str] = None) -> Iterator[Any]:
+        """
+        Yield the items of every page of a paginated endpoint, following Link rel="next".
+        Synchronous counterpart of _iter_pages, with the same error behaviour.
+        """
+        while url:
+            data, url = self._api_get(url)
+            if isinstance(data, dict) and "error" in data:
+                yield data
+                return
+            yield from (data.get(items_key, []) if items_key else data)
+
+    async def _iter_pages(self, url: str, items_key: Optional[str] = None) -> AsyncIterator[Any]:
+        """
+        Yield the items of every page of a paginated endpoint, following Link rel="next".
+        The next page is requested while the caller consumes the current one.
+        An error stops the iteration after yielding its {"error": ...} dict.
+        """
+        pending = asyncio.create_task(asyncio.to_thread(self._api_get, url))
+        while pending is not None:
+            data, next_url = await pending
+            if isinstance(data, dict) and "error" in data:
+                yield data
+                return
+            pending = asyncio.create_task(asyncio.to_thread(self._api_get, next_url)) if next_url else None
+            try:
+                for item in (data.get(items_key, []) if items_key else data):
+                    yield item
+            except BaseException:
+                # Caller stopped early (or failed): don't leave the prefetch running unobserved
+                if pending is not None:
+                    pending.cancel()
+                raise
+
+    @staticmethod
+    def _summarize_repo(repo: Dict[str, Any]) -> Dict[str, Any]:
+        return _project_repo(repo)
+
+    @staticmethod
+    def _summarize_pull_request(pr: Dict[str, Any], base_url: str) -> Dict[str, Any]:
+        summary = _project_pull_request(pr)
+        summary["repo"] = pr.get("repository_url", "").replace(f"{base_url}/repos/", "")
+        return summary
+
+    async def iter_user_repos(self, username: str, per_page: int = 100) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield a summary of every public repository of a user, as fetch_user_repos
+        returns them, while later pages are still being fetched.
+        """
+        url = f"{self.base_url}/users/{username}/repos?per_page={per_page}&sort=updated"
+        async for repo in self._iter_pages(url):
+            yield repo if "error" in repo else self._summarize_repo(repo)
 
-    def fetch_user_repos(self, username: str, per_page: int = 100) -> Dict[str, Any]:
+    async def iter_user_pull_requests(self, username: str, per_page: int = 100) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield a summary of every pull request created by a user, across all pages
+        (the search API stops at 1000 results). Same fields as fetch_user_pull_requests.
+        """
+        url = f"{self.base_url}/search/issues?q=author:{username}+type:pr&per_page={per_page}&sort=updated"
+        async for pr in self._iter_pages(url, items_key="items"):
+            yield pr if "error" in pr else self._summarize_pull_request(pr, self.base_url)
+
+    def fetch_user_repos(self, username: str, per_page: int = 100, columnar: bool = False) -> Dict[str, Any]:
         """
         Fetch all public repositories for a GitHub user.
         
         Args:
             username: GitHub username
-            per_page: Number of repos per page (max 100)
+            per_page: Number of repos per request (max 100); all pages are read
+            columnar: Return "repos" as one list per field (e.g. {"name": [...],
+                      "stars": [...]}) instead of one dict per repo; more compact,
+                      and ranking/filtering by one field touches one list.
             
         Returns:
             Dictionary with repository data.
@@ -192,27 +677,25 @@ class GithubTools:
         logger = get_logger("fetch_user_repos")
         logger.info(f"Fetching repositories for user: {username}")
         
-        endpoint = f"/users/{username}/repos?per_page={per_page}&sort=updated"
-        repos_data = self._make_api_request(endpoint)
+        url = f"{self.base_url}/users/{username}/repos?per_page={per_page}&sort=updated"
+        repos_data = []
+        for repo in self._paginate(url):
+            if "error" in repo:
+                return repo
+            repos_data.append(repo)
         
-        if "error" in repos_data:
-            return repos_data
+        if columnar:
+            return {
+                "username": username,
+                "total_repos": len(repos_data),
+                "repos": {
+                    field: [repo.get(key, default) for repo in repos_data]
+                    for field, (key, default) in _REPO_FIELDS.items()
+                },
+            }
         
         # Extract relevant repo information
-        repos_summary = []
-        for repo in repos_data:
-            repos_summary.append({
-                "name": repo.get("name", ""),
-                "full_name": repo.get("full_name", ""),
-                "description": repo.get("description", ""),
-                "language": repo.get("language", ""),
-                "stars": repo.get("stargazers_count", 0),
-                "forks": repo.get("forks_count", 0),
-                "created_at": repo.get("created_at", ""),
-                "updated_at": repo.get("updated_at", ""),
-                "size": repo.get("size", 0),
-                "default_branch": repo.get("default_branch", "main"),
-            })
+        repos_summary = [self._summarize_repo(repo) for repo in repos_data]
         
         return {
             "username": username,
@@ -252,7 +735,9 @@ class GithubTools:
             "total_bytes": total_bytes
         }
 
-    def fetch_user_commits(self, username: str, repo: str, per_page: int = 5) -> Dict[str, Any]:
+    def fetch_user_commits(
+        self, username: str, repo: str, per_page: int = 5, since: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Fetch recent commits for a user in a specific repository.
         
@@ -260,6 +745,8 @@ class GithubTools:
             username: GitHub username
             repo: Repository name (owner/repo or just repo if user owns it)
             per_page: Number of commits to fetch (default: 5 for most recent)
+            since: Only commits after this ISO 8601 timestamp (e.g. the "date" of
+                   the newest commit from an earlier call, to get just the new ones)
             
         Returns:
             Dictionary with commit data (messages only, no diffs).
@@ -272,6 +759,8 @@ class GithubTools:
             repo = f"{username}/{repo}"
         
         endpoint = f"/repos/{repo}/commits?author={username}&per_page={per_page}"
+        if since:
+            endpoint += f"&since={quote(since)}"
         commits_data = self._make_api_request(endpoint)
         
         if "error" in commits_data:
@@ -296,7 +785,9 @@ class GithubTools:
             "commits": commits_summary
         }
 
-    def fetch_commit_diff(self, owner: str, repo: str, commit_sha: str) -> Dict[str, Any]:
+    def fetch_commit_diff(
+        self, owner: str, repo: str, commit_sha: str, max_patch_lines: int = 200
+    ) -> Dict[str, Any]:
         """
         Fetch detailed commit information including code changes (diff) for a specific commit.
         
@@ -304,6 +795,8 @@ class GithubTools:
             owner: Repository owner
             repo: Repository name
             commit_sha: Full commit SHA
+            max_patch_lines: Patches longer than this keep only their first and
+                             last max_patch_lines // 2 lines (0 = never trim)
             
         Returns:
             Dictionary with commit details including files changed and patches.
@@ -322,14 +815,8 @@ class GithubTools:
         stats = commit_data.get("stats", {})
         
         for file_info in commit_data.get("files", []):
-            file_data = {
-                "filename": file_info.get("filename", ""),
-                "status": file_info.get("status", ""),  # added, modified, removed, renamed
-                "additions": file_info.get("additions", 0),
-                "deletions": file_info.get("deletions", 0),
-                "changes": file_info.get("changes", 0),
-                "patch": file_info.get("patch", ""),  # The actual diff/patch
-            }
+            file_data = _project_diff_file(file_info)
+            file_data["patch"] = _trim_patch(file_info.get("patch", ""), max_patch_lines)  # The actual diff/patch
             files_changed.append(file_data)
         
         commit_info = commit_data.get("commit", {})
@@ -355,7 +842,7 @@ class GithubTools:
         
         Args:
             username: GitHub username
-            per_page: Number of PRs to fetch
+            per_page: Number of PRs to fetch (more than 100 are read over several pages)
             
         Returns:
             Dictionary with PR data.
@@ -363,25 +850,15 @@ class GithubTools:
         logger = get_logger("fetch_user_pull_requests")
         logger.info(f"Fetching pull requests for user: {username}")
         
-        endpoint = f"/search/issues?q=author:{username}+type:pr&per_page={per_page}&sort=updated"
-        prs_data = self._make_api_request(endpoint)
-        
-        if "error" in prs_data:
-            return prs_data
-        
-        items = prs_data.get("items", [])
-        prs_summary = []
-        for pr in items:
-            prs_summary.append({
-                "number": pr.get("number", 0),
-                "title": pr.get("title", ""),
-                "body": pr.get("body", ""),
-                "state": pr.get("state", ""),
-                "created_at": pr.get("created_at", ""),
-                "updated_at": pr.get("updated_at", ""),
-                "repo": pr.get("repository_url", "").replace(f"{self.base_url}/repos/", ""),
-                "url": pr.get("html_url", ""),
-            })
+        url = f"{self.base_url}/search/issues?q=author:{username}+type:pr&per_page={min(per_page, 100)}&sort=updated"
+        items = []
+        for pr in self._paginate(url, items_key="items"):
+            if "error" in pr:
+                return pr
+            items.append(pr)
+            if len(items) >= per_page:
+                break
+        prs_summary = [self._summarize_pull_request(pr, self.base_url) for pr in items]
         
         return {
             "username": username,
@@ -438,7 +915,8 @@ class GithubTools:
     ) -> Dict[str, Any]:
         """
         Fetch a list of all file paths from a GitHub repository (just paths, no file contents).
-        Recursively traverses the repository to get all file paths.
+        Reads the recursive Git tree of the branch in one request, falling back to
+        walking the contents API directory by directory if GitHub truncates it.
         
         Args:
             owner: Repository owner username
@@ -461,76 +939,49 @@ class GithubTools:
                 return {"error": f"Failed to get repo details: {repo_details.get('error')}"}
             branch = repo_details.get("default_branch", "main")
         
-        # Common directories and files to ignore
-        IGNORED_PATTERNS = [
-            "node_modules",
-            ".git",
-            ".svn",
-            ".hg",
-            "__pycache__",
-            ".pytest_cache",
-            ".mypy_cache",
-            ".venv",
-            "venv",
-            "env",
-            ".env",
-            "dist",
-            "build",
-            ".next",
-            ".nuxt",
-            ".cache",
-            "coverage",
-            ".nyc_output",
-            ".idea",
-            ".vscode",
-            ".DS_Store",
-            "*.pyc",
-            "*.pyo",
-            "*.pyd",
-            ".classpath",
-            ".project",
-            ".settings",
-            "target",
-            "out",
-            "bin",
-            "obj",
-            ".gradle",
-            ".mvn",
-            "vendor",
-            "bower_components",
-            ".sass-cache",
-            ".parcel-cache",
-        ]
+        def _has_extension(file_path: str) -> bool:
+            return not file_extensions or any(file_path.endswith(ext) for ext in file_extensions)
         
-        def _should_ignore_path(path: str) -> bool:
-            """Check if a path should be ignored based on common patterns."""
-            path_lower = path.lower()
-            path_parts = path_lower.split("/")
-            
-            # Check if any part of the path matches ignored patterns
-            for part in path_parts:
-                for pattern in IGNORED_PATTERNS:
-                    pattern_lower = pattern.lower()
-                    # Handle wildcard patterns (e.g., "*.pyc")
-                    if pattern_lower.startswith("*"):
-                        if part.endswith(pattern_lower[1:]):
-                            return True
-                    # Exact match (directory or file name)
-                    elif part == pattern_lower:
-                        return True
-                    # Check if part starts with pattern (for patterns like ".env" matching ".env.local")
-                    elif part.startswith(pattern_lower):
-                        return True
-            return False
+        def _wanted(file_path: str) -> bool:
+            return not _should_ignore_path(file_path) and _has_extension(file_path)
+        
+        prefix = path.strip("/")
+        
+        def _in_prefix(item_path: str) -> bool:
+            return not prefix or item_path == prefix or item_path.startswith(prefix + "/")
         
         file_paths = []
         
-        def _recursive_fetch_paths(current_path: str):
-            # Skip ignored directories
-            if _should_ignore_path(current_path):
-                logger.debug(f"Skipping ignored path: {current_path}")
-                return
-            
+        # A local clone of the repo answers without any API call; otherwise
+        # the whole tree comes in one request, and the per-directory walk
+        # below is only needed when GitHub truncates it (very large repos)
+        local_paths = _local_tree_paths(self.working_dir, owner, repo, branch)
+        if local_paths is not None:
+            logger.info(f"Listing {owner}/{repo}@{branch} from the local clone")
+            file_paths = [p for p in local_paths if _in_prefix(p) and _wanted(p)]
+            walk_contents = False
+        else:
+            tree = self._make_api_request(f"/repos/{owner}/{repo}/git/trees/{branch}?recursive=1")
+            walk_contents = "error" in tree or bool(tree.get("truncated"))
+            if not walk_contents:
+                for item in tree.get("tree", []):
+                    item_path = item.get("path", "")
+                    # Regular files only (contents API lists symlinks separately)
+                    if item.get("type") != "blob" or item.get("mode") == "120000":
+                        continue
+                    if _in_prefix(item_path) and _wanted(item_path):
+                        file_paths.append(item_path)
+            elif "error" in tree:
+                logger.warning(f"Git trees request failed, walking contents instead: {tree.get('error')}")
+            else:
+                logger.info(f"Git tree for {owner}/{repo} truncated, walking contents instead")
+        
+        def _list_dir(current_path: str) -> List[str]:
+            """
+            Add the wanted files of one directory to file_paths; return its
+            subdirectories. current_path is known not to be ignored, so only
+            the names of its entries are checked.
+            """
             endpoint = f"/repos/{owner}/{repo}/contents/{current_path}"
             if branch:
                 endpoint += f"?ref={branch}"
@@ -539,47 +990,47 @@ class GithubTools:
             
             if "error" in items:
                 logger.warning(f"Error fetching path {current_path}: {items.get('error')}")
-                return
+                return []
             
             # Handle single file response
             if isinstance(items, dict) and items.get("type") == "file":
                 file_path = items.get("path", "")
-                # Skip ignored files
-                if _should_ignore_path(file_path):
-                    return
-                # Check file extension filter
-                if file_extensions:
-                    if any(file_path.endswith(ext) for ext in file_extensions):
-                        file_paths.append(file_path)
-                else:
+                if _wanted(file_path):
                     file_paths.append(file_path)
-                return
+                return []
             
             # Handle directory response (list of items)
             if not isinstance(items, list):
-                return
+                return []
             
+            subdirs = []
             for item in items:
                 item_type = item.get("type", "")
                 item_path = item.get("path", "")
                 
                 # Skip ignored paths
-                if _should_ignore_path(item_path):
+                if _is_ignored_name(item.get("name") or item_path.rsplit("/", 1)[-1]):
                     continue
                 
                 if item_type == "file":
-                    # Check file extension filter
-                    if file_extensions:
-                        if any(item_path.endswith(ext) for ext in file_extensions):
-                            file_paths.append(item_path)
-                    else:
+                    if _has_extension(item_path):
                         file_paths.append(item_path)
                 elif item_type == "dir":
-                    # Recursively fetch directory contents
-                    _recursive_fetch_paths(item_path)
+                    subdirs.append(item_path)
+            return subdirs
         
-        # Start recursive fetch
-        _recursive_fetch_paths(path)
+        # Walk the directories as a work queue: each listed directory's
+        # subdirectories are submitted at once, so siblings are fetched
+        # concurrently instead of one after another
+        if walk_contents and _should_ignore_path(path):
+            logger.debug(f"Skipping ignored path: {path}")
+        elif walk_contents:
+            with ThreadPoolExecutor(max_workers=_MAX_CONCURRENT_FETCHES) as pool:
+                pending = {pool.submit(_list_dir, path)}
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        pending.update(pool.submit(_list_dir, subdir) for subdir in future.result())
         
         return {
             "repo": f"{owner}/{repo}",
@@ -623,33 +1074,144 @@ class GithubTools:
         if branch:
             endpoint += f"?ref={branch}"
         
-        file_data = self._make_api_request(endpoint)
+        # Raw media type: the file bytes themselves, not base64 inside JSON
+        file_data = self._make_api_request(endpoint, raw=True)
         
-        if "error" in file_data:
+        if isinstance(file_data, dict) and "error" in file_data:
             return file_data
         
-        # Check if it's actually a file
-        if file_data.get("type") != "file":
-            return {"error": f"Path {file_path} is not a file (type: {file_data.get('type')})"}
+        # Check if it's actually a file (directories still come back as a JSON listing)
+        if not isinstance(file_data, bytes):
+            item_type = file_data.get("type") if isinstance(file_data, dict) else "dir"
+            return {"error": f"Path {file_path} is not a file (type: {item_type})"}
         
-        # Decode base64 content if present
-        content = ""
-        if file_data.get("encoding") == "base64":
-            try:
-                content = base64.b64decode(file_data.get("content", "")).decode("utf-8")
-            except Exception as e:
-                logger.error(f"Error decoding file content: {e}")
-                return {"error": f"Error decoding file content: {e}"}
-        else:
-            content = file_data.get("content", "")
+        try:
+            content = file_data.decode("utf-8")
+        except Exception as e:
+            logger.error(f"Error decoding file content: {e}")
+            return {"error": f"Error decoding file content: {e}"}
         
+        path = file_path.strip("/")
         return {
             "repo": f"{owner}/{repo}",
             "branch": branch,
-            "path": file_data.get("path", ""),
-            "name": file_data.get("name", ""),
-            "size": file_data.get("size", 0),
-            "sha": file_data.get("sha", ""),
+            "path": path,
+            "name": path.rsplit("/", 1)[-1],
+            "size": len(file_data),
+            # Git blob SHA, as the JSON contents response reports it
+            "sha": hashlib.sha1(b"blob %d\0" % len(file_data) + file_data).hexdigest(),
             "content": content,
-            "encoding": file_data.get("encoding", ""),
+            "encoding": "utf-8",
+        }
+
+    async def fetch_repo_files_batch(
+        self,
+        owner: str,
+        repo: str,
+        file_paths: List[str],
+        branch: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Fetch the complete content of several files from a GitHub repository in one call.
+        Files are fetched concurrently; prefer this over calling fetch_repo_file per file.
+        
+        Args:
+            owner: Repository owner username
+            repo: Repository name
+            file_paths: Paths of the files in the repository (e.g., ["src/main.py", "src/app.py"])
+            branch: Branch name (defaults to default branch, usually "main")
+            
+        Returns:
+            Dictionary with one fetch_repo_file result per requested path, in request order.
+        """
+        logger = get_logger("fetch_repo_files_batch")
+        logger.info(f"Fetching {len(file_paths)} files from {owner}/{repo} (branch: {branch or 'default'})")
+        
+        # Resolve the default branch once instead of once per file
+        if not branch:
+            repo_details = await asyncio.to_thread(self.fetch_repo_details, owner, repo)
+            if "error" in repo_details:
+                return {"error": f"Failed to get repo details: {repo_details.get('error')}"}
+            branch = repo_details.get("default_branch", "main")
+        
+        semaphore = asyncio.Semaphore(_MAX_CONCURRENT_FETCHES)
+        
+        async def _fetch_one(file_path: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await asyncio.to_thread(self.fetch_repo_file, owner, repo, file_path, branch)
+        
+        files = await asyncio.gather(*(_fetch_one(file_path) for file_path in file_paths))
+        
+        return {
+            "repo": f"{owner}/{repo}",
+            "branch": branch,
+            "total_files": len(files),
+            "files": files,
+        }
+
+    async def fetch_commit_diffs_batch(
+        self, owner: str, repo: str, commit_shas: List[str], max_patch_lines: int = 200
+    ) -> Dict[str, Any]:
+        """
+        Fetch the code changes (diff) of several commits of a repository in one call.
+        Commits are fetched concurrently; prefer this over calling fetch_commit_diff per commit.
+        
+        Args:
+            owner: Repository owner
+            repo: Repository name
+            commit_shas: Full commit SHAs (e.g., the "sha" fields from fetch_user_commits)
+            max_patch_lines: Passed on to fetch_commit_diff
+            
+        Returns:
+            Dictionary with one fetch_commit_diff result per requested commit, in request order.
+        """
+        logger = get_logger("fetch_commit_diffs_batch")
+        logger.info(f"Fetching {len(commit_shas)} commit diffs for {owner}/{repo}")
+        
+        semaphore = asyncio.Semaphore(_MAX_CONCURRENT_FETCHES)
+        
+        async def _fetch_one(commit_sha: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await asyncio.to_thread(
+                    self.fetch_commit_diff, owner, repo, commit_sha, max_patch_lines
+                )
+        
+        commits = await asyncio.gather(*(_fetch_one(commit_sha) for commit_sha in commit_shas))
+        
+        return {
+            "repo": f"{owner}/{repo}",
+            "total_commits": len(commits),
+            "commits": commits,
+        }
+
+    async def fetch_repo_languages_batch(self, repos: List[str]) -> Dict[str, Any]:
+        """
+        Fetch the language breakdown of several repositories in one call.
+        Repositories are fetched concurrently; prefer this over calling fetch_repo_languages per repo.
+        
+        Args:
+            repos: Full repository names (e.g., ["octocat/hello-world", "octocat/spoon-knife"])
+            
+        Returns:
+            Dictionary mapping each full name to its fetch_repo_languages result.
+        """
+        logger = get_logger("fetch_repo_languages_batch")
+        logger.info(f"Fetching languages for {len(repos)} repositories")
+        
+        semaphore = asyncio.Semaphore(_MAX_CONCURRENT_FETCHES)
+        
+        async def _fetch_one(full_name: str) -> Dict[str, Any]:
+            owner, _, repo = full_name.partition("/")
+            if not repo:
+                return {"error": f"Expected owner/repo, got {full_name!r}"}
+            async with semaphore:
+                return await asyncio.to_thread(self.fetch_repo_languages, owner, repo)
+        
+        # Duplicates are fetched once
+        unique = list(dict.fromkeys(repos))
+        results = await asyncio.gather(*(_fetch_one(full_name) for full_name in unique))
+        
+        return {
+            "total_repos": len(unique),
+            "languages": dict(zip(unique, results)),
         }
@@ -1,10 +1,15 @@
 
+import functools
 import logging
 import sys
 
 
+@functools.lru_cache(maxsize=None)
 def get_tool_logger(name: str) -> logging.Logger:
-    """Get a logger for a tool."""
+    """
+    Get a logger for a tool. Tools call this on every invocation; the
+    handler is attached once per name, so each record is written once.
+    """
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
     handler = logging.StreamHandler(sys.stdout)
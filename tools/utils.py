@@ -1,11 +1,109 @@
 
+import functools
+import mmap
 import os
+import re
+import shutil
 import subprocess
-from typing import List
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Tuple, Union
 
 from tools.logger import get_tool_logger as get_logger
 
 
+def _ripgrep_files(patterns: List[str], path: str) -> Optional[List[str]]:
+    """
+    Files under path containing any of the literal patterns, found with ripgrep.
+    None when rg is not installed (or fails), so callers can fall back to a walk.
+    """
+    rg = shutil.which("rg")
+    if not rg:
+        return None
+    # Same scope as os.walk: ignore files and hidden paths are searched too;
+    # binary files are skipped
+    result = subprocess.run(
+        [rg, "--files-with-matches", "--fixed-strings", "--no-ignore", "--hidden",
+         "--no-messages", *(arg for p in patterns for arg in ("-e", p)), "--", path],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    # 0 = matches, 1 = none, 2 = some files unreadable (matches still listed)
+    if result.returncode not in (0, 1, 2):
+        return None
+    return sorted(result.stdout.splitlines())
+
+
+@functools.lru_cache(maxsize=64)
+def _literal_matcher(patterns: Tuple[str, ...]) -> Union[bytes, "re.Pattern[bytes]"]:
+    """
+    One literal as bytes (for mmap.find), several as a single alternation regex
+    (one scan per file). Cached: agents repeat the same marker sets.
+    """
+    if len(patterns) == 1:
+        return patterns[0].encode()
+    return re.compile(b"|".join(re.escape(p.encode()) for p in patterns))
+
+
+def _file_contains(file_path: str, needle: Union[bytes, "re.Pattern[bytes]"]) -> bool:
+    """
+    Whether the file's bytes contain needle; searched in place via mmap, no
+    read or decode. Binary files (a NUL in the first 8 KB) never match, as with rg.
+    """
+    try:
+        with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(b"\0", 0, 8192) != -1:
+                return False
+            if isinstance(needle, bytes):
+                return mm.find(needle) != -1
+            return needle.search(mm) is not None
+    except (OSError, ValueError):  # unreadable, or empty (cannot be mapped)
+        return False
+
+
+def _iter_files(path: str) -> Iterator[str]:
+    """
+    Paths of the files under path, like os.walk without the per-file
+    os.path.join: DirEntry carries the joined path and its cached type.
+    Symlinked directories are not followed; unreadable directories are skipped.
+    """
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        yield entry.path
+        except OSError:
+            continue
+
+
+def _search_tree(path: str, needle: Union[bytes, "re.Pattern[bytes]"]) -> List[str]:
+    """
+    Files under path for which _file_contains(file, needle), in walk order.
+    Files are scanned on a thread pool so opens, page faults and scans of
+    different files overlap; at most a few batches of paths are queued ahead
+    of the scan instead of listing the whole tree first.
+    """
+    workers = min(32, (os.cpu_count() or 1) * 2)
+    matching_files = []
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for file_path in _iter_files(path):
+            pending.append((file_path, pool.submit(_file_contains, file_path, needle)))
+            while len(pending) > workers * 4:
+                done_path, future = pending.popleft()
+                if future.result():
+                    matching_files.append(done_path)
+        for done_path, future in pending:
+            if future.result():
+                matching_files.append(done_path)
+    return matching_files
+
+
 def read_file(file_path: str) -> str:
     """
     Reads the content of a file.
@@ -45,27 +143,29 @@ def list_directory(path: str = ".") -> List[str]:
         return [f"Error listing directory: {e}"]
 
 
-def search_file_content(pattern: str, path: str = ".") -> List[str]:
+def search_file_content(
+    pattern: str, path: str = ".", more_patterns: Optional[List[str]] = None
+) -> List[str]:
     """
     Searches for a pattern in files in a given path.
 
     Args:
         pattern: The pattern to search for.
         path: The path to the directory.
+        more_patterns: Further patterns; a file matches if it contains any
+                       of them. All patterns are searched in one pass.
 
     Returns:
         A list of files containing the pattern.
     """
     logger = get_logger("search_file_content")
-    logger.info(f"Searching for pattern '{pattern}' in path '{path}'")
+    patterns = [pattern, *(more_patterns or [])]
+    logger.info(f"Searching for pattern(s) {patterns} in path '{path}'")
     try:
-        matching_files = []
-        for root, _, files in os.walk(path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                if read_file(file_path).find(pattern) != -1:
-                    matching_files.append(file_path)
-        return matching_files
+        found = _ripgrep_files(patterns, path)
+        if found is not None:
+            return found
+        return _search_tree(path, _literal_matcher(tuple(patterns)))
     except Exception as e:
         logger.error(f"Error searching for pattern: {e}")
         return [f"Error searching for pattern: {e}"]
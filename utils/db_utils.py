@@ -1,13 +1,160 @@
 """Database utilities for saving skill vectors with Supabase."""
 
+import asyncio
+import atexit
+import itertools
 import os
-from typing import Dict, Optional
-from database.db import DatabaseManager
+import queue
+import re
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
 from database.logger import get_db_logger
 
-# Initialize logger immediately when module is imported
+if TYPE_CHECKING:
+    from database.db import DatabaseManager
+    from database.db_async import AsyncDatabaseManager
+
+# Only configures the logger: the log file and listener thread are created by
+# the first record, so importing this module stays cheap. DatabaseManager (and
+# with it the Supabase client) is imported by the first save.
 logger = get_db_logger("db_utils")
-logger.debug("Database utilities module (db_utils.py) imported and logger initialized")
+
+# DatabaseManagers by (supabase_url, supabase_key) as passed (None = from the
+# environment), created on first save; and the ones whose vocabulary is loaded
+_DB_MGRS: Dict[Tuple[Optional[str], Optional[str]], "DatabaseManager"] = {}
+_VOCAB_READY: Set[Tuple[Optional[str], Optional[str]]] = set()
+_DB_MGR_LOCK = threading.Lock()
+
+
+def _get_db_manager(supabase_url: Optional[str], supabase_key: Optional[str]) -> "DatabaseManager":
+    """
+    Return the DatabaseManager for these credentials, reusing it across calls,
+    with its vocabulary initialised (once per process).
+    """
+    key = (supabase_url, supabase_key)
+    with _DB_MGR_LOCK:
+        db = _DB_MGRS.get(key)
+        if db is None:
+            from database.db import DatabaseManager
+            db = _DB_MGRS[key] = DatabaseManager(supabase_url=supabase_url, supabase_key=supabase_key)
+        if key not in _VOCAB_READY:
+            # initialize_vocabulary logs its own failures; not retried per save
+            db.initialize_vocabulary()
+            _VOCAB_READY.add(key)
+            logger.debug("Vocabulary initialized")
+    return db
+
+
+# AsyncDatabaseManagers per event loop (their HTTP clients and pools are bound
+# to the loop that first used them), then by credentials as for _DB_MGRS
+_ASYNC_DB_MGRS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict]" = weakref.WeakKeyDictionary()
+
+
+async def _get_async_db_manager(
+    supabase_url: Optional[str], supabase_key: Optional[str]
+) -> "AsyncDatabaseManager":
+    """
+    Return the AsyncDatabaseManager for these credentials on the running loop.
+    The (process-wide) vocabulary is initialised through _get_db_manager the
+    first time, off the loop.
+    """
+    key = (supabase_url, supabase_key)
+    if key not in _VOCAB_READY:
+        await asyncio.to_thread(_get_db_manager, supabase_url, supabase_key)
+    managers = _ASYNC_DB_MGRS.setdefault(asyncio.get_running_loop(), {})
+    db = managers.get(key)
+    if db is None:
+        from database.db_async import AsyncDatabaseManager
+        db = managers[key] = AsyncDatabaseManager(supabase_url=supabase_url, supabase_key=supabase_key)
+    return db
+
+
+# (patterns searched in the lowercased error, log label, tip lines), first match wins
+_ERROR_TIP_LINES = (
+    (("supabase_url", "supabase_key"), "Supabase credentials issue detected", (
+        "Check your Supabase environment variables",
+        "Required:",
+        "- SUPABASE_URL: https://<project-ref>.supabase.co",
+        "- SUPABASE_KEY: Service role key from Supabase Dashboard",
+        "Get them from: Supabase Dashboard -> Settings -> API",
+    )),
+    (("connection", "network"), "Connection issue detected", (
+        "Check your network connection and Supabase URL",
+        "Ensure SUPABASE_URL is correct: https://<project-ref>.supabase.co",
+    )),
+    (("vector", "pgvector"), "pgvector extension issue detected", (
+        "Ensure pgvector extension is enabled in Supabase",
+        "Run: CREATE EXTENSION IF NOT EXISTS vector;",
+    )),
+    (("table", "does not exist"), "Table does not exist", (
+        "Ensure the 'developer_skills' table exists in Supabase",
+        "See database/SUPABASE_SETUP.md for table creation SQL",
+    )),
+    # Whole word only, so "urls" doesn't count as RLS
+    ((r"\brls\b", "row-level", "permission"), "RLS (Row Level Security) issue detected", (
+        "Row Level Security might be blocking the operation",
+        "Ensure you're using the service_role key (not anon key)",
+        "Or disable RLS: ALTER TABLE developer_skills DISABLE ROW LEVEL SECURITY;",
+        "See database/SUPABASE_SETUP.md for RLS configuration",
+    )),
+)
+# Each rule compiled and its tip rendered once at import: logged as a single
+# record on failure
+_ERROR_TIPS = tuple(
+    (re.compile("|".join(needles)), label, "\n".join([f"💡 Tip: {tip[0]}", *(f"   {line}" for line in tip[1:])]))
+    for needles, label, tip in _ERROR_TIP_LINES
+)
+
+
+# Unexpected errors get a traceback once per _TRACEBACK_EVERY (starting with
+# the first), so a failing bulk ingest doesn't format one per failed write
+_TRACEBACK_EVERY = 50
+_unexpected_errors = itertools.count()
+
+
+def _error_tip(error: Exception) -> Optional[Tuple[str, str]]:
+    """(label, tip) of the first _ERROR_TIPS rule the error matches, if any."""
+    error_str = str(error).lower()
+    for pattern, label, tip in _ERROR_TIPS:
+        if pattern.search(error_str):
+            return label, tip
+    return None
+
+
+def _log_save_error(message: str, error: Exception, with_tip: bool = True):
+    """
+    Log a failed save. Errors matching an _ERROR_TIPS rule are known setup
+    problems: logged without a traceback (plus the tip). Others are sampled.
+    """
+    tip = _error_tip(error)
+    if tip is not None:
+        # The tip rides in the ERROR record so it is flushed (and shown) with it
+        if with_tip:
+            logger.error(
+                "%s: known DB error class=%s msg=%s\n%s\n%s",
+                message, type(error).__name__, str(error)[:200], *tip
+            )
+        else:
+            logger.error("%s: known DB error class=%s msg=%s", message, type(error).__name__, str(error)[:200])
+        return
+    logger.error(
+        "%s: %s: %s", message, type(error).__name__, error,
+        exc_info=next(_unexpected_errors) % _TRACEBACK_EVERY == 0
+    )
+
+
+def _missing_credential(supabase_url: Optional[str], supabase_key: Optional[str]) -> Optional[str]:
+    """Name of the Supabase setting that is neither passed nor in the environment, if any."""
+    if not supabase_url and not os.environ.get("SUPABASE_URL"):
+        return "SUPABASE_URL"
+    if not supabase_key and not (
+        os.environ.get("SUPABASE_SECRET_KEY") or os.environ.get("SUPABASE_KEY")
+    ):
+        return "SUPABASE_SECRET_KEY"
+    return None
 
 
 def save_skill_vector_to_db(
@@ -34,37 +181,20 @@ def save_skill_vector_to_db(
     """
     if not skills:
         logger.warning("Empty skills dictionary, skipping database save")
-        print("⚠ Warning: Empty skills dictionary, skipping database save")
         return False
     
-    if not supabase_url and not os.environ.get("SUPABASE_URL"):
-        logger.warning("SUPABASE_URL not set, skipping database save")
-        print("⚠ Warning: SUPABASE_URL not set, skipping database save")
-        return False
-    
-    if not supabase_key and not (
-        os.environ.get("SUPABASE_SECRET_KEY") or os.environ.get("SUPABASE_KEY")
-    ):
-        logger.warning("SUPABASE_SECRET_KEY not set, skipping database save")
-        print("⚠ Warning: SUPABASE_SECRET_KEY not set, skipping database save")
+    missing = _missing_credential(supabase_url, supabase_key)
+    if missing:
+        logger.warning("%s not set, skipping database save", missing)
         return False
     
     try:
-        logger.info(f"Attempting to save skill vector - Username: {username}, Repo: {repo_name}")
-        print(f"\n💾 Attempting to save skill vector to database...")
-        print(f"   Username: {username}")
-        print(f"   Repo: {repo_name}")
-        print(f"   Skills: {len(skills)} skills")
+        logger.info(
+            "Attempting to save skill vector - Username: %s, Repo: %s, Skills: %d",
+            username, repo_name, len(skills)
+        )
         
-        db = DatabaseManager(supabase_url=supabase_url, supabase_key=supabase_key)
-        
-        # Initialize vocabulary from existing records (if not already done)
-        try:
-            db.initialize_vocabulary()
-            logger.debug("Vocabulary initialized successfully")
-        except Exception as vocab_error:
-            logger.warning(f"Vocabulary initialization failed (non-critical): {vocab_error}")
-            print(f"   ⚠ Vocabulary initialization failed (non-critical): {vocab_error}")
+        db = _get_db_manager(supabase_url, supabase_key)
         
         result = db.save_or_update_skill_vector(
             username=username,
@@ -73,48 +203,280 @@ def save_skill_vector_to_db(
         )
         
         record_id = result.get("id") if isinstance(result, dict) else None
-        logger.info(f"Successfully saved skill vector! Record ID: {record_id}")
-        print(f"   ✓ Successfully saved! Record ID: {record_id}")
+        logger.info("Successfully saved skill vector! Record ID: %s", record_id)
         return True
         
     except Exception as e:
-        # Log detailed error to file
-        logger.error(f"Error saving skill vector to database: {e}", exc_info=True)
-        
-        # Also print to console
-        print(f"\n❌ Error saving skill vector to database:")
-        print(f"   Error type: {type(e).__name__}")
-        print(f"   Error message: {str(e)}")
-        print(f"   📝 Check logs/database_*.log for full details")
-        
-        # Provide helpful suggestions
-        error_str = str(e).lower()
+        _log_save_error("Error saving skill vector to database", e)
+        return False
+
+
+def save_skill_vectors_to_db_batch(
+    rows: List[Tuple[str, str, Dict[str, int]]],
+    supabase_url: Optional[str] = None,
+    supabase_key: Optional[str] = None,
+    batch_size: int = 500,
+    use_copy: bool = False
+) -> int:
+    """
+    Save or update many skill vectors, batch_size rows per upsert round trip.
+    
+    Same merge logic as save_skill_vector_to_db (max(old_score, new_score) per
+    skill, done server-side), for backfills and other bulk ingests.
+    
+    Args:
+        rows: (username, repo_name, skills) tuples; rows with empty skills are skipped
+        supabase_url: Supabase project URL (optional, uses SUPABASE_URL env var if not provided)
+        supabase_key: Supabase service role key (optional, uses SUPABASE_KEY env var if not provided)
+        batch_size: Rows per batch_upsert_skills call
+        use_copy: Load all rows with AsyncDatabaseManager.bulk_load_skills instead:
+                  COPY into a staging table and one merge statement when asyncpg
+                  and DATABASE_URL are available (the batch RPC otherwise).
+                  Worth it for tens of thousands of rows; all-or-nothing, and
+                  not callable from inside a running event loop.
         
-        if "supabase_url" in error_str or "supabase_key" in error_str:
-            logger.info("Tip: Supabase credentials issue detected")
-            print(f"\n   💡 Tip: Check your Supabase environment variables")
-            print(f"      Required:")
-            print(f"      - SUPABASE_URL: https://<project-ref>.supabase.co")
-            print(f"      - SUPABASE_KEY: Service role key from Supabase Dashboard")
-            print(f"      Get them from: Supabase Dashboard -> Settings -> API")
-        elif "connection" in error_str or "network" in error_str:
-            logger.info("Tip: Connection issue detected")
-            print(f"\n   💡 Tip: Check your network connection and Supabase URL")
-            print(f"      Ensure SUPABASE_URL is correct: https://<project-ref>.supabase.co")
-        elif "vector" in error_str or "pgvector" in error_str:
-            logger.info("Tip: pgvector extension issue detected")
-            print(f"\n   💡 Tip: Ensure pgvector extension is enabled in Supabase")
-            print(f"      Run: CREATE EXTENSION IF NOT EXISTS vector;")
-        elif "table" in str(e).lower() or "does not exist" in str(e).lower():
-            logger.info("Tip: Table does not exist")
-            print(f"\n   💡 Tip: Ensure the 'developer_skills' table exists in Supabase")
-            print(f"      See database/SUPABASE_SETUP.md for table creation SQL")
-        elif "RLS" in str(e) or "row-level" in str(e).lower() or "permission" in error_str:
-            logger.info("Tip: RLS (Row Level Security) issue detected")
-            print(f"\n   💡 Tip: Row Level Security might be blocking the operation")
-            print(f"      Ensure you're using the service_role key (not anon key)")
-            print(f"      Or disable RLS: ALTER TABLE developer_skills DISABLE ROW LEVEL SECURITY;")
-            print(f"      See database/SUPABASE_SETUP.md for RLS configuration")
+    Returns:
+        Number of rows saved (batches that fail are logged and not counted)
+    """
+    rows = [row for row in rows if row[2]]
+    if not rows:
+        logger.warning("No non-empty skill dictionaries, skipping database save")
+        return 0
+    
+    missing = _missing_credential(supabase_url, supabase_key)
+    if missing:
+        logger.warning("%s not set, skipping database save", missing)
+        return 0
+    
+    try:
+        db = _get_db_manager(supabase_url, supabase_key)
+    except Exception as e:
+        _log_save_error("Error connecting to database", e)
+        return 0
+    
+    if use_copy:
+        try:
+            saved = asyncio.run(_bulk_load(rows, supabase_url, supabase_key))
+        except Exception as e:
+            _log_save_error("Error bulk loading skill vectors", e)
+            return 0
+        logger.info("Saved %d of %d skill vectors", saved, len(rows))
+        return saved
+    
+    saved = 0
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start:start + batch_size]
+        try:
+            db.save_or_update_skill_vectors_batch(batch)
+            saved += len(batch)
+        except Exception as e:
+            # The first failure's tip usually explains the rest
+            _log_save_error(
+                f"Error saving skill vector batch (rows {start}-{start + len(batch) - 1})",
+                e, with_tip=start == 0
+            )
+    logger.info("Saved %d of %d skill vectors", saved, len(rows))
+    return saved
+
+
+class _SaveQueue:
+    """
+    Coalesces single saves from concurrent callers into batch upserts.
+    
+    A daemon thread takes the first queued save, keeps collecting until it has
+    max_batch rows or max_latency_s has passed, then writes them with one
+    save_skill_vectors_to_db_batch call per set of credentials and resolves
+    each caller's Future with True/False. Anything still queued at exit is
+    written before the interpreter shuts down.
+    """
+    
+    _STOP = object()
+    
+    def __init__(self, max_batch: int = 500, max_latency_s: float = 1.0):
+        self.max_batch = max_batch
+        self.max_latency_s = max_latency_s
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="db-save-queue", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+    
+    def put(self, key: Tuple[Optional[str], Optional[str]], row: Tuple[str, str, Dict[str, int]]) -> "Future[bool]":
+        future: "Future[bool]" = Future()
+        self._queue.put((key, row, future))
+        return future
+    
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+    
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                return
+            pending = [item]
+            deadline = time.monotonic() + self.max_latency_s
+            stop = False
+            while len(pending) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stop = True
+                    break
+                pending.append(item)
+            self._flush(pending)
+            if stop:
+                return
+    
+    def _flush(self, pending: list):
+        by_key: Dict[Tuple[Optional[str], Optional[str]], list] = {}
+        for key, row, future in pending:
+            by_key.setdefault(key, []).append((row, future))
+        for (supabase_url, supabase_key), entries in by_key.items():
+            rows = [row for row, _ in entries]
+            try:
+                # One batch: it is written (and counted) entirely or not at all
+                ok = save_skill_vectors_to_db_batch(
+                    rows, supabase_url, supabase_key, batch_size=len(rows)
+                ) == len(rows)
+            except Exception as e:
+                logger.error("Error flushing queued skill vector saves: %s", e, exc_info=True)
+                ok = False
+            for _, future in entries:
+                future.set_result(ok)
+
+
+_SAVE_QUEUE: Optional[_SaveQueue] = None
+
+
+def queue_skill_vector_save(
+    username: str,
+    repo_name: str,
+    skills: Dict[str, int],
+    supabase_url: Optional[str] = None,
+    supabase_key: Optional[str] = None
+) -> "Future[bool]":
+    """
+    save_skill_vector_to_db without waiting on the database: the save is
+    queued and written with others in one batch upsert (up to 500 rows, at
+    most ~1 s later). Same merge logic.
+    
+    Returns:
+        A Future resolving to True if the save was written, False otherwise
+    """
+    global _SAVE_QUEUE
+    if not skills:
+        logger.warning("Empty skills dictionary, skipping database save")
+        future: "Future[bool]" = Future()
+        future.set_result(False)
+        return future
+    with _DB_MGR_LOCK:
+        if _SAVE_QUEUE is None:
+            _SAVE_QUEUE = _SaveQueue()
+    return _SAVE_QUEUE.put((supabase_url, supabase_key), (username, repo_name, skills))
+
+
+async def _bulk_load(
+    rows: List[Tuple[str, str, Dict[str, int]]],
+    supabase_url: Optional[str],
+    supabase_key: Optional[str]
+) -> int:
+    """bulk_load_skills on a manager (and pool) that lives only as long as this call's loop."""
+    from database.db_async import AsyncDatabaseManager
+    db = AsyncDatabaseManager(supabase_url=supabase_url, supabase_key=supabase_key)
+    try:
+        return await db.bulk_load_skills(rows)
+    finally:
+        await db.close()
+
+
+async def asave_skill_vector_to_db(
+    username: str,
+    repo_name: str,
+    skills: Dict[str, int],
+    supabase_url: Optional[str] = None,
+    supabase_key: Optional[str] = None
+) -> bool:
+    """
+    Async save_skill_vector_to_db: same merge, same logging, awaited instead of
+    blocking a thread, so many saves can be in flight at once.
+    
+    Returns:
+        True if successful, False otherwise
+    """
+    if not skills:
+        logger.warning("Empty skills dictionary, skipping database save")
+        return False
+    
+    missing = _missing_credential(supabase_url, supabase_key)
+    if missing:
+        logger.warning("%s not set, skipping database save", missing)
+        return False
+    
+    try:
+        logger.info(
+            "Attempting to save skill vector - Username: %s, Repo: %s, Skills: %d",
+            username, repo_name, len(skills)
+        )
+        db = await _get_async_db_manager(supabase_url, supabase_key)
+        result = await db.save_or_update_skill_vector(
+            username=username,
+            repo_name=repo_name,
+            new_skills=skills
+        )
+        record_id = result.get("id") if isinstance(result, dict) else None
+        logger.info("Successfully saved skill vector! Record ID: %s", record_id)
+        return True
         
+    except Exception as e:
+        _log_save_error("Error saving skill vector to database", e)
         return False
 
+
+async def asave_skill_vectors_to_db(
+    rows: List[Tuple[str, str, Dict[str, int]]],
+    supabase_url: Optional[str] = None,
+    supabase_key: Optional[str] = None,
+    concurrency: int = 4
+) -> int:
+    """
+    Save many skill vectors with asave_skill_vector_to_db, at most
+    concurrency saves in flight. Through PostgREST a handful of concurrent
+    requests already gets most of the gain; use save_skill_vectors_to_db_batch
+    when one RPC per batch is acceptable.
+    
+    Args:
+        rows: (username, repo_name, skills) tuples; rows with empty skills are skipped
+        supabase_url: Supabase project URL (optional, uses SUPABASE_URL env var if not provided)
+        supabase_key: Supabase service role key (optional, uses SUPABASE_KEY env var if not provided)
+        concurrency: Maximum number of saves awaiting the database at once
+        
+    Returns:
+        Number of rows saved
+    """
+    rows = [row for row in rows if row[2]]
+    if not rows:
+        logger.warning("No non-empty skill dictionaries, skipping database save")
+        return 0
+    
+    missing = _missing_credential(supabase_url, supabase_key)
+    if missing:
+        logger.warning("%s not set, skipping database save", missing)
+        return 0
+    
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    
+    async def save(username: str, repo_name: str, skills: Dict[str, int]) -> bool:
+        async with semaphore:
+            return await asave_skill_vector_to_db(username, repo_name, skills, supabase_url, supabase_key)
+    
+    results = await asyncio.gather(*(save(*row) for row in rows))
+    saved = sum(results)
+    logger.info("Saved %d of %d skill vectors", saved, len(rows))
+    return saved
@@ -1,10 +1,79 @@
+import json
+import re
+from functools import lru_cache
 from typing import AsyncGenerator
 from google.adk.agents import LlmAgent
 from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.readonly_context import ReadonlyContext
 from google.adk.events import Event
 from pydantic import BaseModel
 from utils.model import GEMINI_2_5_FLASH
 
+# Raw output longer than this many characters keeps only its start and end
+# in the prompt, so a runaway first pass can't blow up the structuring call
+_MAX_RAW_OUTPUT_CHARS = 32_000
+_TRUNCATION_MARKER = "\n...[truncated]...\n"
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+# The instruction is _INSTRUCTION_HEAD + raw output + the schema's rendered
+# tail (built once per schema class by _instruction_tail)
+_INSTRUCTION_HEAD = """
+Extract and structure the following output according to the JSON schema.
+The output should contain a username and a list of skills, where each skill has a name and score.
+
+Raw output to structure:
+"""
+
+_INSTRUCTION_TAIL = """
+
+Output the result in the following JSON schema:
+<output_json_schema>
+{schema_json}
+</output_json_schema>
+
+Parse the raw output and create a properly structured response matching the schema exactly.
+The skills should be in a list format where each item has "name" and "score" fields.
+        """
+
+
+def _trim_raw_output(raw_output: str) -> str:
+    """Collapse runs of blank lines, then keep the head and tail within _MAX_RAW_OUTPUT_CHARS."""
+    raw_output = _BLANK_LINES_RE.sub("\n\n", raw_output)
+    if len(raw_output) > _MAX_RAW_OUTPUT_CHARS:
+        half = _MAX_RAW_OUTPUT_CHARS // 2
+        raw_output = raw_output[:half] + _TRUNCATION_MARKER + raw_output[-half:]
+    return raw_output
+
+
+@lru_cache(maxsize=128)
+def _instruction_tail(schema: type) -> str:
+    """Static end of the instruction, with the compact JSON schema of a model class."""
+    return _INSTRUCTION_TAIL.format(
+        schema_json=json.dumps(schema.model_json_schema(), separators=(",", ":"))
+    )
+
+
+@lru_cache(maxsize=64)
+def _build_agent(input_key: str, output_key: str, model: str, schema: type) -> LlmAgent:
+    """
+    Build (once per keys/model/schema) the structuring agent. The raw output is
+    read from ctx.session.state[input_key] when the instruction is rendered, so
+    the same agent serves every call.
+    """
+    tail = _instruction_tail(schema)
+
+    def instruction(readonly_ctx: ReadonlyContext) -> str:
+        raw_output = _trim_raw_output(str(readonly_ctx.state.get(input_key, "")))
+        return _INSTRUCTION_HEAD + raw_output + tail
+
+    return LlmAgent(
+        name=f"structure_output_{input_key}_{output_key}",
+        model=model,
+        instruction=instruction,
+        output_key=output_key,
+        output_schema=schema,
+    )
+
 
 def structure_output(
     input_key: str, 
@@ -29,32 +98,9 @@ def structure_output(
     if model is None:
         model = GEMINI_2_5_FLASH
     
-    name = f"structure_output_{input_key}_{output_key}"
-    
-    # Get the raw output from session state
-    raw_output = ctx.session.state.get(input_key, "")
-    
-    get_structured_output = LlmAgent(
-        name=name,
-        model=model,
-        instruction=f"""
-Extract and structure the following output according to the JSON schema.
-The output should contain a username and a list of skills, where each skill has a name and score.
-
-Raw output to structure:
-{raw_output}
-
-Output the result in the following JSON schema:
-<output_json_schema>
-{schema.model_json_schema()}
-</output_json_schema>
-
-Parse the raw output and create a properly structured response matching the schema exactly.
-The skills should be in a list format where each item has "name" and "score" fields.
-        """,
-        output_key=output_key,
-        output_schema=schema,
+    get_structured_output = _build_agent(
+        input_key, output_key, model, schema if isinstance(schema, type) else type(schema)
     )
 
-    ctx.branch = name
-    return get_structured_output.run_async(ctx) 
\ No newline at end of file
+    ctx.branch = get_structured_output.name
+    return get_structured_output.run_async(ctx)